@@ -1,72 +1,161 @@
 """Global initialization for Bempp."""
 
-# Monkey patch Numba to emit log messages when compiling
+import os as _os
+import logging as _logging
+import time as _time
+import platform as _platform
+import importlib as _importlib
 
-import numba
+from bempp.api.utils import DefaultParameters
 
-oldcompile = numba.core.registry.CPUDispatcher.compile
+# Public names that are imported on first access. This keeps
+# "import bempp.api" cheap, which matters for short scripts and for
+# pool workers that are started with the spawn method. Each name maps
+# to its module and attribute. An attribute None denotes the module.
+_LAZY_ATTRIBUTES = {
+    "MemProfiler": ("bempp.api.utils.helpers", "MemProfiler"),
+    "assign_parameters": ("bempp.api.utils.helpers", "assign_parameters"),
+    "import_grid": ("bempp.api.grid.io", "import_grid"),
+    "export": ("bempp.api.grid.io", "export"),
+    "Grid": ("bempp.api.grid.grid", "Grid"),
+    "GridFunction": ("bempp.api.assembly.grid_function", "GridFunction"),
+    "real_callable": ("bempp.api.assembly.grid_function", "real_callable"),
+    "complex_callable": ("bempp.api.assembly.grid_function", "complex_callable"),
+    "callable": ("bempp.api.assembly.grid_function", "callable"),
+    "function_space": ("bempp.api.space", "function_space"),
+    "shapes": ("bempp.api.shapes", None),
+    "integration": ("bempp.api.integration", None),
+    "operators": ("bempp.api.operators", None),
+    "assembly": ("bempp.api.assembly", None),
+    "external": ("bempp.api.external", None),
+    "fmm": ("bempp.api.fmm", None),
+    "grid": ("bempp.api.grid", None),
+    "linalg": ("bempp.api.linalg", None),
+    "space": ("bempp.api.space", None),
+    "utils": ("bempp.api.utils", None),
+    "lu": ("bempp.api.linalg.direct_solvers", "lu"),
+    "compute_lu_factors": ("bempp.api.linalg.direct_solvers", "compute_lu_factors"),
+    "gmres": ("bempp.api.linalg.iterative_solvers", "gmres"),
+    "cg": ("bempp.api.linalg.iterative_solvers", "cg"),
+    "block_gmres": ("bempp.api.linalg.iterative_solvers", "block_gmres"),
+    "block_cg": ("bempp.api.linalg.iterative_solvers", "block_cg"),
+    "RecyclingGmres": ("bempp.api.linalg.iterative_solvers", "RecyclingGmres"),
+    "near_field_preconditioner": (
+        "bempp.api.linalg.preconditioners",
+        "near_field_preconditioner",
+    ),
+    "efie_calderon_preconditioner": (
+        "bempp.api.linalg.preconditioners",
+        "efie_calderon_preconditioner",
+    ),
+    "hypersingular_preconditioner": (
+        "bempp.api.linalg.preconditioners",
+        "hypersingular_preconditioner",
+    ),
+    "single_layer_preconditioner": (
+        "bempp.api.linalg.preconditioners",
+        "single_layer_preconditioner",
+    ),
+    "as_matrix": ("bempp.api.assembly.discrete_boundary_operator", "as_matrix"),
+    "ZeroBoundaryOperator": (
+        "bempp.api.assembly.boundary_operator",
+        "ZeroBoundaryOperator",
+    ),
+    "MultiplicationOperator": (
+        "bempp.api.assembly.boundary_operator",
+        "MultiplicationOperator",
+    ),
+    "BlockedOperator": ("bempp.api.assembly.blocked_operator", "BlockedOperator"),
+    "GeneralizedBlockedOperator": (
+        "bempp.api.assembly.blocked_operator",
+        "GeneralizedBlockedOperator",
+    ),
+    "save_weak_form": ("bempp.api.assembly.io", "save_weak_form"),
+    "load_weak_form": ("bempp.api.assembly.io", "load_weak_form"),
+    "weak_form_key": ("bempp.api.assembly.io", "weak_form_key"),
+    "clear_fmm_cache": ("bempp.api.fmm.fmm_assembler", "clear_fmm_cache"),
+    "fmm_cache_statistics": ("bempp.api.fmm.fmm_assembler", "fmm_cache_statistics"),
+    "clear_weak_form_cache": (
+        "bempp.api.assembly.weak_form_cache",
+        "clear_weak_form_cache",
+    ),
+    "weak_form_cache_statistics": (
+        "bempp.api.assembly.weak_form_cache",
+        "weak_form_cache_statistics",
+    ),
+    "pool": ("bempp.api.utils.pool", None),
+    "kernel_cache": ("bempp.api.utils.kernel_cache", None),
+    "precompile": ("bempp.api.utils.precompile", "precompile"),
+    "create_device_pool": ("bempp.api.utils.pool", "create_device_pool"),
+}
 
 
-def compile_with_log(*args, **kwargs):
-    """Numba compilation with log messages."""
-    import bempp.api
+def __getattr__(name):
+    """Resolve lazily imported names and constants."""
+    if name in _LAZY_CONSTANTS:
+        value = _LAZY_CONSTANTS[name]()
+    elif name in _LAZY_ATTRIBUTES:
+        _configure_numba()
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+        value = _importlib.import_module(module_name)
+        if attribute is not None:
+            value = getattr(value, attribute)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    fun_name = args[0].py_func.__name__
-    bempp.api.log(f"Compiling {fun_name} for signature {args[1]}.", level="debug")
-    res = oldcompile(*args, **kwargs)
-    bempp.api.log(f"Compilation finished.", level="debug")
-    return res
+    globals()[name] = value
+    return value
 
 
-numba.core.registry.CPUDispatcher.compile = compile_with_log
+def __dir__():
+    """Return the module attributes including the lazy ones."""
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | set(_LAZY_CONSTANTS))
 
-import os as _os
-import tempfile as _tempfile
-import logging as _logging
-import time as _time
-import platform as _platform
 
-from bempp.api.utils import DefaultParameters
-from bempp.api.utils.helpers import MemProfiler
-
-from bempp.api.utils.helpers import assign_parameters
-from bempp.api.grid.io import import_grid
-from bempp.api.grid.io import export
-from bempp.api.grid.grid import Grid
-from bempp.api.assembly.grid_function import GridFunction
-from bempp.api.assembly.grid_function import real_callable
-from bempp.api.assembly.grid_function import complex_callable
-from bempp.api.assembly.grid_function import callable
-
-from bempp.api.space import function_space
-
-from bempp.api import shapes
-from bempp.api import integration
-from bempp.api import operators
-from bempp.api.linalg.direct_solvers import lu, compute_lu_factors
-from bempp.api.linalg.iterative_solvers import gmres, cg
-from bempp.api.assembly.discrete_boundary_operator import as_matrix
-from bempp.api.assembly.boundary_operator import ZeroBoundaryOperator
-from bempp.api.assembly.boundary_operator import MultiplicationOperator
-from bempp.api.assembly.blocked_operator import BlockedOperator
-from bempp.api.assembly.blocked_operator import GeneralizedBlockedOperator
-
-from bempp.api.fmm.fmm_assembler import clear_fmm_cache
-
-from bempp.api.utils import pool
-from bempp.api.utils.pool import create_device_pool
-
-from numba.core.errors import (
-    NumbaDeprecationWarning,
-    NumbaPendingDeprecationWarning,
-    NumbaPerformanceWarning,
-)
+_NUMBA_CONFIGURED = False
 
-import warnings
 
-warnings.simplefilter("ignore", category=NumbaDeprecationWarning)
-warnings.simplefilter("ignore", category=NumbaPendingDeprecationWarning)
-warnings.simplefilter("ignore", category=NumbaPerformanceWarning)
+def _configure_numba():
+    """
+    Patch Numba to log compilations and silence its deprecation warnings.
+
+    This is done on first use of a lazily imported name, so that
+    importing bempp.api does not import Numba.
+    """
+    # pylint: disable=W0603
+    global _NUMBA_CONFIGURED
+    if _NUMBA_CONFIGURED:
+        return
+    _NUMBA_CONFIGURED = True
+
+    import warnings
+    import numba
+    from numba.core.errors import (
+        NumbaDeprecationWarning,
+        NumbaPendingDeprecationWarning,
+        NumbaPerformanceWarning,
+    )
+
+    oldcompile = numba.core.registry.CPUDispatcher.compile
+
+    def compile_with_log(*args, **kwargs):
+        """Numba compilation with log messages."""
+        dispatcher = args[0]
+        fun_name = dispatcher.py_func.__name__
+        cache_hits = sum(dispatcher._cache_hits.values())
+        log(f"Compiling {fun_name} for signature {args[1]}.", level="debug")
+        res = oldcompile(*args, **kwargs)
+        if sum(dispatcher._cache_hits.values()) > cache_hits:
+            log(f"Loaded {fun_name} from kernel cache.", level="debug")
+        else:
+            log(f"Compilation finished.", level="debug")
+        return res
+
+    numba.core.registry.CPUDispatcher.compile = compile_with_log
+
+    warnings.simplefilter("ignore", category=NumbaDeprecationWarning)
+    warnings.simplefilter("ignore", category=NumbaPendingDeprecationWarning)
+    warnings.simplefilter("ignore", category=NumbaPerformanceWarning)
 
 
 CONSOLE_LOGGING_HANDLER = None
@@ -196,9 +285,12 @@ BEMPP_PATH = _os.path.abspath(
 # except:
 #    pass
 
-TMP_PATH = _tempfile.mkdtemp()
 
-# Get the path to Gmsh
+def _make_tmp_path():
+    """Create the temporary directory of Bempp."""
+    import tempfile
+
+    return tempfile.mkdtemp()
 
 
 def _gmsh_path():
@@ -224,8 +316,6 @@ def _get_version():
     return version.__version__
 
 
-GMSH_PATH = _gmsh_path()
-
 __version__ = _get_version()
 
 PLOT_BACKEND = "gmsh"
@@ -239,15 +329,30 @@ except NameError:
 
 USE_JIT = True
 
-if _platform.system() == "Darwin":
-    DEFAULT_DEVICE_INTERFACE = "numba"
-else:
+
+def _default_device_interface():
+    """
+    Return the default device interface.
+
+    This probes the OpenCL platforms and is only called on first access
+    of DEFAULT_DEVICE_INTERFACE, usually by the first assembly.
+    """
+    if _platform.system() == "Darwin":
+        return "numba"
+
     from bempp.core.opencl_kernels import find_cpu_driver
 
     if find_cpu_driver() is None:
-        DEFAULT_DEVICE_INTERFACE = "numba"
-    else:
-        DEFAULT_DEVICE_INTERFACE = "opencl"
+        return "numba"
+    return "opencl"
+
+
+# Module constants that are computed on first access.
+_LAZY_CONSTANTS = {
+    "TMP_PATH": _make_tmp_path,
+    "GMSH_PATH": _gmsh_path,
+    "DEFAULT_DEVICE_INTERFACE": _default_device_interface,
+}
 
 DEFAULT_PRECISION = "double"
 VECTORIZATION_MODE = "auto"
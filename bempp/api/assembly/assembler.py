@@ -8,6 +8,7 @@ def _create_assembler(
     from bempp.core.singular_assembler import SingularAssembler
     from bempp.core.dense_assembler import DenseAssembler
     from bempp.core.diagonal_assembler import DiagonalAssembler
+    from bempp.core.hmat_assembler import HMatAssembler
     from bempp.api.fmm.fmm_assembler import FmmAssembler
 
     # from bempp.core.numba.dense_assembler import DenseAssembler
@@ -30,6 +31,8 @@ def _create_assembler(
         return SparseAssembler(domain, dual_to_range, parameters)
     if identifier == "fmm":
         return FmmAssembler(domain, dual_to_range, parameters)
+    if identifier == "hmat":
+        return HMatAssembler(domain, dual_to_range, parameters)
     else:
         raise ValueError("Unknown assembler type.")
     # if identifier == "dense_evaluator":
@@ -85,6 +88,16 @@ class AssemblerInterface(object):
         """Return parameters."""
         return self._parameters
 
+    @property
+    def device_interface(self):
+        """Return the device interface."""
+        return self._device_interface
+
+    @property
+    def implementation_name(self):
+        """Return the class name of the assembler implementation."""
+        return type(self._implementation).__name__
+
     def assemble(self, operator_descriptor, *args, **kwargs):
         """Assemble the operator."""
         return self._implementation.assemble(
@@ -171,7 +171,7 @@ class BlockedOperator(BlockedOperatorBase):
         """Construct an (m x n) blocked boundary operator."""
         super().__init__()
 
-        self._operators = _np.empty((m, n), dtype=_np.object)
+        self._operators = _np.empty((m, n), dtype=object)
         self._rows = m * [False]
         self._cols = n * [False]
 
@@ -612,7 +612,7 @@ class BlockedDiscreteOperator(_DiscreteOperatorBase):
 
         self._ndims = (rows, cols)
 
-        self._operators = _np.empty((rows, cols), dtype=_np.object)
+        self._operators = _np.empty((rows, cols), dtype=object)
         self._rows = -_np.ones(rows, dtype=int)
         self._cols = -_np.ones(cols, dtype=int)
 
@@ -662,6 +662,11 @@ class BlockedDiscreteOperator(_DiscreteOperatorBase):
         """Return the object at position (i, j)."""
         return self._operators[key]
 
+    @property
+    def ndims(self):
+        """Number of block rows and block columns."""
+        return self._ndims
+
     def _fill_complete(self):
         if (-1 in self._rows) or (-1 in self._cols):
             return False
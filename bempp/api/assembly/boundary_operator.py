@@ -133,7 +133,9 @@ class BoundaryOperatorWithAssembler(BoundaryOperator):
 
     def _assemble(self):
         """Assemble the operator."""
-        return self.assembler.assemble(self.descriptor)
+        from bempp.api.assembly.weak_form_cache import get_weak_form
+
+        return get_weak_form(self)
 
 
 class _SumBoundaryOperator(BoundaryOperator):
@@ -215,7 +217,7 @@ class ZeroBoundaryOperator(BoundaryOperator):
     """
 
     def __init__(self, domain, range_, dual_to_range):
-        super(ZeroBoundaryOperator, self).__init__(domain, range_, dual_to_range)
+        super(ZeroBoundaryOperator, self).__init__(domain, range_, dual_to_range, None)
 
     def _assemble(self):
 
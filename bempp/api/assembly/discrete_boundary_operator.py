@@ -66,6 +66,10 @@ class _ScaledDiscreteOperator(_DiscreteOperatorBase):
         """Matvec."""
         return self._alpha * (self._op @ x)
 
+    def _matmat(self, x):
+        """Matmat."""
+        return self._alpha * (self._op @ x)
+
     @property
     def A(self):
         """Return matrix."""
@@ -95,6 +99,10 @@ class _SumDiscreteOperator(_DiscreteOperatorBase):
         """Evaluate matvec."""
         return self._op1 @ x + self._op2 @ x
 
+    def _matmat(self, x):
+        """Evaluate matmat."""
+        return self._op1 @ x + self._op2 @ x
+
     @property
     def A(self):
         """Return matrix representation."""
@@ -126,6 +134,10 @@ class _ProductDiscreteOperator(_DiscreteOperatorBase):
         """Evaluate matvec."""
         return self._op1 @ (self._op2 @ x)
 
+    def _matmat(self, x):
+        """Evaluate matmat."""
+        return self._op1 @ (self._op2 @ x)
+
     @property
     def A(self):
         """Return matrix representation."""
@@ -149,12 +161,30 @@ class GenericDiscreteBoundaryOperator(_DiscreteOperatorBase):
         if self._is_complex:
             return self._evaluator.matvec(x)
         if _np.iscomplexobj(x):
+            if hasattr(self._evaluator, "matmat"):
+                return self._matmat(x.reshape([-1, 1])).reshape(x.shape)
             return self._evaluator.matvec(_np.real(x)) + 1j * self._evaluator.matvec(
                 _np.imag(x)
             )
         else:
             return self._evaluator.matvec(x)
 
+    def _matmat(self, x):
+        """
+        Product with a block of vectors.
+
+        Evaluators that implement matmat, such as the Fmm assembler,
+        process all columns at once. For real operators the real and
+        imaginary parts of complex input are evaluated in one block.
+        """
+        if not hasattr(self._evaluator, "matmat"):
+            return super()._matmat(x)
+        if self._is_complex or not _np.iscomplexobj(x):
+            return self._evaluator.matmat(x)
+        ncols = x.shape[1]
+        result = self._evaluator.matmat(_np.hstack([_np.real(x), _np.imag(x)]))
+        return result[:, :ncols] + 1j * result[:, ncols:]
+
     @property
     def A(self):
         """Convert to dense."""
@@ -171,26 +201,78 @@ class DenseDiscreteBoundaryOperator(_DiscreteOperatorBase):
 
     """
 
-    def __init__(self, impl):
-        """Constructor. Should not be called by the user."""
+    def __init__(self, impl, tile_size=None, conjugate=False):
+        """
+        Constructor. Should not be called by the user.
+
+        If tile_size is given, products with the operator are computed
+        in row blocks of about tile_size MB. This is used for matrices
+        stored in memory mapped files, which are then streamed from
+        disk instead of being loaded at once. If conjugate is True, the
+        operator is the complex conjugate of impl. The conjugation is
+        applied to each tile, so that impl can stay on disk.
+        """
         self._impl = impl
+        self._tile_size = tile_size
+        self._conjugate = conjugate and _np.iscomplexobj(impl)
         super().__init__(impl.dtype, impl.shape)
 
     def _matmat(self, x):
 
-        if _np.iscomplexobj(x) and not _np.iscomplexobj(self.A):
-            return self.A.dot(_np.real(x).astype(self.dtype)) + 1j * self.A.dot(
-                _np.imag(x).astype(self.dtype)
-            )
-        return self.A.dot(x.astype(self.dtype))
+        if self._tile_size is not None:
+            return self._tiled_matmat(x)
+        return _dense_matmat(self.A, x, self.dtype)
+
+    def _tiled_matmat(self, x):
+        """Compute the product by streaming blocks of the matrix."""
+        mat = self._impl
+        rows, cols = mat.shape
+        result_type = _np.result_type(self.dtype, x.dtype)
+
+        if mat.flags.f_contiguous and not mat.flags.c_contiguous:
+            # A transposed matrix is stored by columns.
+            step = max(1, self._tile_size * 1024**2 // (rows * mat.itemsize))
+            result = _np.zeros((rows, x.shape[1]), dtype=result_type)
+            for start in range(0, cols, step):
+                end = min(start + step, cols)
+                result += _dense_matmat(
+                    self._tile(mat[:, start:end]), x[start:end], self.dtype
+                )
+        else:
+            step = max(1, self._tile_size * 1024**2 // (cols * mat.itemsize))
+            result = _np.empty((rows, x.shape[1]), dtype=result_type)
+            for start in range(0, rows, step):
+                end = min(start + step, rows)
+                result[start:end] = _dense_matmat(
+                    self._tile(mat[start:end]), x, self.dtype
+                )
+
+        return result
+
+    def _tile(self, block):
+        """Load a block of the matrix into memory."""
+        if self._conjugate:
+            return _np.conjugate(block)
+        return _np.asarray(block)
+
+    @property
+    def is_out_of_core(self):
+        """True if the matrix is streamed in tiles."""
+        return self._tile_size is not None
 
     def __add__(self, other):
-        if isinstance(other, DenseDiscreteBoundaryOperator):
+        if (
+            isinstance(other, DenseDiscreteBoundaryOperator)
+            and not self.is_out_of_core
+            and not other.is_out_of_core
+        ):
             return DenseDiscreteBoundaryOperator(self.A + other.A)
         else:
             return super().__add__(other)
 
     def __neg__(self):
+        if self.is_out_of_core:
+            return super().__neg__()
         return DenseDiscreteBoundaryOperator(-self.A)
 
     def __mul__(self, other):
@@ -198,6 +280,9 @@ class DenseDiscreteBoundaryOperator(_DiscreteOperatorBase):
 
     def dot(self, other):
         """Form the product with another object."""
+        if self.is_out_of_core:
+            # Keep the matrix on disk and only form products lazily.
+            return super().dot(other)
         if isinstance(other, DenseDiscreteBoundaryOperator):
             return DenseDiscreteBoundaryOperator(self.A.dot(other.A))
         if _np.isscalar(other):
@@ -217,6 +302,8 @@ class DenseDiscreteBoundaryOperator(_DiscreteOperatorBase):
         return super().dot(other)
 
     def __rmul__(self, other):
+        if self.is_out_of_core:
+            return super().__rmul__(other)
         if _np.isscalar(other):
             return DenseDiscreteBoundaryOperator(self.A * other)
         else:
@@ -224,19 +311,37 @@ class DenseDiscreteBoundaryOperator(_DiscreteOperatorBase):
 
     def _transpose(self):
         """Transpose of the operator."""
-        return DenseDiscreteBoundaryOperator(self.A.T)
+        return DenseDiscreteBoundaryOperator(
+            self._impl.T, tile_size=self._tile_size, conjugate=self._conjugate
+        )
 
     def _adjoint(self):
         """Adjoint of the operator."""
+        if self.is_out_of_core:
+            # Conjugate the tiles in the products to keep the matrix on disk.
+            return DenseDiscreteBoundaryOperator(
+                self._impl.T, tile_size=self._tile_size, conjugate=not self._conjugate
+            )
         return DenseDiscreteBoundaryOperator(self.A.conjugate().transpose())
 
     # pylint: disable=invalid-name
     @property
     def A(self):
         """Return the underlying array."""
+        if self._conjugate:
+            return _np.conjugate(self._impl)
         return self._impl
 
 
+def _dense_matmat(mat, x, dtype):
+    """Product of a dense matrix with a block of vectors."""
+    if _np.iscomplexobj(x) and not _np.iscomplexobj(mat):
+        return mat.dot(_np.real(x).astype(dtype)) + 1j * mat.dot(
+            _np.imag(x).astype(dtype)
+        )
+    return mat.dot(x.astype(dtype))
+
+
 class DiagonalOperator(_DiscreteOperatorBase):
     """
     Main class for discrete diagonal operators.
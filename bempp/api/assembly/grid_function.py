@@ -452,50 +452,77 @@ class GridFunction(object):
             element_values, self.grid_coefficients[global_dofs], axes=([1], [0])
         )
 
+    def evaluate_on_elements(self, local_coordinates):
+        """
+        Evaluate the grid function on all elements.
+
+        Parameters
+        ----------
+        local_coordinates : np.ndarray
+            Either an array of shape (2, number_of_points) with local
+            coordinates that are used on every element, or an array of
+            shape (number_of_elements, 2, number_of_points) with separate
+            local coordinates for each element of the grid.
+
+        Returns an array of shape
+        (component_count, number_of_elements, number_of_points). Elements
+        outside the support of the space have the value zero.
+        """
+        local_coordinates = _np.asarray(local_coordinates, dtype="float64")
+        number_of_elements = self.space.grid.number_of_elements
+
+        if local_coordinates.ndim == 2:
+            local_coordinates = local_coordinates.reshape(
+                (1,) + local_coordinates.shape
+            )
+        if local_coordinates.ndim != 3 or local_coordinates.shape[0] not in [
+            1,
+            number_of_elements,
+        ]:
+            raise ValueError(
+                "local_coordinates must have shape (2, n) or "
+                + f"({number_of_elements}, 2, n)."
+            )
+
+        return _evaluate_on_elements(
+            self.grid_coefficients,
+            self.space.grid.data(),
+            self.space.support_elements,
+            self.space.local2global,
+            self.space.local_multipliers,
+            self.space.normal_multipliers,
+            self.space.numba_evaluate,
+            self.space.shapeset.evaluate,
+            _np.ascontiguousarray(local_coordinates),
+            self.component_count,
+            number_of_elements,
+        )
+
     def evaluate_on_element_centers(self):
         """Evaluate the grid function on all element centers."""
         local_coordinates = _np.array([[1.0 / 3], [1.0 / 3]])
 
-        values = _np.zeros(
-            (self.component_count, self.space.grid.number_of_elements), dtype=self.dtype
-        )
-
-        for index in self.space.support_elements:
-            local_values = self.evaluate(index, local_coordinates)
-            values[:, index] = local_values.flat
-        return values
+        return self.evaluate_on_elements(local_coordinates)[:, :, 0]
 
     def evaluate_on_vertices(self):
         """
         Evaluate the grid function on all vertices.
 
         If a function is discontinuous across elements a weighted average
-        of the element values at the vertices is taken.
+        of the element values at the vertices is taken. The weights are
+        the areas of the adjacent elements.
         """
         grid = self.space.grid
         local_coordinates = _np.array([[0, 1, 0], [0, 0, 1]], dtype="float64")
 
-        values = _np.zeros(
-            (self.component_count, grid.number_of_vertices), dtype=self.dtype
+        return _average_on_vertices(
+            self.evaluate_on_elements(local_coordinates),
+            grid.elements,
+            grid.volumes,
+            self.space.support_elements,
+            grid.number_of_vertices,
         )
 
-        # Sum up the areas of all elements adjacent to the vertices
-        vertex_areas = _np.zeros(grid.number_of_vertices, dtype="float64")
-
-        vertex_used = _np.zeros(grid.number_of_vertices, dtype=_np.bool)
-
-        for element_index in self.space.support_elements:
-            local_values = self.evaluate(element_index, local_coordinates)
-            for i in range(3):
-                index = grid.elements[i, element_index]
-                vertex_used[index] = True
-                element_area = grid.volumes[element_index]
-                vertex_areas[index] += element_area
-                values[:, index] += local_values[:, i] * element_area
-
-        values[:, vertex_used] /= vertex_areas[vertex_used]
-        return values
-
     def integrate(self):
         """Integrate grid function over a grid."""
         from bempp.api.integration.triangle_gauss import rule
@@ -700,6 +727,88 @@ def _integrate(
     return result
 
 
+@_numba.njit(parallel=True)
+def _evaluate_on_elements(
+    coefficients,
+    grid_data,
+    support_elements,
+    local2global,
+    local_multipliers,
+    normal_multipliers,
+    evaluate_on_element,
+    shapeset_evaluate,
+    local_coordinates,
+    codomain_dimension,
+    number_of_elements,
+):
+    """Evaluate a grid function at local coordinates on all support elements."""
+    number_of_points = local_coordinates.shape[2]
+    number_of_coordinate_sets = local_coordinates.shape[0]
+    values = _np.zeros(
+        (codomain_dimension, number_of_elements, number_of_points),
+        dtype=coefficients.dtype,
+    )
+
+    for support_index in _numba.prange(len(support_elements)):
+        index = support_elements[support_index]
+        if number_of_coordinate_sets == 1:
+            points = local_coordinates[0]
+        else:
+            points = local_coordinates[index]
+
+        element_vals = evaluate_on_element(
+            index,
+            shapeset_evaluate,
+            points,
+            grid_data,
+            local_multipliers,
+            normal_multipliers,
+        )
+
+        for local_fun_index in range(element_vals.shape[1]):
+            coefficient = coefficients[local2global[index, local_fun_index]]
+            for component in range(codomain_dimension):
+                for point_index in range(number_of_points):
+                    values[component, index, point_index] += (
+                        element_vals[component, local_fun_index, point_index]
+                        * coefficient
+                    )
+
+    return values
+
+
+@_numba.njit
+def _average_on_vertices(
+    element_values, elements, volumes, support_elements, number_of_vertices
+):
+    """
+    Average values at the element corners onto the vertices.
+
+    The values at the three corners of each support element are weighted
+    by the element area. Vertices without support elements are zero.
+    """
+    codomain_dimension = element_values.shape[0]
+    values = _np.zeros((codomain_dimension, number_of_vertices), element_values.dtype)
+    vertex_areas = _np.zeros(number_of_vertices, dtype=_np.float64)
+
+    for index in support_elements:
+        area = volumes[index]
+        for corner in range(3):
+            vertex = elements[corner, index]
+            vertex_areas[vertex] += area
+            for component in range(codomain_dimension):
+                values[component, vertex] += (
+                    element_values[component, index, corner] * area
+                )
+
+    for vertex in range(number_of_vertices):
+        if vertex_areas[vertex] > 0:
+            for component in range(codomain_dimension):
+                values[component, vertex] /= vertex_areas[vertex]
+
+    return values
+
+
 # Must be used in jit mode as fun might just be a Python callable and not numba compiled.
 @_numba.njit
 def _project_function(
@@ -0,0 +1,275 @@
+"""Routines to save and load assembled weak forms."""
+
+import json as _json
+
+import numpy as _np
+
+_FORMAT_VERSION = 1
+
+
+def weak_form_key(operator):
+    """
+    Return a key that identifies the weak form of a boundary operator.
+
+    The key is a hex string computed from the content of the domain and
+    dual to range spaces, the operator descriptor, the assembler type
+    and the quadrature and assembly parameters. Two operators with the
+    same key have identical weak forms. The key does not depend on the
+    random grid and space ids, so it is reproducible across processes.
+    """
+    from hashlib import sha256
+    from bempp.api.assembly.boundary_operator import BoundaryOperatorWithAssembler
+
+    if not isinstance(operator, BoundaryOperatorWithAssembler):
+        raise ValueError("Only operators with an assembler can be keyed.")
+
+    descriptor = operator.descriptor
+    parameters = operator.parameters
+
+    items = [
+        _space_key(operator.domain),
+        _space_key(operator.dual_to_range),
+        descriptor.identifier,
+        repr(list(descriptor.options)),
+        descriptor.kernel_type,
+        descriptor.assembly_type,
+        descriptor.precision,
+        str(descriptor.is_complex),
+        str(descriptor.kernel_dimension),
+        operator.assembler.implementation_name,
+        str(parameters.quadrature.regular),
+        str(parameters.quadrature.singular),
+        str(parameters.assembly.always_promote_to_double),
+        parameters.assembly.discretization_type,
+        str(parameters.assembly.symmetric),
+    ]
+
+    hasher = sha256()
+    for item in items:
+        hasher.update(item.encode("utf-8"))
+        hasher.update(b"\0")
+
+    return hasher.hexdigest()
+
+
+def _space_key(space):
+    """Return a hash of the grid and the dof maps of a space."""
+    from hashlib import sha256
+
+    grid = space.grid
+    localised_space = space.localised_space
+    dof_transform_csr = space.dof_transformation.tocsr().sorted_indices()
+
+    hasher = sha256()
+    hasher.update(space.identifier.encode("utf-8"))
+    hasher.update(str(space.order).encode("utf-8"))
+    hasher.update(str(space.codomain_dimension).encode("utf-8"))
+
+    for array in [
+        grid.vertices,
+        grid.elements,
+        grid.domain_indices,
+        space.support_elements,
+        space.local2global,
+        space.local_multipliers,
+        space.normal_multipliers,
+        localised_space.local2global,
+        localised_space.local_multipliers,
+        localised_space.normal_multipliers,
+        dof_transform_csr.indices,
+        dof_transform_csr.indptr,
+        dof_transform_csr.data,
+    ]:
+        array = _np.ascontiguousarray(array)
+        hasher.update(str(array.dtype).encode("utf-8"))
+        hasher.update(repr(array.shape).encode("utf-8"))
+        hasher.update(array.tobytes())
+
+    return hasher.hexdigest()
+
+
+def save_weak_form(filename, weak_form, key=None):
+    """
+    Save an assembled weak form to a file.
+
+    Parameters
+    ----------
+    filename : string
+        The name of the file. The data is stored as an uncompressed
+        npz file so that dense matrices can be memory mapped on load.
+    weak_form : discrete operator
+        A DenseDiscreteBoundaryOperator, SparseDiscreteBoundaryOperator,
+        ZeroDiscreteBoundaryOperator, BlockedDiscreteOperator or a
+        SciPy sparse matrix, e.g. an Fmm singular correction.
+    key : string
+        An optional key, e.g. computed by weak_form_key, that is
+        stored with the data and checked by load_weak_form.
+
+    """
+    arrays = {}
+    header = _describe(weak_form, "", arrays)
+
+    meta = {"version": _FORMAT_VERSION, "key": key, "operator": header}
+    arrays["__meta__"] = _np.array(_json.dumps(meta))
+
+    with open(filename, "wb") as f:
+        _np.savez(f, **arrays)
+
+
+def load_weak_form(filename, key=None, mmap_mode=None):
+    """
+    Load a weak form saved with save_weak_form.
+
+    Parameters
+    ----------
+    filename : string
+        The name of the file.
+    key : string
+        If given, a ValueError is raised if the stored key differs.
+    mmap_mode : string
+        If 'r' or 'c', dense matrices are memory mapped from the
+        file instead of being read into memory (see numpy.memmap).
+
+    """
+    with _np.load(filename, allow_pickle=False) as data:
+        meta = _json.loads(str(data["__meta__"]))
+
+        if meta["version"] != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported weak form format version {meta['version']}.")
+        if key is not None and meta["key"] != key:
+            raise ValueError("Stored weak form has a different key.")
+
+        def read(name):
+            """Read an array from the file."""
+            if mmap_mode is not None:
+                return _memmap_npz_member(filename, name, mmap_mode)
+            return data[name]
+
+        return _restore(meta["operator"], read)
+
+
+def stored_key(filename):
+    """Return the key stored with a weak form, or None."""
+    with _np.load(filename, allow_pickle=False) as data:
+        return _json.loads(str(data["__meta__"]))["key"]
+
+
+def _describe(weak_form, prefix, arrays):
+    """Add the arrays of a weak form to arrays and return its header."""
+    from scipy.sparse import issparse
+    from bempp.api.assembly.blocked_operator import BlockedDiscreteOperator
+    from bempp.api.assembly.discrete_boundary_operator import (
+        DenseDiscreteBoundaryOperator,
+        SparseDiscreteBoundaryOperator,
+        ZeroDiscreteBoundaryOperator,
+    )
+
+    if isinstance(weak_form, SparseDiscreteBoundaryOperator):
+        weak_form = weak_form.A
+
+    if isinstance(weak_form, DenseDiscreteBoundaryOperator):
+        arrays[prefix + "data"] = weak_form.A
+        return {"type": "dense", "prefix": prefix}
+
+    if issparse(weak_form):
+        mat = weak_form.tocsr()
+        arrays[prefix + "data"] = mat.data
+        arrays[prefix + "indices"] = mat.indices
+        arrays[prefix + "indptr"] = mat.indptr
+        return {
+            "type": "sparse",
+            "prefix": prefix,
+            "shape": [int(n) for n in mat.shape],
+        }
+
+    if isinstance(weak_form, ZeroDiscreteBoundaryOperator):
+        return {"type": "zero", "shape": [int(n) for n in weak_form.shape]}
+
+    if isinstance(weak_form, BlockedDiscreteOperator):
+        rows, cols = weak_form.ndims
+        blocks = [
+            [
+                _describe(weak_form[i, j], prefix + f"b{i}_{j}_", arrays)
+                for j in range(cols)
+            ]
+            for i in range(rows)
+        ]
+        return {"type": "blocked", "blocks": blocks}
+
+    raise ValueError(f"Cannot save weak forms of type {type(weak_form).__name__}.")
+
+
+def _restore(header, read):
+    """Create a weak form from its header."""
+    from scipy.sparse import csr_matrix
+    from bempp.api.assembly.blocked_operator import BlockedDiscreteOperator
+    from bempp.api.assembly.discrete_boundary_operator import (
+        DenseDiscreteBoundaryOperator,
+        SparseDiscreteBoundaryOperator,
+        ZeroDiscreteBoundaryOperator,
+    )
+
+    kind = header["type"]
+
+    if kind == "dense":
+        return DenseDiscreteBoundaryOperator(read(header["prefix"] + "data"))
+
+    if kind == "sparse":
+        prefix = header["prefix"]
+        return SparseDiscreteBoundaryOperator(
+            csr_matrix(
+                (
+                    _np.asarray(read(prefix + "data")),
+                    _np.asarray(read(prefix + "indices")),
+                    _np.asarray(read(prefix + "indptr")),
+                ),
+                shape=tuple(header["shape"]),
+            )
+        )
+
+    if kind == "zero":
+        return ZeroDiscreteBoundaryOperator(*header["shape"])
+
+    if kind == "blocked":
+        return BlockedDiscreteOperator(
+            [[_restore(block, read) for block in row] for row in header["blocks"]]
+        )
+
+    raise ValueError(f"Unknown weak form type {kind}.")
+
+
+def _memmap_npz_member(filename, name, mmap_mode):
+    """Memory map an array stored uncompressed in an npz file."""
+    import struct
+    import zipfile
+
+    with zipfile.ZipFile(filename) as archive:
+        info = archive.getinfo(name + ".npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError("Only uncompressed arrays can be memory mapped.")
+
+    with open(filename, "rb") as f:
+        # Skip the local file header of the zip member.
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", f.read(4))
+        f.seek(name_length + extra_length, 1)
+
+        version = _np.lib.format.read_magic(f)
+        if version == (1, 0):
+            header = _np.lib.format.read_array_header_1_0(f)
+        else:
+            header = _np.lib.format.read_array_header_2_0(f)
+        shape, fortran_order, dtype = header
+        offset = f.tell()
+
+    if _np.prod(shape) == 0:
+        return _np.empty(shape, dtype=dtype)
+
+    return _np.memmap(
+        filename,
+        dtype=dtype,
+        mode=mmap_mode,
+        shape=shape,
+        order="F" if fortran_order else "C",
+        offset=offset,
+    )
@@ -0,0 +1,120 @@
+"""A process wide cache of assembled weak forms."""
+
+import collections as _collections
+import threading as _threading
+
+_CACHE = _collections.OrderedDict()
+_LOCK = _threading.Lock()
+_STATISTICS = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+
+def get_weak_form(operator):
+    """
+    Return the weak form of an operator, using the cache if possible.
+
+    Weak forms are keyed by weak_form_key and the device interface, so
+    that identical operators created by different BoundaryOperator
+    instances are only assembled once. The cache holds dense, sparse
+    and blocked weak forms up to parameters.assembly.weak_form_cache_size
+    MB and evicts the least recently used entries first. Other weak
+    forms, e.g. from Fmm or H-matrix assembly, and dense weak forms
+    stored in memory mapped files are not cached.
+    """
+    import bempp.api
+    from bempp.api.assembly.io import weak_form_key
+
+    max_bytes = operator.parameters.assembly.weak_form_cache_size * 1024**2
+
+    if max_bytes <= 0:
+        return operator.assembler.assemble(operator.descriptor)
+
+    key = (
+        weak_form_key(operator),
+        operator.assembler.device_interface,
+        operator.parameters.assembly.dense.out_of_core,
+    )
+
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None:
+            _CACHE.move_to_end(key)
+            _STATISTICS["hits"] += 1
+
+    if entry is not None:
+        bempp.api.log(
+            f"Using cached weak form for {operator.descriptor.identifier}.",
+            level="debug",
+        )
+        return entry[0]
+
+    weak_form = operator.assembler.assemble(operator.descriptor)
+    nbytes = weak_form_nbytes(weak_form)
+
+    with _LOCK:
+        _STATISTICS["misses"] += 1
+        if nbytes is None or nbytes > max_bytes or key in _CACHE:
+            return weak_form
+        _CACHE[key] = (weak_form, nbytes)
+        _STATISTICS["bytes"] += nbytes
+        while _STATISTICS["bytes"] > max_bytes:
+            _, (_, evicted_bytes) = _CACHE.popitem(last=False)
+            _STATISTICS["bytes"] -= evicted_bytes
+            _STATISTICS["evictions"] += 1
+
+    return weak_form
+
+
+def weak_form_nbytes(weak_form):
+    """Return the memory used by a weak form or None if unknown."""
+    from bempp.api.assembly.blocked_operator import BlockedDiscreteOperator
+    from bempp.api.assembly.discrete_boundary_operator import (
+        DenseDiscreteBoundaryOperator,
+        SparseDiscreteBoundaryOperator,
+        ZeroDiscreteBoundaryOperator,
+    )
+
+    if isinstance(weak_form, DenseDiscreteBoundaryOperator):
+        if weak_form.is_out_of_core:
+            # The matrix is stored on disk and does not use the memory budget.
+            return None
+        return weak_form.A.nbytes
+    if isinstance(weak_form, SparseDiscreteBoundaryOperator):
+        mat = weak_form.A
+        return sum(
+            getattr(mat, name).nbytes
+            for name in ["data", "indices", "indptr", "row", "col"]
+            if hasattr(mat, name)
+        )
+    if isinstance(weak_form, ZeroDiscreteBoundaryOperator):
+        return 0
+    if isinstance(weak_form, BlockedDiscreteOperator):
+        total = 0
+        rows, cols = weak_form.ndims
+        for i in range(rows):
+            for j in range(cols):
+                nbytes = weak_form_nbytes(weak_form[i, j])
+                if nbytes is None:
+                    return None
+                total += nbytes
+        return total
+    return None
+
+
+def clear_weak_form_cache():
+    """Remove all weak forms from the cache."""
+    with _LOCK:
+        _CACHE.clear()
+        _STATISTICS["bytes"] = 0
+
+
+def weak_form_cache_statistics():
+    """
+    Return statistics of the weak form cache.
+
+    Returns a dictionary with the number of hits, misses, evictions,
+    the number of cached entries and the cached bytes.
+    """
+    with _LOCK:
+        statistics = dict(_STATISTICS)
+        statistics["entries"] = len(_CACHE)
+    return statistics
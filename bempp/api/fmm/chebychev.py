@@ -0,0 +1,645 @@
+"""A kernel independent Fmm based on Chebychev interpolation."""
+
+import numba as _numba
+import numpy as _np
+
+from bempp.api.fmm.interface import FmmInterfaceBase
+from bempp.api.utils.octree import de_morton
+
+
+class ChebychevFmmInterface(FmmInterfaceBase):
+    """
+    Kernel independent Fmm based on Chebychev interpolation.
+
+    This implements the black-box Fmm of Fong and Darve in Numba. The
+    sources and targets are sorted into a uniform octree. Far field
+    interactions are approximated by interpolating the kernel in
+    Chebychev points of each box. The M2L operators are compressed with
+    an SVD on each level. Near field interactions are evaluated
+    directly with the kernels in bempp.api.fmm.helpers.
+
+    The interface can be used in place of ExafmmInterface by setting
+    the parameter fmm.engine to 'chebychev'. Since only kernel
+    evaluations are required, the Fmm works on machines on which
+    ExaFMM is not available.
+    """
+
+    def __init__(
+        self,
+        source_points,
+        target_points,
+        mode,
+        wavenumber=None,
+        depth=4,
+        expansion_order=5,
+        ncrit=400,
+        precision="double",
+        singular_correction=None,
+    ):
+        """
+        Instantiate a Chebychev Fmm.
+
+        The octree has the given depth on all branches, so that ncrit is
+        not used. The interpolation uses 1 + expansion_order Chebychev
+        points along each dimension of a box. The Fmm is always executed
+        in double precision.
+        """
+        import bempp.api
+        from bempp.api.fmm.helpers import (
+            laplace_kernel,
+            helmholtz_kernel,
+            modified_helmholtz_kernel,
+        )
+
+        self._singular_correction = singular_correction
+
+        self._source_points = source_points
+        self._target_points = target_points
+        self._mode = mode
+        self._depth = depth
+        self._order = expansion_order
+
+        if mode == "laplace":
+            self._kernel_parameters = _np.array([], dtype="float64")
+            self._kernel = laplace_kernel
+            self._kernel_type = _np.float64
+        elif mode == "helmholtz":
+            self._kernel_parameters = _np.array([wavenumber], dtype="float64")
+            self._kernel = helmholtz_kernel
+            self._kernel_type = _np.complex128
+        elif mode == "modified_helmholtz":
+            self._kernel_parameters = _np.array([wavenumber], dtype="float64")
+            self._kernel = modified_helmholtz_kernel
+            self._kernel_type = _np.float64
+        else:
+            raise ValueError("Unknown value for 'mode'.")
+
+        with bempp.api.Timer(message="Initialising Chebychev Fmm."):
+            self._setup_tree()
+            self._setup_operators()
+
+    @property
+    def nbytes(self):
+        """
+        Return an estimate of the memory used by the interface.
+
+        This counts the points, the singular correction, the basis values
+        at the points and the translation operators.
+        """
+        return (
+            super().nbytes
+            + self._source_basis.nbytes
+            + self._target_basis.nbytes
+            + self._m2m_operators.nbytes
+            + sum(
+                operators.nbytes
+                for operators in self._m2l_operators
+                + self._m2l_source_bases
+                + self._m2l_target_bases
+            )
+        )
+
+    def _setup_tree(self):
+        """Sort the points into an octree and compute the node lists."""
+        from bempp.api.utils.octree import Octree
+
+        sources = _np.asarray(self._source_points, dtype="float64")
+        targets = _np.asarray(self._target_points, dtype="float64")
+        nsources = len(sources)
+        shared_points = targets is sources or (
+            sources.shape == targets.shape and _np.array_equal(sources, targets)
+        )
+
+        if shared_points:
+            points = sources
+        else:
+            points = _np.vstack([sources, targets])
+
+        lbound = _np.min(points, axis=0)
+        diameter = _np.max(_np.max(points, axis=0) - lbound)
+        if diameter == 0:
+            diameter = 1.0
+        # Enlarge the box slightly so that all points are strictly inside.
+        lbound -= 1e-8 * diameter
+        diameter *= 1 + 2e-8
+
+        octree = Octree(
+            lbound,
+            lbound + diameter,
+            self._depth,
+            _np.ascontiguousarray(points.T),
+        )
+
+        level_ptr = octree.non_empty_nodes_ptr
+        self._level_nodes = [
+            octree.non_empty_nodes_by_level[level_ptr[level] : level_ptr[level + 1]]
+            for level in range(self._depth + 1)
+        ]
+        self._box_sizes = diameter / 2.0 ** _np.arange(self._depth + 1)
+        self._lbound = lbound
+
+        leaves = self._level_nodes[self._depth]
+        nleaves = len(leaves)
+        leaf_of_point = _np.empty(len(points), dtype="int64")
+        leaf_of_point[octree.sorted_indices] = _np.repeat(
+            _np.arange(nleaves), _np.diff(octree.leaf_nodes_ptr)
+        )
+
+        if shared_points:
+            source_leaves = target_leaves = leaf_of_point
+        else:
+            source_leaves = leaf_of_point[:nsources]
+            target_leaves = leaf_of_point[nsources:]
+
+        self._sources = _np.ascontiguousarray(sources.T)
+        self._targets = _np.ascontiguousarray(targets.T)
+        self._source_order, self._source_ptr = _sort_by_leaf(source_leaves, nleaves)
+        self._target_order, self._target_ptr = _sort_by_leaf(target_leaves, nleaves)
+
+        self._parents = [None]
+        self._octants = [None]
+        for level in range(1, self._depth + 1):
+            nodes = self._level_nodes[level]
+            self._parents.append(octree.node_positions(nodes >> 3, level - 1))
+            self._octants.append(
+                [_np.flatnonzero((nodes & 7) == octant) for octant in range(8)]
+            )
+
+        near_field_ptr = octree.near_field_nodes_ptr
+        self._near_field = octree.node_positions(
+            octree.near_field_nodes[
+                near_field_ptr[self._depth] : near_field_ptr[self._depth + 1]
+            ],
+            self._depth,
+        ).reshape(-1, 27)
+
+        interaction_ptr = octree.interaction_list_nodes_ptr
+        self._m2l_pairs = [None, None]
+        for level in range(2, self._depth + 1):
+            interaction_nodes = octree.interaction_list_nodes[
+                interaction_ptr[level] : interaction_ptr[level + 1]
+            ].reshape(-1, 189)
+            targets, cols = _np.nonzero(interaction_nodes >= 0)
+            self._m2l_pairs.append(
+                _group_by_offset(
+                    self._level_nodes[level],
+                    targets,
+                    octree.node_positions(interaction_nodes[targets, cols], level),
+                )
+            )
+
+    def _setup_operators(self):
+        """Compute the basis values and the translation operators."""
+        from bempp.api.utils.interpolation import (
+            chebychev_nodes_and_weights_second_kind,
+            chebychev_differentiation_matrix,
+        )
+
+        nodes, weights = chebychev_nodes_and_weights_second_kind(self._order)
+        self._nodes = nodes
+        self._differentiation_matrix = chebychev_differentiation_matrix(
+            nodes, weights
+        ).reshape(len(nodes), len(nodes))
+
+        leaf_size = self._box_sizes[self._depth]
+        leaves = self._level_nodes[self._depth]
+        leaf_lbounds = self._lbound + leaf_size * _node_indices(leaves)
+
+        self._source_basis = _basis_at_points(
+            self._sources,
+            self._source_order,
+            self._source_ptr,
+            leaf_lbounds,
+            leaf_size,
+            nodes,
+            weights,
+        )
+        self._target_basis = _basis_at_points(
+            self._targets,
+            self._target_order,
+            self._target_ptr,
+            leaf_lbounds,
+            leaf_size,
+            nodes,
+            weights,
+        )
+
+        # The parent basis functions at the Chebychev points of the lower
+        # and upper child interval.
+        child_basis = [
+            _lagrange_basis_matrix(nodes, weights, 0.5 * (nodes - 1) + bit)
+            for bit in range(2)
+        ]
+        self._m2m_operators = _np.array(
+            [
+                _np.kron(
+                    _np.kron(child_basis[octant & 1], child_basis[(octant >> 1) & 1]),
+                    child_basis[(octant >> 2) & 1],
+                )
+                for octant in range(8)
+            ]
+        )
+
+        self._m2l_operators = []
+        self._m2l_source_bases = []
+        self._m2l_target_bases = []
+        for level in range(2, self._depth + 1):
+            if self._mode == "laplace" and level > 2:
+                # The Laplace kernel is homogeneous of degree -1. The
+                # operators of finer levels are scaled coarse operators.
+                operators = 2.0 ** (level - 2) * self._m2l_operators[0]
+                source_basis = self._m2l_source_bases[0]
+                target_basis = self._m2l_target_bases[0]
+            else:
+                (
+                    operators,
+                    source_basis,
+                    target_basis,
+                ) = self._compressed_m2l_operators(self._box_sizes[level])
+            self._m2l_operators.append(operators)
+            self._m2l_source_bases.append(source_basis)
+            self._m2l_target_bases.append(target_basis)
+
+    def _compressed_m2l_operators(self, box_size):
+        """
+        Compute the compressed M2L operators for boxes of a given size.
+
+        The kernel matrices K_o between the Chebychev points of a box
+        and of a box with offset o are approximated as U C_o V^H, where
+        U and V are the dominant left and right singular vectors of all
+        K_o. Returns the array of C_o for all 7 x 7 x 7 offsets, the
+        matrix V and the matrix U.
+        """
+        from bempp.api.utils.interpolation import chebychev_tensor_points_3d
+
+        offsets = [
+            offset
+            for offset in _np.ndindex(7, 7, 7)
+            if _np.max(_np.abs(_np.array(offset) - 3)) > 1
+        ]
+        target_points = chebychev_tensor_points_3d(
+            _np.zeros(3), box_size * _np.ones(3), self._nodes
+        )
+
+        def kernel_matrix(offset):
+            """Evaluate the kernel between a box and its offset box."""
+            lbound = -box_size * (_np.array(offset) - 3.0)
+            source_points = chebychev_tensor_points_3d(
+                lbound, lbound + box_size, self._nodes
+            )
+            return self._kernel(
+                _np.ascontiguousarray(target_points.T),
+                _np.ascontiguousarray(source_points.T),
+                self._kernel_parameters,
+                _np.dtype("float64"),
+                self._kernel_type,
+            ).reshape(len(target_points), len(source_points), 4)[:, :, 0]
+
+        npoints = len(target_points)
+        left_gram = _np.zeros((npoints, npoints), dtype=self._kernel_type)
+        right_gram = _np.zeros((npoints, npoints), dtype=self._kernel_type)
+        for offset in offsets:
+            mat = kernel_matrix(offset)
+            left_gram += mat @ mat.conj().T
+            right_gram += mat.conj().T @ mat
+
+        left_values, left_vectors = _np.linalg.eigh(left_gram)
+        right_values, right_vectors = _np.linalg.eigh(right_gram)
+
+        # The eigenvalues are the squared singular values in ascending order.
+        tolerance = (0.1**self._order) ** 2
+        rank = max(
+            _np.count_nonzero(left_values > tolerance * left_values[-1]),
+            _np.count_nonzero(right_values > tolerance * right_values[-1]),
+        )
+        target_basis = left_vectors[:, ::-1][:, :rank]
+        source_basis = right_vectors[:, ::-1][:, :rank]
+
+        operators = _np.zeros((343, rank, rank), dtype=self._kernel_type)
+        for offset in offsets:
+            operators[_np.ravel_multi_index(offset, (7, 7, 7))] = (
+                target_basis.conj().T @ kernel_matrix(offset) @ source_basis
+            )
+
+        return operators, _np.ascontiguousarray(source_basis.conj().T), target_basis
+
+    def _evaluate_fmm(self, vec):
+        """Evaluate the Fmm with Chebychev interpolation."""
+        charges = vec.reshape(self.number_of_source_points, -1)
+        ncharges = charges.shape[1]
+
+        if _np.iscomplexobj(charges) and self._kernel_type == _np.float64:
+            # Evaluate real and imaginary parts together with the real kernel.
+            result = self._evaluate_charges(
+                _np.hstack([charges.real, charges.imag]).astype("float64")
+            )
+            result = result[:, :, :ncharges] + 1j * result[:, :, ncharges:]
+        else:
+            result = self._evaluate_charges(charges.astype(self._kernel_type))
+
+        if vec.ndim == 1:
+            return result[:, :, 0]
+        return result
+
+    def _evaluate_charges(self, charges):
+        """Evaluate the Fmm for an N x K array of charges of kernel type."""
+        depth = self._depth
+        ncharges = charges.shape[1]
+        npoints = len(self._nodes) ** 3
+
+        result = _p2p(
+            self._targets,
+            self._target_order,
+            self._target_ptr,
+            self._sources,
+            self._source_order,
+            self._source_ptr,
+            self._near_field,
+            charges,
+            self._kernel,
+            self._kernel_parameters,
+        )
+
+        if depth < 2:
+            return result
+
+        # Upward pass
+        multipoles = [None] * (depth + 1)
+        multipoles[depth] = _p2m(
+            self._source_basis,
+            self._source_order,
+            self._source_ptr,
+            charges,
+            len(self._nodes),
+        )
+        for level in range(depth, 2, -1):
+            parent_multipoles = _np.zeros(
+                (len(self._level_nodes[level - 1]), npoints, ncharges),
+                dtype=charges.dtype,
+            )
+            for octant, children in enumerate(self._octants[level]):
+                parent_multipoles[self._parents[level][children]] += (
+                    self._m2m_operators[octant] @ multipoles[level][children]
+                )
+            multipoles[level - 1] = parent_multipoles
+
+        # Downward pass
+        locals_ = None
+        for level in range(2, depth + 1):
+            level_locals = _np.zeros(
+                (len(self._level_nodes[level]), npoints, ncharges),
+                dtype=charges.dtype,
+            )
+            if locals_ is not None:
+                for octant, children in enumerate(self._octants[level]):
+                    level_locals[children] += (
+                        self._m2m_operators[octant].T
+                        @ locals_[self._parents[level][children]]
+                    )
+            level_locals += self._m2l_target_bases[level - 2] @ self._m2l(
+                level, multipoles[level]
+            )
+            locals_ = level_locals
+
+        _l2p(
+            result,
+            self._target_basis,
+            self._target_order,
+            self._target_ptr,
+            self._local_derivatives(locals_),
+            len(self._nodes),
+        )
+
+        return result
+
+    def _m2l(self, level, multipoles):
+        """
+        Apply the compressed M2L operators of a level.
+
+        A node interacts with at most one node of a given offset, so that
+        all interactions with the same offset are applied with a single
+        matrix product.
+        """
+        nnodes, _, ncharges = multipoles.shape
+        operators = self._m2l_operators[level - 2]
+        rank = operators.shape[1]
+
+        compressed_multipoles = _np.ascontiguousarray(
+            (self._m2l_source_bases[level - 2] @ multipoles).transpose(1, 0, 2)
+        )
+        compressed_locals = _np.zeros(
+            (rank, nnodes, ncharges), dtype=compressed_multipoles.dtype
+        )
+        for offset, targets, sources in self._m2l_pairs[level]:
+            compressed_locals[:, targets] += (
+                operators[offset] @ compressed_multipoles[:, sources].reshape(rank, -1)
+            ).reshape(rank, len(targets), ncharges)
+
+        return compressed_locals.transpose(1, 0, 2)
+
+    def _local_derivatives(self, leaf_locals):
+        """
+        Return the local expansions and their derivatives in the leaves.
+
+        The result has the shape (nleaves, 4, npoints, ncharges), where
+        the second axis contains the local expansion and the expansions
+        of its derivatives in x, y and z direction.
+        """
+        nleaves, npoints, ncharges = leaf_locals.shape
+        nnodes = len(self._nodes)
+        scaled_diff = (
+            2.0 / self._box_sizes[self._depth]
+        ) * self._differentiation_matrix
+
+        values = leaf_locals.reshape(nleaves, nnodes, nnodes, nnodes, ncharges)
+        return _np.ascontiguousarray(
+            _np.stack(
+                [
+                    values,
+                    _np.einsum("ij,ljbck->libck", scaled_diff, values),
+                    _np.einsum("ij,lajck->laick", scaled_diff, values),
+                    _np.einsum("ij,labjk->labik", scaled_diff, values),
+                ],
+                axis=1,
+            ).reshape(nleaves, 4, npoints, ncharges)
+        )
+
+
+def _sort_by_leaf(point_leaves, nleaves):
+    """Return the points sorted by leaf and an index pointer to the leaves."""
+    order = _np.argsort(point_leaves, kind="stable")
+    ptr = _np.zeros(nleaves + 1, dtype="int64")
+    ptr[1:] = _np.cumsum(_np.bincount(point_leaves, minlength=nleaves))
+    return order, ptr
+
+
+def _group_by_offset(level_nodes, targets, sources):
+    """
+    Group the M2L interactions of a level by the offset of the nodes.
+
+    The interactions are given by the positions of target and source
+    nodes in level_nodes. Returns a list of tuples (offset, targets,
+    sources), where offset is the index of the offset in a 7 x 7 x 7
+    array.
+    """
+    difference = (
+        _node_indices(level_nodes[targets]) - _node_indices(level_nodes[sources]) + 3
+    )
+    offsets = _np.ravel_multi_index(difference.T, (7, 7, 7))
+
+    order = _np.argsort(offsets, kind="stable")
+    offsets, targets, sources = offsets[order], targets[order], sources[order]
+    unique_offsets, starts = _np.unique(offsets, return_index=True)
+    ends = _np.append(starts[1:], len(offsets))
+    return [
+        (offset, targets[start:end], sources[start:end])
+        for offset, start, end in zip(unique_offsets, starts, ends)
+    ]
+
+
+@_numba.njit(cache=True)
+def _node_indices(nodes):
+    """Return the integer coordinates of nodes given by Morton indices."""
+    indices = _np.empty((len(nodes), 3), dtype=_np.int64)
+    for index in range(len(nodes)):
+        ind1, ind2, ind3 = de_morton(nodes[index])
+        indices[index, 0] = ind1
+        indices[index, 1] = ind2
+        indices[index, 2] = ind3
+    return indices
+
+
+@_numba.njit(cache=True)
+def _lagrange_basis(nodes, weights, point):
+    """Evaluate the Lagrange basis on the nodes at a point in [-1, 1]."""
+    nnodes = len(nodes)
+    values = _np.zeros(nnodes, dtype=_np.float64)
+    for index in range(nnodes):
+        if point == nodes[index]:
+            values[index] = 1
+            return values
+    denominator = 0.0
+    for index in range(nnodes):
+        values[index] = weights[index] / (point - nodes[index])
+        denominator += values[index]
+    return values / denominator
+
+
+def _lagrange_basis_matrix(nodes, weights, points):
+    """Return the Lagrange basis functions (rows) at the points (columns)."""
+    return _np.array([_lagrange_basis(nodes, weights, point) for point in points]).T
+
+
+@_numba.njit(cache=True)
+def _basis_at_points(points, order, ptr, leaf_lbounds, leaf_size, nodes, weights):
+    """Return the Lagrange basis along each dimension at each point."""
+    basis = _np.empty((points.shape[1], 3, len(nodes)), dtype=_np.float64)
+    for leaf in range(len(ptr) - 1):
+        for index in range(ptr[leaf], ptr[leaf + 1]):
+            point = order[index]
+            for dim in range(3):
+                local = (
+                    2 * (points[dim, point] - leaf_lbounds[leaf, dim]) / leaf_size - 1
+                )
+                local = min(1.0, max(-1.0, local))
+                basis[point, dim] = _lagrange_basis(nodes, weights, local)
+    return basis
+
+
+@_numba.njit(parallel=True, cache=True)
+def _p2m(basis, order, ptr, charges, nnodes):
+    """Compute the multipole expansions of the leaves."""
+    nleaves = len(ptr) - 1
+    ncharges = charges.shape[1]
+    multipoles = _np.zeros((nleaves, nnodes**3, ncharges), dtype=charges.dtype)
+    for leaf in _numba.prange(nleaves):
+        for index in range(ptr[leaf], ptr[leaf + 1]):
+            point = order[index]
+            for i in range(nnodes):
+                for j in range(nnodes):
+                    factor = basis[point, 0, i] * basis[point, 1, j]
+                    for k in range(nnodes):
+                        value = factor * basis[point, 2, k]
+                        node = (i * nnodes + j) * nnodes + k
+                        for charge in range(ncharges):
+                            multipoles[leaf, node, charge] += (
+                                value * charges[point, charge]
+                            )
+    return multipoles
+
+
+@_numba.njit(parallel=True, cache=True)
+def _l2p(result, basis, order, ptr, local_expansions, nnodes):
+    """Add the values and gradients of the local expansions at the targets."""
+    nleaves = len(ptr) - 1
+    ncharges = result.shape[2]
+    for leaf in _numba.prange(nleaves):
+        for index in range(ptr[leaf], ptr[leaf + 1]):
+            point = order[index]
+            for i in range(nnodes):
+                for j in range(nnodes):
+                    factor = basis[point, 0, i] * basis[point, 1, j]
+                    for k in range(nnodes):
+                        value = factor * basis[point, 2, k]
+                        node = (i * nnodes + j) * nnodes + k
+                        for component in range(4):
+                            for charge in range(ncharges):
+                                result[point, component, charge] += (
+                                    value
+                                    * local_expansions[leaf, component, node, charge]
+                                )
+
+
+@_numba.njit(parallel=True)
+def _p2p(
+    targets,
+    target_order,
+    target_ptr,
+    sources,
+    source_order,
+    source_ptr,
+    near_field,
+    charges,
+    kernel,
+    kernel_parameters,
+):
+    """Evaluate the near field interactions between the leaves."""
+    dtype = sources.dtype
+    ncharges = charges.shape[1]
+    result = _np.zeros((targets.shape[1], 4, ncharges), dtype=charges.dtype)
+
+    for leaf in _numba.prange(len(target_ptr) - 1):
+        ntargets = target_ptr[leaf + 1] - target_ptr[leaf]
+        if ntargets == 0:
+            continue
+        target_indices = target_order[target_ptr[leaf] : target_ptr[leaf + 1]]
+        local_targets = _np.empty((3, ntargets), dtype=dtype)
+        for index in range(ntargets):
+            local_targets[:, index] = targets[:, target_indices[index]]
+
+        for neighbor in near_field[leaf]:
+            if neighbor == -1:
+                continue
+            nsources = source_ptr[neighbor + 1] - source_ptr[neighbor]
+            if nsources == 0:
+                continue
+            source_indices = source_order[
+                source_ptr[neighbor] : source_ptr[neighbor + 1]
+            ]
+            local_sources = _np.empty((3, nsources), dtype=dtype)
+            for index in range(nsources):
+                local_sources[:, index] = sources[:, source_indices[index]]
+
+            values = kernel(
+                local_targets, local_sources, kernel_parameters, dtype, charges.dtype
+            )
+            for target in range(ntargets):
+                for source in range(nsources):
+                    for component in range(4):
+                        value = values[4 * (target * nsources + source) + component]
+                        for charge in range(ncharges):
+                            result[target_indices[target], component, charge] += (
+                                value * charges[source_indices[source], charge]
+                            )
+
+    return result
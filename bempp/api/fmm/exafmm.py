@@ -1,7 +1,10 @@
 """Main interface class to ExaFMM."""
+
 import numpy as _np
 import atexit as _atexit
 
+from bempp.api.fmm.interface import FmmInterfaceBase
+
 FMM_TMP_DIR = None
 
 
@@ -15,7 +18,17 @@ def cleanup_fmm_tmp():
             tmp_file.unlink()
 
 
-class ExafmmInterface(object):
+def _remove_file(filename):
+    """Remove a file and ignore errors."""
+    import os
+
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+class ExafmmInterface(FmmInterfaceBase):
     """Interface to Exafmm."""
 
     def __init__(
@@ -33,6 +46,7 @@ class ExafmmInterface(object):
         """Instantiate an Exafmm session."""
         import bempp.api
         import os
+        import weakref
         from bempp.api.utils.helpers import create_unique_id
 
         global FMM_TMP_DIR
@@ -56,6 +70,7 @@ class ExafmmInterface(object):
             raise FileExistsError("Could not create temporary filename for Exafmm.")
 
         self._fname = fname
+        self._tmp_file_finalizer = weakref.finalize(self, _remove_file, fname)
         self._singular_correction = singular_correction
 
         self._source_points = source_points
@@ -122,153 +137,50 @@ class ExafmmInterface(object):
                 )
 
     @property
-    def number_of_source_points(self):
-        """Return number of source points."""
-        return len(self._source_points)
-
-    @property
-    def number_of_target_points(self):
-        """Return number of target points."""
-        return len(self._target_points)
-
-    def evaluate(self, vec, apply_singular_correction=True):
-        """Evalute the Fmm."""
-        import bempp.api
-        from bempp.api.fmm.helpers import debug_fmm
-
-        with bempp.api.Timer(message="Evaluating Fmm."):
-            self._module.update_charges(self._tree, vec)
-            self._module.clear_values(self._tree)
-
-            with bempp.api.Timer(message="Calling ExaFMM."):
-                if bempp.api.GLOBAL_PARAMETERS.fmm.dense_evaluation:
-                    from bempp.api.fmm.helpers import dense_interaction_evaluator
-
-                    result = dense_interaction_evaluator(
-                        self._target_points,
-                        self._source_points,
-                        vec,
-                        self._mode,
-                        self._kernel_parameters,
-                    )
-                else:
-                    result = self._module.evaluate(self._tree, self._fmm)
-                if bempp.api.GLOBAL_PARAMETERS.fmm.debug:
-                    debug_fmm(
-                        self._target_points,
-                        self._source_points,
-                        vec,
-                        self._mode,
-                        self._kernel_parameters,
-                        result,
-                    )
-
-            if apply_singular_correction and self._singular_correction is not None:
-                result -= (self._singular_correction @ vec).reshape([-1, 4])
-
-            return result
+    def nbytes(self):
+        """
+        Return an estimate of the memory used by the interface.
 
-    def as_matrix(self):
-        """Return matrix representation of Fmm."""
-        import numpy as np
+        This counts the source and target points, the singular correction
+        and the Exafmm precomputation file. The memory of the Exafmm tree
+        is estimated from the number of source and target points.
+        """
+        import os
 
-        ident = np.identity(self.number_of_source_points)
+        nbytes = super().nbytes
 
-        res = np.zeros(
-            (self.number_of_target_points, self.number_of_source_points),
-            dtype="float64",
-        )
+        # Each tree body stores its position, charge and value.
+        nbytes += 80 * (self.number_of_source_points + self.number_of_target_points)
 
-        for index in range(self.number_of_source_points):
-            res[:, index] = self.evaluate(ident[:, index])[:, 0]
+        if os.path.exists(self._fname):
+            nbytes += os.path.getsize(self._fname)
 
-        return res
+        return nbytes
 
-    @classmethod
-    def from_grid(
-        cls, source_grid, mode, wavenumber=None, target_grid=None, precision="double"
-    ):
-        """
-        Initialise an Exafmm instance from a given source and target grid.
-
-        Parameters
-        ----------
-        source_grid : Grid object
-            Grid for the source points.
-        mode: string
-            Fmm mode. One of 'laplace', 'helmholtz', or 'modified_helmholtz'
-        wavenumber : real number
-            For Helmholtz or modified Helmholtz the wavenumber.
-        target_grid : Grid object
-            An optional target grid. If not provided the source and target
-            grid are assumed to be identical.
-        precision : string
-            Either 'single' or 'double'. Currently, the Fmm is always
-            executed in double precision.
+    def remove_tmp_file(self):
         """
-        import bempp.api
-        from bempp.api.integration.triangle_gauss import rule
-        from bempp.api.fmm.helpers import get_local_interaction_operator
-        import numpy as np
-
-        quadrature_order = bempp.api.GLOBAL_PARAMETERS.quadrature.regular
+        Remove the Exafmm precomputation file of this interface.
 
-        local_points, weights = rule(quadrature_order)
-
-        if target_grid is None:
-            target_grid = source_grid
-
-        source_points = source_grid.map_to_point_cloud(
-            quadrature_order, precision=precision
-        )
+        The file is only needed while the interface is set up. It is
+        otherwise removed when the interface is garbage collected.
+        """
+        self._tmp_file_finalizer()
 
-        if target_grid != source_grid:
-            target_points = target_grid.map_to_point_cloud(
-                quadrature_order, precision=precision
-            )
-        else:
-            target_points = source_points
+    def _evaluate_fmm(self, vec):
+        """
+        Evaluate the Fmm with Exafmm.
 
-        singular_correction = None
+        The Exafmm tree stores a single charge per body, so an N x K
+        array of charges is evaluated with one tree traversal per
+        column. The tree and the precomputed operators are reused.
+        """
+        if vec.ndim == 1:
+            return self._evaluate_exafmm(vec)
 
-        if target_grid == source_grid:
-            # Require singular correction terms.
+        return _np.stack([self._evaluate_exafmm(charges) for charges in vec.T], axis=-1)
 
-            if mode == "laplace":
-                singular_correction = get_local_interaction_operator(
-                    source_grid,
-                    local_points,
-                    "laplace",
-                    np.array([], dtype="float64"),
-                    precision,
-                    False,
-                )
-            elif mode == "helmholtz":
-                singular_correction = get_local_interaction_operator(
-                    source_grid,
-                    local_points,
-                    "helmholtz",
-                    np.array([wavenumber, 0], dtype="float64"),
-                    precision,
-                    True,
-                )
-            elif mode == "modified_helmholtz":
-                singular_correction = get_local_interaction_operator(
-                    source_grid,
-                    local_points,
-                    "modified_helmholtz",
-                    np.array([wavenumber], dtype="float64"),
-                    precision,
-                    False,
-                )
-        return cls(
-            source_points,
-            target_points,
-            mode,
-            wavenumber=wavenumber,
-            depth=bempp.api.GLOBAL_PARAMETERS.fmm.depth,
-            expansion_order=bempp.api.GLOBAL_PARAMETERS.fmm.expansion_order,
-            ncrit=bempp.api.GLOBAL_PARAMETERS.fmm.ncrit,
-            precision=precision,
-            singular_correction=singular_correction,
-        )
+    def _evaluate_exafmm(self, vec):
+        """Evaluate the Fmm with Exafmm for a single charge vector."""
+        self._module.update_charges(self._tree, _np.ascontiguousarray(vec))
+        self._module.clear_values(self._tree)
+        return self._module.evaluate(self._tree, self._fmm)
@@ -1,10 +1,14 @@
 """Implementation of an FMM Assembler."""
+
 from bempp.api.assembly import assembler as _assembler
+import collections as _collections
+import threading as _threading
 import numba as _numba
 import numpy as _np
 
-_FMM_CACHE = {}
-_FMM_POTENTIAL_CACHE = {}
+_FMM_CACHE = _collections.OrderedDict()
+_FMM_CACHE_LOCK = _threading.Lock()
+_FMM_CACHE_STATISTICS = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
 
 
 def get_mode_from_operator_identifier(identifier):
@@ -24,46 +28,82 @@ def get_mode_from_operator_identifier(identifier):
         raise ValueError("Unknown identifier string.")
 
 
-def get_fmm_interface(domain, dual_to_range, mode, wavenumber):
+def get_fmm_interface_class(parameters=None):
+    """
+    Return the Fmm interface class selected by parameters.fmm.engine.
+
+    The engine is either 'exafmm' or 'chebychev'.
+    """
+    import bempp.api
+
+    if parameters is None:
+        parameters = bempp.api.GLOBAL_PARAMETERS
+
+    engine = parameters.fmm.engine
+
+    if engine == "exafmm":
+        from bempp.api.fmm.exafmm import ExafmmInterface
+
+        return ExafmmInterface
+    elif engine == "chebychev":
+        from bempp.api.fmm.chebychev import ChebychevFmmInterface
+
+        return ChebychevFmmInterface
+    else:
+        raise ValueError(f"Unknown Fmm engine '{engine}'.")
+
+
+def get_fmm_interface(domain, dual_to_range, mode, wavenumber, parameters=None):
     """Get an Fmm instance."""
     import bempp.api
 
-    global _FMM_CACHE
+    interface_class = get_fmm_interface_class(parameters)
 
-    key = (domain.grid.id, dual_to_range.grid.id, mode, wavenumber)
+    key = (
+        "boundary",
+        domain.grid.id,
+        dual_to_range.grid.id,
+        mode,
+        wavenumber,
+        interface_class.__name__,
+    )
 
-    interface = _FMM_CACHE.get(key, None)
+    interface = _fmm_cache_lookup(key)
 
     if interface is None:
-        from bempp.api.fmm.exafmm import ExafmmInterface
-
-        interface = ExafmmInterface.from_grid(
+        interface = interface_class.from_grid(
             domain.grid, mode, wavenumber=wavenumber, target_grid=dual_to_range.grid
         )
-        _FMM_CACHE[key] = interface
+        _fmm_cache_insert(key, interface, parameters)
     else:
         bempp.api.log("Using cached Fmm Interface.", level="debug")
 
     return interface
 
 
-def get_fmm_potential_interface(space, points, mode, wavenumber):
+def get_fmm_potential_interface(space, points, mode, wavenumber, parameters=None):
+    """Get an Fmm instance for the evaluation of potentials."""
     import bempp.api
 
-    global _FMM_POTENTIAL_CACHE
+    interface_class = get_fmm_interface_class(parameters)
 
     points_hash = hash(points.data.tobytes())
 
-    key = (space.grid.id, points_hash, mode, wavenumber)
+    key = (
+        "potential",
+        space.grid.id,
+        points_hash,
+        mode,
+        wavenumber,
+        interface_class.__name__,
+    )
 
-    interface = _FMM_POTENTIAL_CACHE.get(key, None)
+    interface = _fmm_cache_lookup(key)
 
     if interface is None:
-        from bempp.api.fmm.exafmm import ExafmmInterface
-
         quadrature_order = bempp.api.GLOBAL_PARAMETERS.quadrature.regular
 
-        interface = ExafmmInterface(
+        interface = interface_class(
             space.grid.map_to_point_cloud(quadrature_order, precision="double"),
             points.T,
             mode,
@@ -72,13 +112,66 @@ def get_fmm_potential_interface(space, points, mode, wavenumber):
             bempp.api.GLOBAL_PARAMETERS.fmm.expansion_order,
             bempp.api.GLOBAL_PARAMETERS.fmm.ncrit,
         )
-        _FMM_POTENTIAL_CACHE[key] = interface
+        _fmm_cache_insert(key, interface, parameters)
     else:
         bempp.api.log("Using cached Fmm Interface.", level="debug")
 
     return interface
 
 
+def _fmm_cache_lookup(key):
+    """Return a cached Fmm interface or None and update the statistics."""
+    with _FMM_CACHE_LOCK:
+        entry = _FMM_CACHE.get(key)
+        if entry is None:
+            _FMM_CACHE_STATISTICS["misses"] += 1
+            return None
+        _FMM_CACHE.move_to_end(key)
+        _FMM_CACHE_STATISTICS["hits"] += 1
+        return entry[0]
+
+
+def _fmm_cache_insert(key, interface, parameters):
+    """
+    Insert an Fmm interface into the cache.
+
+    Least recently used interfaces are evicted until the cache holds at
+    most parameters.fmm.cache_entries interfaces that use at most
+    parameters.fmm.cache_size MB. Evicted interfaces have their Exafmm
+    precomputation file removed.
+    """
+    import bempp.api
+
+    if parameters is None:
+        parameters = bempp.api.GLOBAL_PARAMETERS
+
+    max_bytes = parameters.fmm.cache_size * 1024**2
+    max_entries = parameters.fmm.cache_entries
+
+    if max_bytes <= 0 or max_entries <= 0:
+        return
+
+    nbytes = interface.nbytes
+    evicted = []
+
+    with _FMM_CACHE_LOCK:
+        if nbytes > max_bytes or key in _FMM_CACHE:
+            return
+        _FMM_CACHE[key] = (interface, nbytes)
+        _FMM_CACHE_STATISTICS["bytes"] += nbytes
+        while (
+            _FMM_CACHE_STATISTICS["bytes"] > max_bytes or len(_FMM_CACHE) > max_entries
+        ):
+            _, (evicted_interface, evicted_bytes) = _FMM_CACHE.popitem(last=False)
+            _FMM_CACHE_STATISTICS["bytes"] -= evicted_bytes
+            _FMM_CACHE_STATISTICS["evictions"] += 1
+            evicted.append(evicted_interface)
+
+    for evicted_interface in evicted:
+        bempp.api.log("Evicting Fmm Interface from cache.", level="debug")
+        evicted_interface.remove_tmp_file()
+
+
 def create_evaluator(
     operator_descriptor, fmm_interface, domain, dual_to_range, parameters
 ):
@@ -135,7 +228,7 @@ class FmmPotentialAssembler(object):
             wavenumber = operator_descriptor.options[0]
 
         fmm_potential_interface = get_fmm_potential_interface(
-            space, points, mode, wavenumber
+            space, points, mode, wavenumber, parameters
         )
         self._evaluator = create_potential_evaluator(
             operator_descriptor, fmm_potential_interface, space, parameters
@@ -183,7 +276,7 @@ class FmmAssembler(_assembler.AssemblerBase):
             wavenumber = operator_descriptor.options[0]
 
         fmm_interface = get_fmm_interface(
-            actual_domain, actual_dual_to_range, mode, wavenumber
+            actual_domain, actual_dual_to_range, mode, wavenumber, self.parameters
         )
 
         self._evaluator = create_evaluator(
@@ -211,12 +304,44 @@ class FmmAssembler(_assembler.AssemblerBase):
                 "x must have shape (N, ) or (N, 1), where N is number of elements."
             )
 
-        result = self._evaluator(x.ravel())
+        result = self._evaluator(x.reshape([-1, 1]))
 
         if ndim == 1:
-            return result
+            return result.ravel()
         else:
-            return result.reshape([-1, 1])
+            return result
+
+    def matmat(self, x):
+        """
+        Perform a product with a block of vectors.
+
+        All columns of x are evaluated together so that each Fmm
+        evaluation is done once for the whole block.
+        """
+        return self._evaluator(x)
+
+
+def _evaluate_batch(fmm_interface, charges):
+    """
+    Evaluate the Fmm for a list of charges in a single batch.
+
+    Each entry of charges is either a vector of length N or an N x K
+    array. Returns a list with the corresponding M x 4 or M x 4 x K
+    results.
+    """
+    columns = [charge.reshape(len(charge), -1) for charge in charges]
+    ncols = columns[0].shape[1]
+
+    result = fmm_interface.evaluate(_np.hstack(columns))
+
+    blocks = [
+        result[:, :, index * ncols : (index + 1) * ncols]
+        for index in range(len(charges))
+    ]
+
+    if charges[0].ndim == 1:
+        return [block[:, :, 0] for block in blocks]
+    return blocks
 
 
 def make_scalar_hypersingular(
@@ -249,53 +374,48 @@ def make_scalar_hypersingular(
             dual_to_range, bempp.api.GLOBAL_PARAMETERS.quadrature.regular
         )
 
-    def evaluate_laplace_hypersingular(x):
-        """Evaluate the Laplace hypersingular kernel."""
+    def evaluate_curls(x):
+        """Evaluate the surface curl part of the hypersingular kernels."""
 
-        fmm_res0 = (
-            target_curls_trans[0] @ fmm_interface.evaluate(source_curls[0] @ x)[:, 0]
-        )
-        fmm_res1 = (
-            target_curls_trans[1] @ fmm_interface.evaluate(source_curls[1] @ x)[:, 0]
-        )
-        fmm_res2 = (
-            target_curls_trans[2] @ fmm_interface.evaluate(source_curls[2] @ x)[:, 0]
+        fmm_res = _evaluate_batch(
+            fmm_interface, [source_curls[index] @ x for index in range(3)]
         )
 
-        return fmm_res0 + fmm_res1 + fmm_res2 + singular_part @ x
+        return sum(
+            target_curls_trans[index] @ fmm_res[index][:, 0] for index in range(3)
+        )
 
-    def evaluate_helmholtz_hypersingular(x):
-        """Evaluate the Helmholtz hypersingular kernel."""
+    def evaluate_curls_and_normals(x):
+        """Evaluate the surface curl and the normal part in one batch."""
 
-        wavenumber = operator_descriptor.options[0]
         x_transformed = source_map @ x
 
-        fmm_res0 = (
-            target_curls_trans[0] @ fmm_interface.evaluate(source_curls[0] @ x)[:, 0]
+        fmm_res = _evaluate_batch(
+            fmm_interface,
+            [source_curls[index] @ x for index in range(3)]
+            + [source_normals[:, [index]] * x_transformed for index in range(3)],
         )
-        fmm_res1 = (
-            target_curls_trans[1] @ fmm_interface.evaluate(source_curls[1] @ x)[:, 0]
+
+        first_part = sum(
+            target_curls_trans[index] @ fmm_res[index][:, 0] for index in range(3)
         )
-        fmm_res2 = (
-            target_curls_trans[2] @ fmm_interface.evaluate(source_curls[2] @ x)[:, 0]
+
+        second_part = target_map @ sum(
+            target_normals[:, [index]] * fmm_res[3 + index][:, 0] for index in range(3)
         )
 
-        first_part = fmm_res0 + fmm_res1 + fmm_res2
+        return first_part, second_part
 
-        fmm_n1 = (
-            target_normals[:, 0]
-            * fmm_interface.evaluate(source_normals[:, 0] * x_transformed)[:, 0]
-        )
-        fmm_n2 = (
-            target_normals[:, 1]
-            * fmm_interface.evaluate(source_normals[:, 1] * x_transformed)[:, 0]
-        )
-        fmm_n3 = (
-            target_normals[:, 2]
-            * fmm_interface.evaluate(source_normals[:, 2] * x_transformed)[:, 0]
-        )
+    def evaluate_laplace_hypersingular(x):
+        """Evaluate the Laplace hypersingular kernel."""
+
+        return evaluate_curls(x) + singular_part @ x
 
-        second_part = target_map @ (fmm_n1 + fmm_n2 + fmm_n3)
+    def evaluate_helmholtz_hypersingular(x):
+        """Evaluate the Helmholtz hypersingular kernel."""
+
+        wavenumber = operator_descriptor.options[0]
+        first_part, second_part = evaluate_curls_and_normals(x)
 
         return first_part - wavenumber * wavenumber * second_part + singular_part @ x
 
@@ -303,34 +423,7 @@ def make_scalar_hypersingular(
         """Evaluate the modified Helmholtz hypersingular kernel."""
 
         wavenumber = operator_descriptor.options[0]
-        x_transformed = source_map @ x
-
-        fmm_res0 = (
-            target_curls_trans[0] @ fmm_interface.evaluate(source_curls[0] @ x)[:, 0]
-        )
-        fmm_res1 = (
-            target_curls_trans[1] @ fmm_interface.evaluate(source_curls[1] @ x)[:, 0]
-        )
-        fmm_res2 = (
-            target_curls_trans[2] @ fmm_interface.evaluate(source_curls[2] @ x)[:, 0]
-        )
-
-        first_part = fmm_res0 + fmm_res1 + fmm_res2
-
-        fmm_n1 = (
-            target_normals[:, 0]
-            * fmm_interface.evaluate(source_normals[:, 0] * x_transformed)[:, 0]
-        )
-        fmm_n2 = (
-            target_normals[:, 1]
-            * fmm_interface.evaluate(source_normals[:, 1] * x_transformed)[:, 0]
-        )
-        fmm_n3 = (
-            target_normals[:, 2]
-            * fmm_interface.evaluate(source_normals[:, 2] * x_transformed)[:, 0]
-        )
-
-        second_part = target_map @ (fmm_n1 + fmm_n2 + fmm_n3)
+        first_part, second_part = evaluate_curls_and_normals(x)
 
         return first_part + wavenumber * wavenumber * second_part + singular_part @ x
 
@@ -373,7 +466,9 @@ def make_default_scalar(operator_descriptor, fmm_interface, domain, dual_to_rang
 
         x_transformed = source_map @ x
         fmm_res = np.sum(
-            fmm_interface.evaluate(x_transformed)[:, 1:] * target_normals, axis=1
+            fmm_interface.evaluate(x_transformed)[:, 1:, :]
+            * target_normals[:, :, np.newaxis],
+            axis=1,
         )
         return target_map @ fmm_res + singular_part @ x
 
@@ -382,11 +477,12 @@ def make_default_scalar(operator_descriptor, fmm_interface, domain, dual_to_rang
 
         x_transformed = source_map @ x
 
-        fmm_res1 = fmm_interface.evaluate(source_normals[:, 0] * x_transformed)[:, 1]
-        fmm_res2 = fmm_interface.evaluate(source_normals[:, 1] * x_transformed)[:, 2]
-        fmm_res3 = fmm_interface.evaluate(source_normals[:, 2] * x_transformed)[:, 3]
+        fmm_res = _evaluate_batch(
+            fmm_interface,
+            [source_normals[:, [index]] * x_transformed for index in range(3)],
+        )
 
-        fmm_res = -(fmm_res1 + fmm_res2 + fmm_res3)
+        fmm_res = -sum(fmm_res[index][:, 1 + index] for index in range(3))
 
         return target_map @ fmm_res + singular_part @ x
 
@@ -645,7 +741,8 @@ def compute_rwg_div_transform(space, quadrature_order):
     return (
         aslinearoperator(
             coo_matrix(
-                (data, (iind, jind)), shape=(npoints * number_of_elements, dof_count),
+                (data, (iind, jind)),
+                shape=(npoints * number_of_elements, dof_count),
             ).tocsr()
         )
         @ aslinearoperator(space.map_to_localised_space)
@@ -654,7 +751,8 @@ def compute_rwg_div_transform(space, quadrature_order):
         @ aslinearoperator(space.map_to_localised_space.T)
         @ aslinearoperator(
             coo_matrix(
-                (data, (jind, iind)), shape=(dof_count, npoints * number_of_elements),
+                (data, (jind, iind)),
+                shape=(dof_count, npoints * number_of_elements),
             ).tocsr()
         ),
     )
@@ -730,11 +828,12 @@ def make_default_scalar_potential(operator_descriptor, fmm_interface, space):
         """Evaluate the double-layer operator."""
         x_transformed = source_map @ x
 
-        fmm0 = fmm_interface.evaluate(source_normals[:, 0] * x_transformed)[:, 1]
-        fmm1 = fmm_interface.evaluate(source_normals[:, 1] * x_transformed)[:, 2]
-        fmm2 = fmm_interface.evaluate(source_normals[:, 2] * x_transformed)[:, 3]
+        fmm_res = _evaluate_batch(
+            fmm_interface,
+            [source_normals[:, index] * x_transformed for index in range(3)],
+        )
 
-        return -(fmm0 + fmm1 + fmm2).reshape([1, -1])
+        return -sum(fmm_res[index][:, 1 + index] for index in range(3)).reshape([1, -1])
 
     if "single" in operator_descriptor.identifier:
         return evaluate_single_layer
@@ -762,20 +861,17 @@ def make_maxwell_electric_field_boundary(
     def evaluate(x):
         """Evaluate the electric field operator."""
 
-        result = _np.zeros(dual_to_range.global_dof_count, dtype=_np.complex128)
+        fmm_res = _evaluate_batch(
+            fmm_interface,
+            [domain_rwg_map[index] @ x for index in range(3)] + [domain_div_map @ x],
+        )
 
-        for index in range(3):
-            result += (
-                dual_rwg_map[index]
-                @ fmm_interface.evaluate(domain_rwg_map[index] @ x)[:, 0]
-            )
+        result = sum(
+            dual_rwg_map[index] @ fmm_res[index][:, 0] for index in range(3)
+        ).astype(_np.complex128)
 
         result *= -1j * wavenumber
-        result -= (
-            1
-            / (1j * wavenumber)
-            * (dual_div_map @ fmm_interface.evaluate(domain_div_map @ x))[:, 0]
-        )
+        result -= 1 / (1j * wavenumber) * (dual_div_map @ fmm_res[3][:, 0])
         return result + singular_part @ x
 
     return evaluate
@@ -802,30 +898,27 @@ def make_maxwell_magnetic_field_boundary(
     def evaluate(x):
         """Evaluate the magnetic field operator."""
 
-        result = _np.zeros(dual_to_range.global_dof_count, dtype=_np.complex128)
-
         vals = [
-            fmm_interface.evaluate(domain_rwg_map[0] @ x)[:, 1:],
-            fmm_interface.evaluate(domain_rwg_map[1] @ x)[:, 1:],
-            fmm_interface.evaluate(domain_rwg_map[2] @ x)[:, 1:],
+            fmm_res[:, 1:]
+            for fmm_res in _evaluate_batch(
+                fmm_interface, [domain_rwg_map[index] @ x for index in range(3)]
+            )
         ]
 
         # Now compute the curl
 
-        curl_val = _np.hstack(
-            [
-                (vals[2][:, 1] - vals[1][:, 2]).reshape(-1, 1),
-                (vals[0][:, 2] - vals[2][:, 0]).reshape(-1, 1),
-                (vals[1][:, 0] - vals[0][:, 1]).reshape(-1, 1),
-            ]
-        )
+        curl_val = [
+            vals[2][:, 1] - vals[1][:, 2],
+            vals[0][:, 2] - vals[2][:, 0],
+            vals[1][:, 0] - vals[0][:, 1],
+        ]
 
         # Finally, compute the negative inner product
 
         result = -(
-            dual_rwg_map[0] @ curl_val[:, 0]
-            + dual_rwg_map[1] @ curl_val[:, 1]
-            + dual_rwg_map[2] @ curl_val[:, 2]
+            dual_rwg_map[0] @ curl_val[0]
+            + dual_rwg_map[1] @ curl_val[1]
+            + dual_rwg_map[2] @ curl_val[2]
         )
 
         return result + singular_part @ x
@@ -847,17 +940,13 @@ def make_maxwell_electric_field_potential(operator_descriptor, fmm_interface, sp
     def evaluate(x):
         """Evaluate the potential operator."""
 
+        fmm_res = _evaluate_batch(
+            fmm_interface, [rwg_map[index] @ x for index in range(3)] + [div_map @ x]
+        )
+
         res = (
-            1j
-            * wavenumber
-            * _np.vstack(
-                [
-                    fmm_interface.evaluate(rwg_map[0] @ x)[:, 0],
-                    fmm_interface.evaluate(rwg_map[1] @ x)[:, 0],
-                    fmm_interface.evaluate(rwg_map[2] @ x)[:, 0],
-                ]
-            )
-            - 1.0 / (1j * wavenumber) * fmm_interface.evaluate(div_map @ x)[:, 1:].T
+            1j * wavenumber * _np.vstack([fmm_res[index][:, 0] for index in range(3)])
+            - 1.0 / (1j * wavenumber) * fmm_res[3][:, 1:].T
         )
 
         return res
@@ -880,9 +969,10 @@ def make_maxwell_magnetic_field_potential(operator_descriptor, fmm_interface, sp
         """Evaluate the potential operator."""
 
         vals = [
-            fmm_interface.evaluate(rwg_map[0] @ x)[:, 1:],
-            fmm_interface.evaluate(rwg_map[1] @ x)[:, 1:],
-            fmm_interface.evaluate(rwg_map[2] @ x)[:, 1:],
+            fmm_res[:, 1:]
+            for fmm_res in _evaluate_batch(
+                fmm_interface, [rwg_map[index] @ x for index in range(3)]
+            )
         ]
 
         # Now compute the curl
@@ -901,8 +991,23 @@ def make_maxwell_magnetic_field_potential(operator_descriptor, fmm_interface, sp
 
 def clear_fmm_cache():
     """Clean the FMM cache."""
-    global _FMM_CACHE
-    global _FMM_POTENTIAL_CACHE
+    with _FMM_CACHE_LOCK:
+        interfaces = [entry[0] for entry in _FMM_CACHE.values()]
+        _FMM_CACHE.clear()
+        _FMM_CACHE_STATISTICS["bytes"] = 0
+
+    for interface in interfaces:
+        interface.remove_tmp_file()
+
 
-    _FMM_CACHE = {}
-    _FMM_POTENTIAL_CACHE = {}
+def fmm_cache_statistics():
+    """
+    Return statistics of the Fmm interface cache.
+
+    Returns a dictionary with the number of hits, misses, evictions,
+    the number of cached interfaces and their estimated bytes.
+    """
+    with _FMM_CACHE_LOCK:
+        statistics = dict(_FMM_CACHE_STATISTICS)
+        statistics["entries"] = len(_FMM_CACHE)
+    return statistics
@@ -5,7 +5,12 @@ M_INV_4PI = 1.0 / (4 * _np.pi)
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def laplace_kernel(target_points, source_points, kernel_parameters, dtype, result_type):
     """Evaluate the Laplace kernel."""
@@ -43,7 +48,12 @@ def laplace_kernel(target_points, source_points, kernel_parameters, dtype, resul
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def modified_helmholtz_kernel(
     target_points, source_points, kernel_parameters, dtype, result_type
@@ -87,7 +97,12 @@ def modified_helmholtz_kernel(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_kernel(
     target_points, source_points, kernel_parameters, dtype, result_type
@@ -622,7 +637,7 @@ def debug_fmm(targets, sources, charges, mode, kernel_parameters, fmm_result):
 
     dense_result = dense_interaction_evaluator(
         targets, sources, charges, mode, kernel_parameters
-    ).reshape(-1, 4)
+    ).reshape(fmm_result.shape)
 
     rel_error = _np.max(_np.abs(dense_result - fmm_result) / _np.abs(fmm_result))
 
@@ -642,16 +657,16 @@ def dense_interaction_evaluator(targets, sources, charges, mode, kernel_paramete
     sources : ndarray
         N x 3 array of source points.
     charges : ndarray
-        N array of charges.
+        N array of charges or N x K array of K charge vectors.
     mode : string
         Either 'laplace', 'helmholtz', 'modified_helmholtz'
     kernel_parameters : ndarray
         Array with kernel parameters
-    kernel_type : dtype
-        Type of the kernel (numpy.float64 or numpy.complex128)
 
     Returns the dense evaluation of the interaction between sources
-    and targets with the given charges.
+    and targets with the given charges as an M x 4 array, or as an
+    M x 4 x K array for K charge vectors. The kernel values are only
+    computed once for all charge vectors.
     """
     if mode == "laplace":
         kernel = laplace_kernel
@@ -665,9 +680,18 @@ def dense_interaction_evaluator(targets, sources, charges, mode, kernel_paramete
     else:
         raise ValueError("Unknown value for 'kernel_function'.")
 
-    return dense_interaction_evaluator_impl(
-        targets, sources, charges, kernel, kernel_parameters, kernel_type
-    ).reshape(-1, 4)
+    result = dense_interaction_evaluator_impl(
+        targets,
+        sources,
+        charges.reshape(len(sources), -1),
+        kernel,
+        kernel_parameters,
+        kernel_type,
+    )
+
+    if charges.ndim == 1:
+        return result.reshape(-1, 4)
+    return result.reshape(-1, 4, charges.shape[1])
 
 
 @_numba.jit(
@@ -686,7 +710,7 @@ def dense_interaction_evaluator_impl(
     sources : ndarray
         N x 3 array of source points.
     charges : ndarray
-        N array of charges.
+        N x K array of charges.
     kernel : Numba function object
         The kernel object (either helpers.laplace,
         helpers.helmholtz or helpers.modified_helmholtz)
@@ -696,7 +720,7 @@ def dense_interaction_evaluator_impl(
         Type of the kernel (numpy.float64 or numpy.complex128)
 
     Returns the dense evaluation of the interaction between sources
-    and targets with the given charges.
+    and targets with the given charges as a (4 * M) x K array.
     """
     dtype = sources.dtype
 
@@ -705,15 +729,18 @@ def dense_interaction_evaluator_impl(
 
     ntargets = targets.shape[1]
     nsources = sources.shape[1]
-    result = _np.zeros(4 * ntargets, dtype=kernel_type)
+    ncharges = charges.shape[1]
+    result = _np.zeros((4 * ntargets, ncharges), dtype=kernel_type)
 
     for target_index in _numba.prange(ntargets):
         current_target = targets[:, target_index].copy().reshape((3, 1))
         vals = kernel(current_target, sources, kernel_parameters, dtype, kernel_type)
         for source_index in range(nsources):
             for local_index in range(4):
-                result[4 * target_index + local_index] += (
-                    vals[4 * source_index + local_index] * charges[source_index]
-                )
+                val = vals[4 * source_index + local_index]
+                for charge_index in range(ncharges):
+                    result[4 * target_index + local_index, charge_index] += (
+                        val * charges[source_index, charge_index]
+                    )
 
     return result
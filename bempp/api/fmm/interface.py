@@ -0,0 +1,197 @@
+"""Base class for Fmm interfaces."""
+
+import abc as _abc
+
+import numpy as _np
+
+
+class FmmInterfaceBase(_abc.ABC):
+    """
+    Base class of the Fmm interfaces.
+
+    Derived classes set the attributes _source_points, _target_points,
+    _mode, _kernel_parameters and _singular_correction and implement
+    _evaluate_fmm, which evaluates the Fmm for a vector of length N or
+    an N x K array of charges without singular correction.
+    """
+
+    @property
+    def number_of_source_points(self):
+        """Return number of source points."""
+        return len(self._source_points)
+
+    @property
+    def number_of_target_points(self):
+        """Return number of target points."""
+        return len(self._target_points)
+
+    @property
+    def singular_correction(self):
+        """Return the sparse singular correction matrix or None."""
+        return self._singular_correction
+
+    @property
+    def nbytes(self):
+        """
+        Return an estimate of the memory used by the interface.
+
+        This counts the source and target points and the singular
+        correction.
+        """
+        from scipy.sparse import issparse
+
+        nbytes = self._source_points.nbytes + self._target_points.nbytes
+
+        # Only sparse singular corrections store their matrix. Evaluated
+        # corrections compute their values on the fly.
+        correction = getattr(self._singular_correction, "A", None)
+        if issparse(correction):
+            nbytes += sum(
+                getattr(correction, name).nbytes
+                for name in ["data", "indices", "indptr"]
+            )
+
+        return nbytes
+
+    def remove_tmp_file(self):
+        """Remove temporary files of the interface."""
+
+    def evaluate(self, vec, apply_singular_correction=True):
+        """
+        Evalute the Fmm.
+
+        The charges vec are either a vector of length N or an N x K
+        array of K charge vectors, where N is the number of source
+        points. The result is an M x 4 array, or an M x 4 x K array for
+        K charge vectors, where M is the number of target points.
+        """
+        import bempp.api
+        from bempp.api.fmm.helpers import debug_fmm
+
+        with bempp.api.Timer(message="Evaluating Fmm."):
+
+            with bempp.api.Timer(message="Calling Fmm engine."):
+                if bempp.api.GLOBAL_PARAMETERS.fmm.dense_evaluation:
+                    from bempp.api.fmm.helpers import dense_interaction_evaluator
+
+                    result = dense_interaction_evaluator(
+                        self._target_points,
+                        self._source_points,
+                        vec,
+                        self._mode,
+                        self._kernel_parameters,
+                    )
+                else:
+                    result = self._evaluate_fmm(vec)
+                if bempp.api.GLOBAL_PARAMETERS.fmm.debug:
+                    debug_fmm(
+                        self._target_points,
+                        self._source_points,
+                        vec,
+                        self._mode,
+                        self._kernel_parameters,
+                        result,
+                    )
+
+            if apply_singular_correction and self._singular_correction is not None:
+                result -= (self._singular_correction @ vec).reshape(result.shape)
+
+            return result
+
+    @_abc.abstractmethod
+    def _evaluate_fmm(self, vec):
+        """Evaluate the Fmm without singular correction."""
+
+    def as_matrix(self):
+        """Return matrix representation of Fmm."""
+        ident = _np.identity(self.number_of_source_points)
+
+        return self.evaluate(ident)[:, 0, :]
+
+    @classmethod
+    def from_grid(
+        cls, source_grid, mode, wavenumber=None, target_grid=None, precision="double"
+    ):
+        """
+        Initialise an Fmm instance from a given source and target grid.
+
+        Parameters
+        ----------
+        source_grid : Grid object
+            Grid for the source points.
+        mode: string
+            Fmm mode. One of 'laplace', 'helmholtz', or 'modified_helmholtz'
+        wavenumber : real number
+            For Helmholtz or modified Helmholtz the wavenumber.
+        target_grid : Grid object
+            An optional target grid. If not provided the source and target
+            grid are assumed to be identical.
+        precision : string
+            Either 'single' or 'double'. Currently, the Fmm is always
+            executed in double precision.
+        """
+        import bempp.api
+        from bempp.api.integration.triangle_gauss import rule
+        from bempp.api.fmm.helpers import get_local_interaction_operator
+
+        quadrature_order = bempp.api.GLOBAL_PARAMETERS.quadrature.regular
+
+        local_points, weights = rule(quadrature_order)
+
+        if target_grid is None:
+            target_grid = source_grid
+
+        source_points = source_grid.map_to_point_cloud(
+            quadrature_order, precision=precision
+        )
+
+        if target_grid != source_grid:
+            target_points = target_grid.map_to_point_cloud(
+                quadrature_order, precision=precision
+            )
+        else:
+            target_points = source_points
+
+        singular_correction = None
+
+        if target_grid == source_grid:
+            # Require singular correction terms.
+
+            if mode == "laplace":
+                singular_correction = get_local_interaction_operator(
+                    source_grid,
+                    local_points,
+                    "laplace",
+                    _np.array([], dtype="float64"),
+                    precision,
+                    False,
+                )
+            elif mode == "helmholtz":
+                singular_correction = get_local_interaction_operator(
+                    source_grid,
+                    local_points,
+                    "helmholtz",
+                    _np.array([wavenumber, 0], dtype="float64"),
+                    precision,
+                    True,
+                )
+            elif mode == "modified_helmholtz":
+                singular_correction = get_local_interaction_operator(
+                    source_grid,
+                    local_points,
+                    "modified_helmholtz",
+                    _np.array([wavenumber], dtype="float64"),
+                    precision,
+                    False,
+                )
+        return cls(
+            source_points,
+            target_points,
+            mode,
+            wavenumber=wavenumber,
+            depth=bempp.api.GLOBAL_PARAMETERS.fmm.depth,
+            expansion_order=bempp.api.GLOBAL_PARAMETERS.fmm.expansion_order,
+            ncrit=bempp.api.GLOBAL_PARAMETERS.fmm.ncrit,
+            precision=precision,
+            singular_correction=singular_correction,
+        )
@@ -54,52 +54,12 @@ class Grid(object):
         self._element_to_vertex_matrix = None
         self._element_to_element_matrix = None
 
-        self._normalize_and_assign_input(vertices, elements, domain_indices)
-        self._enumerate_edges()
-
-        self._get_element_adjacency_for_edges_and_vertices()
-        self._compute_geometric_quantities()
-
-        self._compute_boundary_information()
-
-        self._compute_edge_neighbors()
-        self._compute_vertex_neighbors()
-
-        self._grid_data_double = GridDataDouble(
-            self._vertices,
-            self._elements,
-            self._edges,
-            self._element_edges,
-            self._volumes,
-            self._normals,
-            self._jacobians,
-            self._jacobian_inverse_transposed,
-            self._diameters,
-            self._integration_elements,
-            self._centroids,
-            self._domain_indices,
-            self._vertex_on_boundary,
-            self._element_neighbors.indices,
-            self._element_neighbors.indexptr,
-        )
+        self._grid_data_double = None
+        self._grid_data_single = None
 
-        self._grid_data_single = GridDataFloat(
-            self._vertices.astype("float32"),
-            self._elements,
-            self._edges,
-            self._element_edges,
-            self._volumes.astype("float32"),
-            self._normals.astype("float32"),
-            self._jacobians.astype("float32"),
-            self._jacobian_inverse_transposed.astype("float32"),
-            self._diameters.astype("float32"),
-            self._integration_elements.astype("float32"),
-            self._centroids.astype("float32"),
-            self._domain_indices,
-            self._vertex_on_boundary,
-            self._element_neighbors.indices,
-            self._element_neighbors.indexptr,
-        )
+        # Only the input is processed here. The topological and geometric
+        # data is computed on first access.
+        self._normalize_and_assign_input(vertices, elements, domain_indices)
 
         self._is_scattered = False
 
@@ -109,7 +69,7 @@ class Grid(object):
             log(
                 (
                     f"Created grid with id {self.id}. Elements: {self.number_of_elements}. "
-                    + f"Edges: {self.number_of_edges}. Vertices: {self.number_of_vertices}"
+                    + f"Vertices: {self.number_of_vertices}"
                 )
             )
 
@@ -125,6 +85,8 @@ class Grid(object):
         connectivity via edges see edge_adjacency.
 
         """
+        if self._vertex_adjacency is None:
+            self._compute_element_adjacency()
         return self._vertex_adjacency
 
     @property
@@ -138,11 +100,17 @@ class Grid(object):
         identical to vertex v11 in element e1, and vertex v01 in
         element 0 is identical to vertex v12 in element e1.
         """
+        if self._edge_adjacency is None:
+            self._compute_element_adjacency()
         return self._edge_adjacency
 
     @property
     def element_to_vertex_matrix(self):
         """Return the matrix mapping vertices to elements."""
+        if self._element_to_vertex_matrix is None:
+            self._element_to_vertex_matrix = get_element_to_vertex_matrix(
+                self._vertices, self._elements
+            )
         return self._element_to_vertex_matrix
 
     @property
@@ -153,6 +121,10 @@ class Grid(object):
         If entry (i,j) has the value n > 0, element i
         and element j are connected via n vertices.
         """
+        if self._element_to_element_matrix is None:
+            self._element_to_element_matrix = get_element_to_element_matrix(
+                self._vertices, self._elements
+            )
         return self._element_to_element_matrix
 
     @property
@@ -166,6 +138,13 @@ class Grid(object):
         Note that the element i is contained in the list of neighbors.
 
         """
+        from bempp.helpers import IndexList
+
+        if self._element_neighbors is None:
+            self._element_neighbors = IndexList(
+                self.element_to_element_matrix.indices,
+                self.element_to_element_matrix.indptr,
+            )
         return self._element_neighbors
 
     @property
@@ -176,7 +155,7 @@ class Grid(object):
     @property
     def number_of_edges(self):
         """Number of edges."""
-        return self._edges.shape[1]
+        return self.edges.shape[1]
 
     @property
     def number_of_elements(self):
@@ -196,11 +175,15 @@ class Grid(object):
     @property
     def edges(self):
         """Return edges."""
+        if self._edges is None:
+            self._enumerate_edges()
         return self._edges
 
     @property
     def centroids(self):
         """Return the centroids of the elements."""
+        if self._centroids is None:
+            self._compute_geometric_quantities()
         return self._centroids
 
     @property
@@ -217,6 +200,8 @@ class Grid(object):
         in the jth element.
 
         """
+        if self._element_edges is None:
+            self._enumerate_edges()
         return self._element_edges
 
     @property
@@ -256,11 +241,15 @@ class Grid(object):
     @property
     def volumes(self):
         """Return element volumes."""
+        if self._volumes is None:
+            self._compute_geometric_quantities()
         return self._volumes
 
     @property
     def diameters(self):
         """Return element diameters."""
+        if self._diameters is None:
+            self._compute_geometric_quantities()
         return self._diameters
 
     @property
@@ -276,43 +265,70 @@ class Grid(object):
     @property
     def normals(self):
         """Return normals."""
+        if self._normals is None:
+            self._compute_geometric_quantities()
         return self._normals
 
     @property
     def jacobians(self):
         """Return Jacobians."""
+        if self._jacobians is None:
+            self._compute_geometric_quantities()
         return self._jacobians
 
     @property
     def integration_elements(self):
         """Return integration elements."""
+        if self._integration_elements is None:
+            self._compute_geometric_quantities()
         return self._integration_elements
 
     @property
     def jacobian_inverse_transposed(self):
         """Return the jacobian inverse transposed."""
+        if self._jacobian_inverse_transposed is None:
+            self._compute_geometric_quantities()
         return self._jacobian_inverse_transposed
 
     @property
     def vertex_on_boundary(self):
         """Return vertex boundary information."""
+        if self._vertex_on_boundary is None:
+            self._compute_boundary_information()
         return self._vertex_on_boundary
 
     @property
     def edge_on_boundary(self):
         """Return edge boundary information."""
+        if self._edge_on_boundary is None:
+            self._compute_boundary_information()
         return self._edge_on_boundary
 
     @property
     def edge_neighbors(self):
         """Return for each edge the list of neighboring elements.."""
+        if self._edge_neighbors is None:
+            self._compute_edge_neighbors()
         return self._edge_neighbors
 
     def data(self, precision="double"):
-        """Return Numba container with all relevant grid data."""
+        """
+        Return Numba container with all relevant grid data.
+
+        The containers are created on first request, so that single
+        precision copies of the data are only made if needed.
+        """
         if precision == "double":
+            if self._grid_data_double is None:
+                self._grid_data_double = self._create_grid_data(
+                    GridDataDouble, "float64"
+                )
             return self._grid_data_double
         elif precision == "single":
+            if self._grid_data_single is None:
+                self._grid_data_single = self._create_grid_data(
+                    GridDataFloat, "float32"
+                )
             return self._grid_data_single
         else:
             raise ValueError("precision must be one of 'single', 'double'")
@@ -320,6 +336,8 @@ class Grid(object):
     @property
     def vertex_neighbors(self):
         """Return for each vertex the list of neighboring elements."""
+        if self._vertex_neighbors is None:
+            self._compute_vertex_neighbors()
         return self._vertex_neighbors
 
     @property
@@ -433,46 +451,49 @@ class Grid(object):
 
         return grid_to_points(self.data("double"), local_points)
 
-    def refine(self):
-        """Return a new grid with all elements refined."""
+    def refine(self, levels=1):
+        """
+        Return a new grid with all elements refined.
 
-        new_number_of_vertices = self.number_of_edges + self.number_of_vertices
+        Each refinement splits every element into four elements by
+        connecting the edge midpoints. With levels > 1 the refinement is
+        repeated without creating the intermediate grids.
+        """
+        if levels < 1:
+            raise ValueError("The number of refinement levels must be at least 1.")
 
-        new_vertices = _np.empty(
-            (3, new_number_of_vertices), dtype="float64", order="F"
+        vertices, elements = _refine_connectivity(
+            self.vertices, self.elements, self.edges, self.element_edges
         )
 
-        new_vertices[:, : self.number_of_vertices] = self.vertices
-
-        # Each edge midpoint forms a new vertex.
-        new_vertices[:, self.number_of_vertices :] = 0.5 * (
-            self.vertices[:, self.edges[0, :]] + self.vertices[:, self.edges[1, :]]
-        )
+        for _ in range(levels - 1):
+            edges, element_edges = _enumerate_edges(elements)
+            vertices, elements = _refine_connectivity(
+                vertices, elements, edges, element_edges
+            )
 
-        new_elements = _np.empty(
-            (3, 4 * self.number_of_elements), order="F", dtype="uint32"
+        return Grid(vertices, elements, _np.repeat(self.domain_indices, 4**levels))
+
+    def _create_grid_data(self, container, dtype):
+        """Create a Numba grid data container with floats of type dtype."""
+        return container(
+            self.vertices.astype(dtype, copy=False),
+            self.elements,
+            self.edges,
+            self.element_edges,
+            self.volumes.astype(dtype, copy=False),
+            self.normals.astype(dtype, copy=False),
+            self.jacobians.astype(dtype, copy=False),
+            self.jacobian_inverse_transposed.astype(dtype, copy=False),
+            self.diameters.astype(dtype, copy=False),
+            self.integration_elements.astype(dtype, copy=False),
+            self.centroids.astype(dtype, copy=False),
+            self.domain_indices,
+            self.vertex_on_boundary,
+            self.element_neighbors.indices,
+            self.element_neighbors.indexptr,
         )
 
-        new_domain_indices = _np.repeat(self.domain_indices, 4)
-
-        for index, elem in enumerate(self.elements.T):
-            vertex0 = elem[0]
-            vertex1 = elem[1]
-            vertex2 = elem[2]
-            vertex01 = self.element_edges[0, index] + self.number_of_vertices
-            vertex20 = self.element_edges[1, index] + self.number_of_vertices
-            vertex12 = self.element_edges[2, index] + self.number_of_vertices
-
-            new_elements[:, 4 * index] = [vertex0, vertex01, vertex20]
-
-            new_elements[:, 4 * index + 1] = [vertex01, vertex1, vertex12]
-
-            new_elements[:, 4 * index + 2] = [vertex12, vertex2, vertex20]
-
-            new_elements[:, 4 * index + 3] = [vertex01, vertex12, vertex20]
-
-        return Grid(new_vertices, new_elements, new_domain_indices)
-
     def _compute_vertex_neighbors(self):
         """Return all elements adjacent to a given vertex."""
         from bempp.helpers import IndexList
@@ -509,18 +530,9 @@ class Grid(object):
 
         """
 
-        # The following would be better defined inside the njitted routiine.
-        # But Numba then throws an error that it cannot find the UniTuple type.
-        edge_tuple_to_index = _numba.typed.Dict.empty(
-            key_type=_numba.types.containers.UniTuple(_numba.types.int64, 2),
-            value_type=_numba.types.int64,
-        )
+        self._edges, self._element_edges = _enumerate_edges(self._elements)
 
-        self._edges, self._element_edges = _numba_enumerate_edges(
-            self._elements, edge_tuple_to_index
-        )
-
-    def _get_element_adjacency_for_edges_and_vertices(self):
+    def _compute_element_adjacency(self):
         """Get element adjacency.
 
         The array edge_adjacency has 6 rows, such that for index j the
@@ -538,20 +550,8 @@ class Grid(object):
         (0, 1 or 2).
 
         """
-        from bempp.helpers import IndexList
-
-        self._element_to_vertex_matrix = get_element_to_vertex_matrix(
-            self._vertices, self._elements
-        )
-
-        elem_to_elem_matrix = get_element_to_element_matrix(
-            self._vertices, self._elements
-        )
-
-        self._element_to_element_matrix = elem_to_elem_matrix
-
         elements1, elements2, nvertices = _get_element_to_element_vertex_count(
-            elem_to_elem_matrix
+            self.element_to_element_matrix
         )
 
         vertex_connected_elements1, vertex_connected_elements2 = _element_filter(
@@ -570,10 +570,6 @@ class Grid(object):
             self._elements, edge_connected_elements1, edge_connected_elements2
         )
 
-        self._element_neighbors = IndexList(
-            elem_to_elem_matrix.indices, elem_to_elem_matrix.indptr
-        )
-
     def _compute_geometric_quantities(self):
         """Compute geometric quantities for the grid."""
 
@@ -610,31 +606,20 @@ class Grid(object):
             / normal_direction_norms
         )
 
-        self._volumes = volumes
-        self._normals = normals
-        self._jacobians = _np.swapaxes(
+        jacobians = _np.swapaxes(
             _np.reshape(jacobians, (self.number_of_elements, 2, 3)), 1, 2
         )
-        self._diameters = diameters
-        self._centroids = centroids
-
-        jac_transpose_jac = _np.empty((self.number_of_elements, 2, 2), dtype="float64")
-        for index in range(self.number_of_elements):
-            jac_transpose_jac[index] = self.jacobians[index].T.dot(
-                self.jacobians[index]
-            )
-        self._integration_elements = _np.sqrt(_np.linalg.det(jac_transpose_jac))
 
+        jac_transpose_jac = _np.einsum("nij,nik->njk", jacobians, jacobians)
         jac_transpose_jac_inv = _np.linalg.inv(jac_transpose_jac)
 
-        self._jacobian_inverse_transposed = _np.empty(
-            (self.number_of_elements, 3, 2), dtype="float64"
-        )
-
-        for index in range(self.number_of_elements):
-            self._jacobian_inverse_transposed[index] = self.jacobians[index].dot(
-                jac_transpose_jac_inv[index]
-            )
+        self._volumes = volumes
+        self._normals = normals
+        self._jacobians = jacobians
+        self._diameters = diameters
+        self._centroids = centroids
+        self._integration_elements = _np.sqrt(_np.linalg.det(jac_transpose_jac))
+        self._jacobian_inverse_transposed = _np.matmul(jacobians, jac_transpose_jac_inv)
 
     def _compute_boundary_information(self):
         """
@@ -663,23 +648,25 @@ class Grid(object):
         edge_to_edge = element_to_edge.T.dot(element_to_edge)
         arr1 = edge_to_edge.diagonal() == 1
         arr0 = _np.zeros(number_of_vertices, dtype=_np.bool)
-
-        for boundary_edge_index in _np.flatnonzero(arr1):
-            arr0[self.edges[:, boundary_edge_index]] = True
+        arr0[self.edges[:, arr1].ravel()] = True
 
         self._vertex_on_boundary = arr0
         self._edge_on_boundary = arr1
 
     def _compute_edge_neighbors(self):
         """Get the neighbors of each edge."""
-        edge_neighbors = [[] for _ in range(self.number_of_edges)]
-
-        for element_index in range(self.number_of_elements):
-            for local_index in range(3):
-                edge_neighbors[self.element_edges[local_index, element_index]].append(
-                    element_index
-                )
-        self._edge_neighbors = [tuple(elem) for elem in edge_neighbors]
+        edge_indices = _np.ravel(self.element_edges, order="F")
+        # A stable sort keeps the neighbors of each edge in ascending order.
+        order = _np.argsort(edge_indices, kind="stable")
+        neighbors = (order // 3).tolist()
+        indexptr = _np.zeros(self.number_of_edges + 1, dtype="int64")
+        indexptr[1:] = _np.cumsum(
+            _np.bincount(edge_indices, minlength=self.number_of_edges)
+        )
+        self._edge_neighbors = [
+            tuple(neighbors[start:end])
+            for start, end in zip(indexptr[:-1].tolist(), indexptr[1:].tolist())
+        ]
 
 
 @_numba.experimental.jitclass(
@@ -1016,7 +1003,7 @@ def get_element_to_element_matrix(vertices, elements):
     return element_to_vertex.T.dot(element_to_vertex)
 
 
-@_numba.njit(locals={"index": _numba.types.int32})
+@_numba.njit(locals={"index": _numba.types.int32}, cache=True)
 def _compare_array_to_value(array, val):
     """
     Return i such that array[i] == val.
@@ -1034,7 +1021,8 @@ def _compare_array_to_value(array, val):
         "index1": _numba.types.int32,
         "index2": _numba.types.int32,
         "full_index1": _numba.types.int32,
-    }
+    },
+    cache=True,
 )
 def _find_first_common_array_index_pair_from_position(array1, array2, start=0):
     """
@@ -1052,7 +1040,7 @@ def _find_first_common_array_index_pair_from_position(array1, array2, start=0):
     raise ValueError("Could not find a common index pair.")
 
 
-@_numba.njit(locals={"offset": _numba.types.int32})
+@_numba.njit(locals={"offset": _numba.types.int32}, cache=True)
 def _find_two_common_array_index_pairs(array1, array2):
     """Return two index pairs (i, j) such that array1[i] = array2[j]."""
     offset = 0
@@ -1067,7 +1055,7 @@ def _find_two_common_array_index_pairs(array1, array2):
     return index_pairs
 
 
-@_numba.njit()
+@_numba.njit(cache=True)
 def _get_shared_vertex_information_for_two_elements(elements, elem0, elem1):
     """
     Return tuple (i, j).
@@ -1080,7 +1068,7 @@ def _get_shared_vertex_information_for_two_elements(elements, elem0, elem1):
     return (i, j)
 
 
-@_numba.njit()
+@_numba.njit(cache=True)
 def _get_shared_edge_information_for_two_elements(elements, elem0, elem1):
     """
     Return 2x2 array of int32 indices.
@@ -1104,7 +1092,7 @@ def _get_shared_edge_information_for_two_elements(elements, elem0, elem1):
     return index_pairs
 
 
-@_numba.njit()
+@_numba.njit(cache=True)
 def _find_vertex_adjacency(elements, test_indices, trial_indices):
     """
     Return for element pairs the vertex adjacency.
@@ -1133,7 +1121,7 @@ def _find_vertex_adjacency(elements, test_indices, trial_indices):
     return adjacency
 
 
-@_numba.njit()
+@_numba.njit(cache=True)
 def _find_edge_adjacency(elements, elem0_indices, elem1_indices):
     """
     Return for element pairs the edge adjacency.
@@ -1196,7 +1184,7 @@ def _element_filter(elements1, elements2, nvertices, filter_type):
     return (elements1[filtered_indices], elements2[filtered_indices])
 
 
-@_numba.njit()
+@_numba.njit(cache=True)
 def _sort_values(val1, val2):
     """Return a tuple with the input values sorted."""
     if val1 > val2:
@@ -1204,7 +1192,7 @@ def _sort_values(val1, val2):
     return val1, val2
 
 
-@_numba.njit()
+@_numba.njit(cache=True)
 def _vertices_from_edge_index(element, local_index):
     """
     Returns the vertices associated with an edge.
@@ -1236,7 +1224,7 @@ def grid_from_segments(grid, segments):
     return Grid(new_vertices, new_elements, new_domain_indices)
 
 
-@_numba.njit
+@_numba.njit(cache=True)
 def _create_barycentric_connectivity_array(
     vertices, elements, element_edges, edges, number_of_edges
 ):
@@ -1245,9 +1233,9 @@ def _create_barycentric_connectivity_array(
     number_of_elements = elements.shape[1]
     new_number_of_vertices = number_of_vertices + number_of_elements + number_of_edges
     new_vertices = _np.empty((3, new_number_of_vertices), dtype=_np.float64)
-    new_elements = _np.empty((3, 6 * number_of_elements), dtype=_np.float64)
+    new_elements = _np.empty((3, 6 * number_of_elements), dtype=_np.uint32)
 
-    edge_to_vertex = -_np.ones(number_of_edges)
+    edge_to_vertex = -_np.ones(number_of_edges, dtype=_np.int64)
 
     new_vertices[:, :number_of_vertices] = vertices
 
@@ -1306,6 +1294,39 @@ def _create_barycentric_connectivity_array(
     return new_vertices, new_elements
 
 
+def _refine_connectivity(vertices, elements, edges, element_edges):
+    """
+    Return the vertices and elements of a refined grid.
+
+    The first vertices of the refined grid are the old vertices, followed
+    by the edge midpoints. The element with index i is split into the
+    elements 4 * i, ..., 4 * i + 3.
+    """
+    number_of_vertices = vertices.shape[1]
+    number_of_edges = edges.shape[1]
+    number_of_elements = elements.shape[1]
+
+    new_vertices = _np.empty(
+        (3, number_of_vertices + number_of_edges), dtype="float64", order="F"
+    )
+    new_vertices[:, :number_of_vertices] = vertices
+    # Each edge midpoint forms a new vertex.
+    new_vertices[:, number_of_vertices:] = 0.5 * (
+        vertices[:, edges[0]] + vertices[:, edges[1]]
+    )
+
+    vertex0, vertex1, vertex2 = elements
+    vertex01, vertex20, vertex12 = element_edges.astype("int64") + number_of_vertices
+
+    new_elements = _np.empty((3, 4 * number_of_elements), dtype="uint32", order="F")
+    new_elements[:, 0::4] = [vertex0, vertex01, vertex20]
+    new_elements[:, 1::4] = [vertex01, vertex1, vertex12]
+    new_elements[:, 2::4] = [vertex12, vertex2, vertex20]
+    new_elements[:, 3::4] = [vertex01, vertex12, vertex20]
+
+    return new_vertices, new_elements
+
+
 def barycentric_refinement(grid):
     """Return the barycentric refinement of a given grid."""
 
@@ -1470,7 +1491,19 @@ def enumerate_vertex_adjacent_elements(grid, support_elements):
     return vertex_edges
 
 
-@_numba.njit
+def _enumerate_edges(elements):
+    """Return the edges and element edges of an elements array."""
+    # The following would be better defined inside the njitted routiine.
+    # But Numba then throws an error that it cannot find the UniTuple type.
+    edge_tuple_to_index = _numba.typed.Dict.empty(
+        key_type=_numba.types.containers.UniTuple(_numba.types.int64, 2),
+        value_type=_numba.types.int64,
+    )
+
+    return _numba_enumerate_edges(elements, edge_tuple_to_index)
+
+
+@_numba.njit(cache=True)
 def _numba_enumerate_edges(elements, edge_tuple_to_index):
     """
     Enumerate all edges in a given grid.
@@ -1514,8 +1547,7 @@ def _grid_scatter_worker(grid_id, array_proxies):
 
     vertices, elements, domain_indices = pool.from_buffer(array_proxies)
 
-    # if not pool.has_key(grid_id):
-    if grid_id not in pool:
+    if not pool.has_key(grid_id):
         pool.insert_data(
             grid_id,
             Grid(vertices.copy(), elements.copy(), domain_indices.copy(), grid_id),
@@ -1,3 +1,10 @@
 from .iterative_solvers import gmres
 from .iterative_solvers import cg
+from .iterative_solvers import block_gmres
+from .iterative_solvers import block_cg
+from .iterative_solvers import RecyclingGmres
+from .preconditioners import near_field_preconditioner
+from .preconditioners import efie_calderon_preconditioner
+from .preconditioners import hypersingular_preconditioner
+from .preconditioners import single_layer_preconditioner
 from .direct_solvers import lu
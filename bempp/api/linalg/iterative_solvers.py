@@ -53,6 +53,7 @@ def gmres(
     use_strong_form=False,
     return_residuals=False,
     return_iteration_count=False,
+    M=None,
 ):
     """Interface to the scipy.sparse.linalg.gmres function.
 
@@ -60,7 +61,9 @@ def gmres(
     instead of a linear operator and a vector b it takes a boundary operator
     and a grid function or a blocked operator and a list of grid functions.
     The result is returned as a grid function or as a list of grid functions
-    in the correct spaces.
+    in the correct spaces. The optional preconditioner M approximates the
+    inverse of the weak form (or of the strong form if use_strong_form is
+    True), e.g. a near_field_preconditioner of A.
 
     """
     from bempp.api.assembly.boundary_operator import BoundaryOperator
@@ -76,6 +79,7 @@ def gmres(
             use_strong_form,
             return_residuals,
             return_iteration_count,
+            M,
         )
 
     if isinstance(A, BlockedOperatorBase):
@@ -88,6 +92,7 @@ def gmres(
             use_strong_form,
             return_residuals,
             return_iteration_count,
+            M,
         )
 
     raise ValueError("A must be a BoundaryOperator or BlockedBoundaryOperator")
@@ -101,13 +106,14 @@ def cg(
     use_strong_form=False,
     return_residuals=False,
     return_iteration_count=False,
+    M=None,
 ):
     """Interface to the scipy.sparse.linalg.cg function.
 
     This function behaves like the scipy.sparse.linalg.cg function. But
     instead of a linear operator and a vector b it takes a boundary operator
     and a grid function. The result is returned as a grid function in the
-    correct space.
+    correct space. The optional preconditioner M is passed on to scipy.
 
     """
     from bempp.api.assembly.boundary_operator import BoundaryOperator
@@ -140,7 +146,7 @@ def cg(
     bempp.api.log("Starting CG iteration")
     start_time = time.time()
     x, info = scipy.sparse.linalg.cg(
-        A_op, b_vec, tol=tol, maxiter=maxiter, callback=callback
+        A_op, b_vec, tol=tol, maxiter=maxiter, M=M, callback=callback
     )
     end_time = time.time()
     bempp.api.log(
@@ -171,6 +177,7 @@ def _gmres_single_op_imp(
     use_strong_form=False,
     return_residuals=False,
     return_iteration_count=False,
+    M=None,
 ):
     """Implementation for single operators."""
     from bempp.api.assembly.grid_function import GridFunction
@@ -202,7 +209,13 @@ def _gmres_single_op_imp(
     bempp.api.log("Starting GMRES iteration")
     start_time = time.time()
     x, info = scipy.sparse.linalg.gmres(
-        A_op, b_vec, tol=tol, restart=restart, maxiter=maxiter, callback=callback
+        A_op,
+        b_vec,
+        tol=tol,
+        restart=restart,
+        maxiter=maxiter,
+        M=M,
+        callback=callback,
     )
     end_time = time.time()
     bempp.api.log(
@@ -233,6 +246,7 @@ def _gmres_block_op_imp(
     use_strong_form=False,
     return_residuals=False,
     return_iteration_count=False,
+    M=None,
 ):
     """Implementation for blocked operators."""
     import scipy.sparse.linalg
@@ -259,7 +273,13 @@ def _gmres_block_op_imp(
     bempp.api.log("Starting GMRES iteration")
     start_time = time.time()
     x, info = scipy.sparse.linalg.gmres(
-        A_op, b_vec, tol=tol, restart=restart, maxiter=maxiter, callback=callback
+        A_op,
+        b_vec,
+        tol=tol,
+        restart=restart,
+        maxiter=maxiter,
+        M=M,
+        callback=callback,
     )
     end_time = time.time()
     bempp.api.log(
@@ -279,3 +299,620 @@ def _gmres_block_op_imp(
         return res_fun, info, callback.count
 
     return res_fun, info
+
+
+def block_gmres(
+    A,
+    b,
+    tol=1e-5,
+    restart=None,
+    maxiter=None,
+    use_strong_form=False,
+    return_residuals=False,
+    return_iteration_count=False,
+):
+    """Block GMRES for many right-hand sides.
+
+    This function solves A x = b for a list of right-hand sides at once.
+    For a boundary operator b is a list of grid functions. For a blocked
+    operator b is a list whose entries are lists of grid functions. The
+    result is returned as a list of the same structure.
+
+    All right-hand sides share one block Krylov space. Each iteration
+    applies the operator to a whole block of vectors, so that dense
+    operators use matrix-matrix products and Fmm operators evaluate
+    all vectors at once. Right-hand sides that have converged are
+    removed from the block at the next restart.
+
+    Parameters
+    ----------
+    A : BoundaryOperator or BlockedOperator
+        The operator of the system.
+    b : list
+        The right-hand sides.
+    tol : float
+        Relative tolerance for the residual of each right-hand side.
+    restart : int
+        Number of block iterations between restarts (default 20).
+    maxiter : int
+        Maximum number of restart cycles.
+    use_strong_form : bool
+        If True, solve the strong form instead of the weak form.
+    return_residuals : bool
+        If True, also return a list of arrays with the residual
+        norms of all right-hand sides after each iteration.
+    return_iteration_count : bool
+        If True, also return the number of block iterations.
+
+    Returns the list of solutions and an info value that is 0 if all
+    right-hand sides converged and the number of iterations otherwise.
+
+    """
+    import bempp.api
+    import time
+
+    A_op, b_mat, solution_from_coefficients = _block_system(A, b, use_strong_form)
+
+    if restart is None:
+        restart = 20
+    if maxiter is None:
+        maxiter = 10 * b_mat.shape[0]
+
+    callback = BlockIterationCounter(return_residuals, "Block GMRES")
+
+    bempp.api.log(f"Starting Block GMRES iteration with {b_mat.shape[1]} vectors")
+    start_time = time.time()
+    x_mat, info = _block_gmres_impl(A_op, b_mat, tol, restart, maxiter, callback)
+    end_time = time.time()
+    bempp.api.log(
+        "Block GMRES finished in %i iterations and took %.2E sec."
+        % (callback.count, end_time - start_time)
+    )
+
+    return _block_result(
+        solution_from_coefficients(x_mat),
+        info,
+        callback,
+        return_residuals,
+        return_iteration_count,
+    )
+
+
+def block_cg(
+    A,
+    b,
+    tol=1e-5,
+    maxiter=None,
+    use_strong_form=False,
+    return_residuals=False,
+    return_iteration_count=False,
+):
+    """Block CG for many right-hand sides.
+
+    This function solves A x = b for a Hermitian positive definite
+    operator A and a list of grid functions b. The parameters and the
+    return values are the same as for block_gmres.
+
+    The block search directions are A-conjugate, and each iteration
+    applies the operator once to a block of vectors. If some
+    right-hand sides converge they are removed from the block and the
+    iteration continues with the remaining ones.
+
+    """
+    import bempp.api
+    import time
+
+    A_op, b_mat, solution_from_coefficients = _block_system(A, b, use_strong_form)
+
+    if maxiter is None:
+        maxiter = 10 * b_mat.shape[0]
+
+    callback = BlockIterationCounter(return_residuals, "Block CG")
+
+    bempp.api.log(f"Starting Block CG iteration with {b_mat.shape[1]} vectors")
+    start_time = time.time()
+    x_mat, info = _block_cg_impl(A_op, b_mat, tol, maxiter, callback)
+    end_time = time.time()
+    bempp.api.log(
+        "Block CG finished in %i iterations and took %.2E sec."
+        % (callback.count, end_time - start_time)
+    )
+
+    return _block_result(
+        solution_from_coefficients(x_mat),
+        info,
+        callback,
+        return_residuals,
+        return_iteration_count,
+    )
+
+
+class BlockIterationCounter(object):
+    """Iteration counter for block solvers."""
+
+    def __init__(self, store_residuals, name):
+        self._count = 0
+        self._store_residuals = store_residuals
+        self._residuals = []
+        self._name = name
+
+    def __call__(self, residual_norms):
+        """Log an iteration with the residual norms of all vectors."""
+        from bempp.api import log
+
+        self._count += 1
+        if self._store_residuals:
+            self._residuals.append(residual_norms.copy())
+        log(
+            f"{self._name} Iteration {self._count} with maximum residual "
+            + f"{_np.max(residual_norms)}"
+        )
+
+    @property
+    def count(self):
+        """Return the number of iterations."""
+        return self._count
+
+    @property
+    def residuals(self):
+        """Return the list of residual norms."""
+        return self._residuals
+
+
+def _block_system(A, b, use_strong_form):
+    """
+    Return the discrete system for a block of right-hand sides.
+
+    Returns the discrete operator, the right-hand side matrix and a
+    function that converts solution coefficients to grid functions.
+    """
+    from bempp.api.assembly.boundary_operator import BoundaryOperator
+    from bempp.api.assembly.blocked_operator import BlockedOperatorBase
+    from bempp.api.assembly.grid_function import GridFunction
+    from bempp.api.assembly.blocked_operator import (
+        coefficients_from_grid_functions_list,
+        projections_from_grid_functions_list,
+        grid_function_list_from_coefficients,
+    )
+
+    if len(b) == 0:
+        raise ValueError("b must contain at least one right-hand side.")
+
+    if isinstance(A, BoundaryOperator):
+        if not all(isinstance(item, GridFunction) for item in b):
+            raise ValueError("b must be a list of GridFunction objects.")
+        if use_strong_form:
+            if not all(A.range.is_compatible(item.space) for item in b):
+                raise ValueError(
+                    "The range of A and the domain of A must have"
+                    + "the same number of unknowns if the strong form is used."
+                )
+            A_op = A.strong_form()
+            columns = [item.coefficients for item in b]
+        else:
+            A_op = A.weak_form()
+            columns = [item.projections(A.dual_to_range) for item in b]
+
+        def solution_from_coefficients(x_mat):
+            """Create the solution grid functions."""
+            return [GridFunction(A.domain, coefficients=x) for x in x_mat.T]
+
+    elif isinstance(A, BlockedOperatorBase):
+        if use_strong_form:
+            A_op = A.strong_form()
+            columns = [coefficients_from_grid_functions_list(item) for item in b]
+        else:
+            A_op = A.weak_form()
+            columns = [
+                projections_from_grid_functions_list(item, A.dual_to_range_spaces)
+                for item in b
+            ]
+
+        def solution_from_coefficients(x_mat):
+            """Create the lists of solution grid functions."""
+            return [
+                grid_function_list_from_coefficients(x, A.domain_spaces)
+                for x in x_mat.T
+            ]
+
+    else:
+        raise ValueError("A must be a BoundaryOperator or BlockedBoundaryOperator")
+
+    return A_op, _np.column_stack(columns), solution_from_coefficients
+
+
+def _block_result(solution, info, callback, return_residuals, return_iteration_count):
+    """Return the result tuple of a block solver."""
+    if return_residuals and return_iteration_count:
+        return solution, info, callback.residuals, callback.count
+
+    if return_residuals:
+        return solution, info, callback.residuals
+
+    if return_iteration_count:
+        return solution, info, callback.count
+
+    return solution, info
+
+
+def _block_gmres_impl(A_op, b_mat, tol, restart, maxiter, callback):
+    """
+    Restarted block GMRES.
+
+    Returns the solution matrix and 0 if all columns converged, or the
+    number of iterations otherwise.
+    """
+    dtype = _np.result_type(A_op.dtype, b_mat.dtype)
+
+    x_mat = _np.zeros(b_mat.shape, dtype=dtype)
+    r_mat = b_mat.astype(dtype)
+    b_norms = _np.linalg.norm(b_mat, axis=0)
+    b_norms[b_norms == 0] = 1
+    residual_norms = _np.linalg.norm(r_mat, axis=0) / b_norms
+    active = _np.arange(b_mat.shape[1])
+
+    for _ in range(maxiter):
+        # Remove converged columns before the next cycle.
+        keep = residual_norms[active] > tol
+        active = active[keep]
+        r_mat = r_mat[:, keep]
+        if len(active) == 0:
+            return x_mat, 0
+
+        x_mat[:, active] += _block_gmres_cycle(
+            A_op, r_mat, restart, tol, b_norms, residual_norms, active, callback
+        )
+
+        r_mat = b_mat[:, active] - A_op @ x_mat[:, active]
+        residual_norms[active] = _np.linalg.norm(r_mat, axis=0) / b_norms[active]
+
+    if _np.all(residual_norms <= tol):
+        return x_mat, 0
+    return x_mat, callback.count
+
+
+def _block_gmres_cycle(
+    A_op, r_mat, restart, tol, b_norms, residual_norms, active, callback
+):
+    """Run one block GMRES cycle and return the correction."""
+    dtype = r_mat.dtype
+    n, p = r_mat.shape
+
+    basis = _np.empty((n, (restart + 1) * p), dtype=dtype)
+    hessenberg = _np.zeros(((restart + 1) * p, restart * p), dtype=dtype)
+
+    basis[:, :p], s_mat = _np.linalg.qr(r_mat)
+
+    for j in range(restart):
+        k = (j + 1) * p
+        w = _np.asarray(A_op @ basis[:, k - p : k], dtype=dtype)
+
+        # Block classical Gram-Schmidt with reorthogonalisation
+        for _ in range(2):
+            coeffs = basis[:, :k].conj().T @ w
+            w -= basis[:, :k] @ coeffs
+            hessenberg[:k, k - p : k] += coeffs
+
+        basis[:, k : k + p], hessenberg[k : k + p, k - p : k] = _np.linalg.qr(w)
+
+        rhs = _np.zeros((k + p, p), dtype=dtype)
+        rhs[:p] = s_mat
+        y = _np.linalg.lstsq(hessenberg[: k + p, :k], rhs, rcond=None)[0]
+
+        residual_norms[active] = (
+            _np.linalg.norm(rhs - hessenberg[: k + p, :k] @ y, axis=0) / b_norms[active]
+        )
+        callback(residual_norms)
+
+        if _np.all(residual_norms[active] <= tol):
+            break
+
+    return basis[:, :k] @ y
+
+
+def _block_cg_impl(A_op, b_mat, tol, maxiter, callback):
+    """
+    Block conjugate gradients with deflation of converged columns.
+
+    Returns the solution matrix and 0 if all columns converged, or the
+    number of iterations otherwise.
+    """
+    dtype = _np.result_type(A_op.dtype, b_mat.dtype)
+
+    x_mat = _np.zeros(b_mat.shape, dtype=dtype)
+    r_mat = b_mat.astype(dtype)
+    b_norms = _np.linalg.norm(b_mat, axis=0)
+    b_norms[b_norms == 0] = 1
+    residual_norms = _np.linalg.norm(r_mat, axis=0) / b_norms
+    active = _np.arange(b_mat.shape[1])
+    p_mat = None
+
+    for _ in range(maxiter):
+        keep = residual_norms[active] > tol
+        if not _np.all(keep):
+            # Restart the search directions for the remaining columns.
+            active = active[keep]
+            r_mat = r_mat[:, keep]
+            p_mat = None
+        if len(active) == 0:
+            return x_mat, 0
+
+        if p_mat is None:
+            p_mat = r_mat.copy()
+            rr = r_mat.conj().T @ r_mat
+
+        q_mat = _np.asarray(A_op @ p_mat, dtype=dtype)
+        alpha = _np.linalg.lstsq(p_mat.conj().T @ q_mat, rr, rcond=None)[0]
+        x_mat[:, active] += p_mat @ alpha
+        r_mat -= q_mat @ alpha
+
+        residual_norms[active] = _np.linalg.norm(r_mat, axis=0) / b_norms[active]
+        callback(residual_norms)
+
+        rr_new = r_mat.conj().T @ r_mat
+        beta = _np.linalg.lstsq(rr, rr_new, rcond=None)[0]
+        p_mat = r_mat + p_mat @ beta
+        rr = rr_new
+
+    if _np.all(residual_norms <= tol):
+        return x_mat, 0
+    return x_mat, callback.count
+
+
+class RecyclingGmres(object):
+    """GMRES with Krylov subspace recycling (GCRO-DR).
+
+    A solver object that keeps a deflation subspace between solves.
+    After each restart cycle the harmonic Ritz vectors that belong to
+    the eigenvalues of smallest magnitude are kept. They are deflated
+    from the Krylov space of the next cycle and of the next call to
+    solve. For a sequence of related systems, e.g. a frequency sweep,
+    this avoids rebuilding the slowly converging directions each time.
+
+    Parameters
+    ----------
+    recycle : int
+        Dimension of the recycled subspace.
+    restart : int
+        Dimension of the search space per cycle, including the
+        recycled subspace. Must be larger than recycle.
+    tol : float
+        Relative tolerance of the residual.
+    maxiter : int
+        Maximum number of restart cycles.
+    use_strong_form : bool
+        If True, solve the strong form instead of the weak form.
+
+    Example
+    -------
+    >>> solver = RecyclingGmres(recycle=10, restart=40)
+    >>> for wavenumber in wavenumbers:
+    ...     op = helmholtz.single_layer(space, space, space, wavenumber)
+    ...     sol, info = solver.solve(op, rhs[wavenumber])
+
+    """
+
+    def __init__(
+        self, recycle=10, restart=30, tol=1e-5, maxiter=None, use_strong_form=False
+    ):
+        """Initialise the solver."""
+        if restart <= recycle:
+            raise ValueError("restart must be larger than recycle.")
+
+        self._recycle = recycle
+        self._restart = restart
+        self._tol = tol
+        self._maxiter = maxiter
+        self._use_strong_form = use_strong_form
+
+        self._u = None
+        self._c = None
+        self._operator = None
+
+    @property
+    def recycle_space(self):
+        """Return the basis of the recycled subspace or None."""
+        return self._u
+
+    def reset(self):
+        """Discard the recycled subspace."""
+        self._u = None
+        self._c = None
+        self._operator = None
+
+    def solve(self, A, b, return_residuals=False, return_iteration_count=False):
+        """Solve A x = b and update the recycled subspace.
+
+        A is a boundary operator and b a grid function, or A is a blocked
+        operator and b a list of grid functions. The return values are
+        the same as for gmres.
+
+        """
+        import bempp.api
+        import time
+
+        A_op, b_mat, solution_from_coefficients = _block_system(
+            A, [b], self._use_strong_form
+        )
+        b_vec = b_mat[:, 0]
+
+        if self._u is not None and self._u.shape[0] != len(b_vec):
+            self.reset()
+
+        callback = IterationCounter(return_residuals)
+
+        bempp.api.log("Starting recycling GMRES iteration")
+        start_time = time.time()
+        x, info = self._solve(A_op, b_vec, callback)
+        end_time = time.time()
+        bempp.api.log(
+            "Recycling GMRES finished in %i iterations and took %.2E sec."
+            % (callback.count, end_time - start_time)
+        )
+
+        return _block_result(
+            solution_from_coefficients(x.reshape([-1, 1]))[0],
+            info,
+            callback,
+            return_residuals,
+            return_iteration_count,
+        )
+
+    def _solve(self, A_op, b_vec, callback):
+        """Run GCRO-DR and return the solution vector and info."""
+        from scipy.linalg import solve_triangular
+
+        dtype = _np.result_type(A_op.dtype, b_vec.dtype)
+        is_real = not _np.iscomplexobj(_np.empty(0, dtype=dtype))
+        n = len(b_vec)
+
+        maxiter = self._maxiter
+        if maxiter is None:
+            maxiter = 10 * n
+
+        b_norm = _np.linalg.norm(b_vec)
+        if b_norm == 0:
+            b_norm = 1
+        tol = self._tol * b_norm
+
+        x = _np.zeros(n, dtype=dtype)
+        r = b_vec.astype(dtype)
+
+        if self._u is not None:
+            if self._operator is not A_op:
+                # Recompute C = A U for the new operator.
+                c, rr = _np.linalg.qr(_np.asarray(A_op @ self._u))
+                self._u = solve_triangular(rr, self._u.T, trans="T").T
+                self._c = c
+                self._operator = A_op
+            u = self._u.astype(dtype)
+            c = self._c.astype(dtype)
+            coeffs = c.conj().T @ r
+            x += u @ coeffs
+            r -= c @ coeffs
+        else:
+            u = None
+            c = None
+
+        for _ in range(maxiter):
+            if _np.linalg.norm(r) <= tol:
+                break
+
+            dx, r, g_mat, v_hat, w_mat = _gcro_dr_cycle(
+                A_op, r, u, c, self._restart, tol, b_norm, callback
+            )
+            x += dx
+
+            if self._recycle > 0:
+                k = min(self._recycle, g_mat.shape[1])
+                p_mat = _harmonic_ritz_vectors(
+                    g_mat, v_hat.conj().T @ w_mat, k, is_real
+                )
+                q, rr = _np.linalg.qr(g_mat @ p_mat)
+                c = v_hat @ q
+                u = solve_triangular(rr, (w_mat @ p_mat).T, trans="T").T
+
+        if u is not None:
+            self._u, self._c, self._operator = u, c, A_op
+
+        if _np.linalg.norm(r) <= tol:
+            return x, 0
+        return x, callback.count
+
+
+def _gcro_dr_cycle(A_op, r, u, c, restart, tol, b_norm, callback):
+    """
+    Run one GCRO-DR cycle.
+
+    The Arnoldi process is run for (I - C C^H) A, where C = A U is
+    orthonormal. Returns the update of the solution, the new residual,
+    the matrix G with A W = V G, and the bases V and W.
+    """
+    dtype = r.dtype
+    n = len(r)
+    kc = 0 if c is None else c.shape[1]
+    steps = restart - kc
+
+    if kc > 0:
+        scales = 1 / _np.linalg.norm(u, axis=0)
+    else:
+        scales = _np.zeros(0)
+
+    beta = _np.linalg.norm(r)
+    basis = _np.zeros((n, steps + 1), dtype=dtype)
+    basis[:, 0] = r / beta
+    hessenberg = _np.zeros((steps + 1, steps), dtype=dtype)
+    b_mat = _np.zeros((kc, steps), dtype=dtype)
+
+    for j in range(steps):
+        w = _np.asarray(A_op @ basis[:, j], dtype=dtype).ravel()
+        if kc > 0:
+            b_mat[:, j] = c.conj().T @ w
+            w -= c @ b_mat[:, j]
+        for _ in range(2):
+            coeffs = basis[:, : j + 1].conj().T @ w
+            w -= basis[:, : j + 1] @ coeffs
+            hessenberg[: j + 1, j] += coeffs
+        hessenberg[j + 1, j] = _np.linalg.norm(w)
+
+        breakdown = abs(hessenberg[j + 1, j]) <= 1e-14 * beta
+        if not breakdown:
+            basis[:, j + 1] = w / hessenberg[j + 1, j]
+
+        g_mat = _np.zeros((kc + j + 2, kc + j + 1), dtype=dtype)
+        g_mat[:kc, :kc] = _np.diag(scales)
+        g_mat[:kc, kc:] = b_mat[:, : j + 1]
+        g_mat[kc:, kc:] = hessenberg[: j + 2, : j + 1]
+
+        rhs = _np.zeros(kc + j + 2, dtype=dtype)
+        rhs[kc] = beta
+        y = _np.linalg.lstsq(g_mat, rhs, rcond=None)[0]
+        residual = rhs - g_mat @ y
+
+        callback(_np.linalg.norm(residual) / b_norm)
+
+        if breakdown or _np.linalg.norm(residual) <= tol:
+            break
+
+    w_mat = basis[:, : j + 1]
+    v_hat = basis[:, : j + 2]
+    if kc > 0:
+        w_mat = _np.hstack([u * scales, w_mat])
+        v_hat = _np.hstack([c, v_hat])
+
+    return w_mat @ y, v_hat @ residual, g_mat, v_hat, w_mat
+
+
+def _harmonic_ritz_vectors(g_mat, vw_mat, k, is_real):
+    """
+    Return k harmonic Ritz vectors of smallest harmonic Ritz values.
+
+    The harmonic Ritz pairs solve G^H G z = theta G^H V^H W z. For real
+    problems complex conjugate pairs are replaced by the real and
+    imaginary parts of one of the vectors.
+    """
+    from scipy.linalg import eig
+
+    values, vectors = eig(g_mat.conj().T @ g_mat, g_mat.conj().T @ vw_mat)
+    magnitudes = _np.abs(values)
+    magnitudes[~_np.isfinite(magnitudes)] = _np.inf
+    order = _np.argsort(magnitudes)
+
+    if not is_real:
+        return vectors[:, order[:k]]
+
+    columns = []
+    used = []
+    for index in order:
+        if len(columns) >= k:
+            break
+        value = values[index]
+        if any(_np.isclose(value, _np.conj(other)) for other in used):
+            continue
+        vector = vectors[:, index]
+        columns.append(_np.real(vector))
+        if abs(value.imag) > 1e-14 * abs(value):
+            used.append(value)
+            columns.append(_np.imag(vector))
+
+    return _np.linalg.qr(_np.column_stack(columns[:k]))[0]
@@ -0,0 +1,429 @@
+"""Algebraic preconditioners for boundary integral operators."""
+
+import numpy as _np
+
+
+def near_field_preconditioner(
+    A, method="ilu", drop_tol=1e-4, fill_factor=10, block_size=64
+):
+    """
+    Create a preconditioner from the sparse near field of an operator.
+
+    The near field consists of the interactions between elements that
+    share a vertex, an edge or are identical. It is assembled with the
+    singular part of the operators and is independent of the assembler,
+    so that it is also available for Fmm and H-matrix operators.
+
+    Parameters
+    ----------
+    A : BoundaryOperator or BlockedOperator
+        The operator to be preconditioned. Sums and multiples of
+        integral operators and sparse operators are supported.
+    method : string
+        Either 'ilu' for an incomplete LU decomposition of the near
+        field, or 'block_jacobi' for the exact inverses of the diagonal
+        blocks of the near field that belong to the leaves of an octree.
+    drop_tol : float
+        Drop tolerance of the incomplete LU decomposition.
+    fill_factor : float
+        Fill factor of the incomplete LU decomposition.
+    block_size : int
+        Average number of degrees of freedom per block for 'block_jacobi'.
+
+    Returns a LinearOperator that approximates the inverse of the weak
+    form of A. It can be passed as argument M to gmres and cg.
+
+    """
+    from scipy.sparse.linalg import LinearOperator, spilu
+
+    near_field = near_field_matrix(A)
+
+    if method == "ilu":
+        ilu = spilu(near_field.tocsc(), drop_tol=drop_tol, fill_factor=fill_factor)
+        return LinearOperator(
+            near_field.shape,
+            matvec=ilu.solve,
+            matmat=ilu.solve,
+            dtype=near_field.dtype,
+        )
+
+    if method == "block_jacobi":
+        groups = _dof_groups(_domain_spaces(A), block_size)
+        return _block_jacobi_inverse(near_field, groups)
+
+    raise ValueError("method must be one of 'ilu' or 'block_jacobi'.")
+
+
+def near_field_matrix(A):
+    """
+    Return the sparse near field matrix of an operator.
+
+    For blocked operators the near field matrices of the blocks are
+    combined into one sparse matrix.
+    """
+    from scipy.sparse import bmat
+    from bempp.api.assembly.blocked_operator import (
+        BlockedOperator,
+        BlockedOperatorBase,
+    )
+
+    if isinstance(A, BlockedOperatorBase):
+        if not isinstance(A, BlockedOperator):
+            raise ValueError("Only near fields of BlockedOperator objects supported.")
+        rows, cols = A.ndims
+        blocks = [[None for _ in range(cols)] for _ in range(rows)]
+        for i in range(rows):
+            for j in range(cols):
+                block = _near_field(A[i, j])
+                if block is not None:
+                    blocks[i][j] = block
+        for i in range(rows):
+            if blocks[i][i] is None:
+                raise ValueError("Diagonal blocks must not be zero.")
+        return bmat(blocks, format="csr")
+
+    result = _near_field(A)
+    if result is None:
+        raise ValueError("Operator has no near field.")
+    return result.tocsr()
+
+
+def _near_field(op):
+    """Return the near field of an operator or None for zero operators."""
+    from bempp.api.assembly.boundary_operator import (
+        BoundaryOperatorWithAssembler,
+        ZeroBoundaryOperator,
+        _ScaledBoundaryOperator,
+        _SumBoundaryOperator,
+    )
+
+    if isinstance(op, ZeroBoundaryOperator):
+        return None
+
+    if isinstance(op, _SumBoundaryOperator):
+        first = _near_field(op._op1)
+        second = _near_field(op._op2)
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return first + second
+
+    if isinstance(op, _ScaledBoundaryOperator):
+        result = _near_field(op._op)
+        if result is None:
+            return None
+        return op._alpha * result
+
+    if isinstance(op, BoundaryOperatorWithAssembler):
+        if op.assembler.implementation_name == "SparseAssembler":
+            return op.weak_form().A
+        if op.descriptor.singular_part is not None:
+            return op.descriptor.singular_part.weak_form().A
+
+    raise ValueError(
+        f"Cannot compute the near field of operators of type {type(op).__name__}."
+    )
+
+
+def _domain_spaces(A):
+    """Return the list of domain spaces of an operator."""
+    from bempp.api.assembly.blocked_operator import BlockedOperatorBase
+
+    if isinstance(A, BlockedOperatorBase):
+        return A.domain_spaces
+    return [A.domain]
+
+
+def _dof_positions(space):
+    """
+    Return the positions of the global degrees of freedom of a space.
+
+    The position of a degree of freedom is the mean of the centroids of
+    the elements in its support. Returns an array of shape (N, 3).
+    """
+    grid = space.grid
+    mask = space.local_multipliers != 0
+    elements = _np.repeat(
+        _np.arange(grid.number_of_elements), space.number_of_shape_functions
+    ).reshape(space.local2global.shape)
+
+    grid_dofs = space.local2global[mask]
+    centroids = grid.centroids[elements[mask]]
+
+    weights = _np.bincount(grid_dofs, minlength=space.grid_dof_count).astype("float64")
+    positions = _np.stack(
+        [
+            _np.bincount(grid_dofs, centroids[:, dim], minlength=space.grid_dof_count)
+            for dim in range(3)
+        ],
+        axis=1,
+    )
+
+    if space.requires_dof_transformation:
+        transformation = abs(space.dof_transformation)
+        weights = transformation.T @ weights
+        positions = transformation.T @ positions
+
+    weights[weights == 0] = 1
+    return positions / weights[:, _np.newaxis]
+
+
+def _dof_groups(spaces, block_size):
+    """Group the dofs of a list of spaces by the leaves of an octree."""
+    from bempp.api.utils.octree import Octree
+
+    groups = []
+    offset = 0
+
+    for space in spaces:
+        positions = _dof_positions(space)
+        box = space.grid.bounding_box
+        # Extend the box slightly so that all points are strictly inside.
+        extent = 1e-6 * _np.max(box[:, 1] - box[:, 0])
+        ndofs = len(positions)
+        level = max(0, int(_np.ceil(_np.log(ndofs / block_size) / _np.log(8))))
+
+        octree = Octree(
+            box[:, 0] - extent,
+            box[:, 1] + extent,
+            level,
+            _np.ascontiguousarray(positions.T),
+        )
+
+        indices = octree.sorted_indices.astype("int64")
+        index_ptr = octree.leaf_nodes_ptr.astype("int64")
+        for start, end in zip(index_ptr[:-1], index_ptr[1:]):
+            groups.append(offset + indices[start:end])
+
+        offset += ndofs
+
+    return groups
+
+
+def _block_jacobi_inverse(near_field, groups):
+    """Return the block diagonal inverse of the near field."""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.linalg import aslinearoperator
+
+    near_field = near_field.tocsr()
+
+    rows = []
+    cols = []
+    data = []
+
+    for group in groups:
+        block = near_field[group][:, group].toarray()
+        inverse = _np.linalg.inv(block)
+        rows.append(_np.repeat(group, len(group)))
+        cols.append(_np.tile(group, len(group)))
+        data.append(inverse.ravel())
+
+    inverse = coo_matrix(
+        (_np.concatenate(data), (_np.concatenate(rows), _np.concatenate(cols))),
+        shape=near_field.shape,
+    ).tocsr()
+
+    return aslinearoperator(inverse)
+
+
+def efie_calderon_preconditioner(
+    grid,
+    wavenumber,
+    parameters=None,
+    assembler="fmm",
+    device_interface=None,
+    precision=None,
+):
+    """
+    Create a Calderon preconditioner for the electric field operator.
+
+    The preconditioner is built for the electric field operator with
+    RWG domain and SNC dual to range space. It is the electric field
+    operator on the Buffa-Christiansen spaces of the barycentric
+    refinement, combined with the inverses of the stable mixed Gram
+    matrices between BC and SNC and between RWG and RBC functions.
+    The preconditioned operator is a compact perturbation of a multiple
+    of the identity, so that the number of iterations does not grow
+    under refinement.
+
+    Parameters
+    ----------
+    grid : bempp.api.Grid
+        The grid of the electric field operator.
+    wavenumber : complex
+        The wavenumber of the electric field operator.
+    parameters, assembler, device_interface, precision
+        Passed to the electric field operator on the barycentric
+        refinement. With assembler='fmm' only Fmm matrix vector
+        products and sparse LU solves are used.
+
+    Returns a LinearOperator that approximates the inverse of the
+    weak form of the electric field operator. It can be passed as
+    argument M to gmres.
+
+    """
+    import bempp.api
+    from bempp.api.operators.boundary.maxwell import electric_field
+
+    rwg = bempp.api.function_space(grid, "RWG", 0)
+    snc = bempp.api.function_space(grid, "SNC", 0)
+    bc = bempp.api.function_space(grid, "BC", 0)
+    rbc = bempp.api.function_space(grid, "RBC", 0)
+
+    efie = electric_field(
+        bc,
+        rwg,
+        rbc,
+        wavenumber,
+        parameters=parameters,
+        assembler=assembler,
+        device_interface=device_interface,
+        precision=precision,
+    )
+
+    return _chain(_inverse_gram(rwg, rbc), efie.weak_form(), _inverse_gram(bc, snc))
+
+
+def hypersingular_preconditioner(
+    grid,
+    parameters=None,
+    assembler="fmm",
+    device_interface=None,
+    precision=None,
+):
+    """
+    Create an operator preconditioner for the hypersingular operator.
+
+    The preconditioner is built for the hypersingular operator on
+    continuous P1 functions. It is the Laplace single layer operator on
+    the dual DUAL0 space of the barycentric refinement, combined with
+    the inverses of the stable mixed Gram matrices between P1 and DUAL0
+    functions. It can also be used for Helmholtz hypersingular
+    operators at moderate wavenumbers.
+
+    Parameters
+    ----------
+    grid : bempp.api.Grid
+        The grid of the hypersingular operator.
+    parameters, assembler, device_interface, precision
+        Passed to the single layer operator on the barycentric
+        refinement.
+
+    Returns a LinearOperator that approximates the inverse of the
+    weak form of the hypersingular operator.
+
+    """
+    import bempp.api
+    from bempp.api.operators.boundary.laplace import single_layer
+
+    p1 = bempp.api.function_space(grid, "P", 1)
+    dual0 = bempp.api.function_space(grid, "DUAL", 0)
+
+    slp = single_layer(
+        dual0,
+        dual0,
+        dual0,
+        parameters=parameters,
+        assembler=assembler,
+        device_interface=device_interface,
+        precision=precision,
+    )
+
+    return _chain(_inverse_gram(p1, dual0), slp.weak_form(), _inverse_gram(dual0, p1))
+
+
+def single_layer_preconditioner(
+    grid,
+    parameters=None,
+    assembler="fmm",
+    device_interface=None,
+    precision=None,
+):
+    """
+    Create an operator preconditioner for the single layer operator.
+
+    The preconditioner is built for the single layer operator on
+    piecewise constant DP0 functions. It is the Laplace hypersingular
+    operator on the dual DUAL1 space of the barycentric refinement,
+    combined with the inverses of the stable mixed Gram matrices
+    between DP0 and DUAL1 functions. The constant functions are in the
+    kernel of the hypersingular operator on closed surfaces. They are
+    mapped to the identity by adding a rank one term.
+
+    Parameters
+    ----------
+    grid : bempp.api.Grid
+        The grid of the single layer operator.
+    parameters, assembler, device_interface, precision
+        Passed to the hypersingular operator on the barycentric
+        refinement.
+
+    Returns a LinearOperator that approximates the inverse of the
+    weak form of the single layer operator.
+
+    """
+    import bempp.api
+    from scipy.sparse.linalg import LinearOperator
+    from bempp.api.operators.boundary.laplace import hypersingular
+    from bempp.api.operators.boundary.sparse import identity
+
+    dp0 = bempp.api.function_space(grid, "DP", 0)
+    dual1 = bempp.api.function_space(grid, "DUAL", 1)
+
+    hyp = hypersingular(
+        dual1,
+        dual1,
+        dual1,
+        parameters=parameters,
+        assembler=assembler,
+        device_interface=device_interface,
+        precision=precision,
+    )
+
+    weak_form = hyp.weak_form()
+    # The integrals of the basis functions, using that the DP0 basis
+    # functions sum up to one.
+    integrals = identity(dual1, dual1, dp0).weak_form().A.T @ _np.ones(
+        dp0.global_dof_count
+    )
+
+    def stabilized(x):
+        """Apply the hypersingular operator plus the rank one term."""
+        return weak_form @ x + _np.multiply.outer(integrals, integrals @ x)
+
+    stabilized_op = LinearOperator(
+        weak_form.shape, matvec=stabilized, matmat=stabilized, dtype=weak_form.dtype
+    )
+
+    return _chain(_inverse_gram(dp0, dual1), stabilized_op, _inverse_gram(dual1, dp0))
+
+
+def _chain(*operators):
+    """Return the product of linear operators, applied from right to left."""
+    from scipy.sparse.linalg import LinearOperator
+
+    def apply(x):
+        """Apply the product."""
+        for op in reversed(operators):
+            x = op @ x
+        return x
+
+    return LinearOperator(
+        (operators[0].shape[0], operators[-1].shape[1]),
+        matvec=apply,
+        matmat=apply,
+        dtype=_np.result_type(*[op.dtype for op in operators]),
+    )
+
+
+def _inverse_gram(trial_space, test_space):
+    """Return the inverse of the mixed Gram matrix of two spaces."""
+    from bempp.api.assembly.discrete_boundary_operator import (
+        InverseSparseDiscreteBoundaryOperator,
+    )
+    from bempp.api.operators.boundary.sparse import identity
+
+    return InverseSparseDiscreteBoundaryOperator(
+        identity(trial_space, trial_space, test_space).weak_form()
+    )
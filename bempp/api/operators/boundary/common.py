@@ -66,6 +66,36 @@ def create_operator(
     )
 
 
+def multitrace_block_assembler(
+    kernel, domain, dual_to_range, parameters, assembler, device_interface
+):
+    """
+    Return assembler and device interface for the blocks of a multitrace operator.
+
+    Dense assembly on the Numba device interface, or with no device
+    interface given, uses one DenseMultitraceAssembler for all four
+    blocks, which computes them in a single sweep over the element
+    pairs. Otherwise assembler and device_interface are returned
+    unchanged and each block is assembled separately.
+    """
+    import bempp.api
+    from bempp.core.dense_multitrace_assembler import DenseMultitraceAssembler
+
+    parameters = bempp.api.assign_parameters(parameters)
+
+    if (
+        assembler in ["default_nonlocal", "dense"]
+        and device_interface in [None, "numba"]
+        and not parameters.assembly.dense.out_of_core
+    ):
+        return (
+            DenseMultitraceAssembler(domain, dual_to_range, kernel, parameters),
+            "numba",
+        )
+
+    return assembler, device_interface
+
+
 def create_multitrace_operator(
     identifier,
     domain,
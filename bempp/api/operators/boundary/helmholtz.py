@@ -170,6 +170,94 @@ def hypersingular(
     )
 
 
+def wavenumber_sweep(
+    operator,
+    domain,
+    dual_to_range,
+    wavenumbers,
+    parameters=None,
+    precision=None,
+):
+    """
+    Assemble the weak forms of a Helmholtz operator for many wavenumbers.
+
+    All weak forms are assembled densely with Numba in one sweep over
+    the element pairs. The geometry, the quadrature points and the
+    distances of the point pairs are computed once and the kernel is
+    evaluated for all wavenumbers at each point pair, both for the
+    regular and the singular part.
+
+    Parameters
+    ----------
+    operator : string
+        One of "single_layer", "double_layer" or
+        "adjoint_double_layer".
+    domain : Space
+        The domain space.
+    dual_to_range : Space
+        The dual to range space.
+    wavenumbers : array_like
+        A vector of real or complex wavenumbers.
+    parameters : Parameters
+        An optional parameters object.
+    precision : string
+        Either "single" or "double" for single or
+        double precision mode.
+
+    Output
+    ------
+    A list of dense discrete operators, the weak forms for each
+    wavenumber.
+
+    """
+    import bempp.api
+    from bempp.api.assembly.discrete_boundary_operator import (
+        DenseDiscreteBoundaryOperator,
+    )
+    from bempp.api.utils.helpers import get_type, promote_to_double_precision
+    from bempp.core import numba_kernels
+    from bempp.core.dense_batched_assembler import assemble_dense_batched
+
+    if operator not in ["single_layer", "double_layer", "adjoint_double_layer"]:
+        raise ValueError(
+            "Operator must be one of 'single_layer', 'double_layer' "
+            + "or 'adjoint_double_layer'."
+        )
+
+    parameters = bempp.api.assign_parameters(parameters)
+    if precision is None:
+        precision = bempp.api.DEFAULT_PRECISION
+
+    wavenumbers = _np.atleast_1d(wavenumbers).astype("complex128")
+    kernel_parameters = _np.empty(2 * len(wavenumbers), dtype=get_type(precision).real)
+    kernel_parameters[0::2] = wavenumbers.real
+    kernel_parameters[1::2] = wavenumbers.imag
+
+    result = assemble_dense_batched(
+        domain,
+        dual_to_range,
+        parameters,
+        (
+            numba_kernels.default_scalar_batched_regular,
+            numba_kernels.default_scalar_batched_singular,
+        ),
+        (
+            getattr(numba_kernels, f"helmholtz_{operator}_batched_regular"),
+            getattr(numba_kernels, f"helmholtz_{operator}_batched_singular"),
+        ),
+        kernel_parameters,
+        len(wavenumbers),
+        get_type(precision).complex,
+        precision,
+        f"helmholtz_{operator}_sweep",
+    )
+
+    if parameters.assembly.always_promote_to_double:
+        result = promote_to_double_precision(result)
+
+    return [DenseDiscreteBoundaryOperator(mat) for mat in result]
+
+
 def multitrace_operator(
     grid,
     wavenumber,
@@ -216,6 +304,11 @@ def multitrace_operator(
     hyp : hypersingular boundary operator
     adj_dlp : adjoint double layer boundary operator.
 
+    With dense assembly on the Numba device interface, or with
+    no device interface given, the four blocks are computed together
+    in one sweep over the element pairs when the first block is
+    assembled.
+
     """
     import bempp.api
     from bempp.api.assembly.blocked_operator import BlockedOperator
@@ -227,6 +320,11 @@ def multitrace_operator(
     else:
         target_space = space
 
+    if _np.real(wavenumber) != 0:
+        assembler, device_interface = _common.multitrace_block_assembler(
+            "helmholtz", space, target_space, parameters, assembler, device_interface
+        )
+
     slp = single_layer(
         space,
         target_space,
@@ -104,3 +104,108 @@ def hypersingular(
         precision,
         False,
     )
+
+
+def multitrace_operator(
+    grid,
+    target=None,
+    space_type="p1",
+    parameters=None,
+    assembler="default_nonlocal",
+    device_interface=None,
+    precision=None,
+):
+    """
+    Simplified version of multitrace operator assembly.
+
+    Parameters
+    ----------
+    grid : Grid
+        Bempp grid object.
+    target : Grid
+        The grid for the range spaces. If target is None then
+        target is set to the input grid (that is the domain
+        grid).
+    space_type : string
+        Currently only "p1" is supported, which means
+        that the operator is discretised with all P1 basis
+        functions.
+    parameters : Parameters
+        An optional parameters object.
+    assembler : string
+        The assembler type.
+    device_interface : DeviceInterface
+        The device interface object to be used.
+    precision : string
+        Either "single" or "double" for single or
+        double precision mode.
+
+    Output
+    ------
+    The Laplace multitrace operator of the form
+    [[-dlp, slp], [hyp, adj_dlp]], where
+    dlp : double layer boundary operator
+    slp : single layer boundary operator
+    hyp : hypersingular boundary operator
+    adj_dlp : adjoint double layer boundary operator.
+
+    With dense assembly on the Numba device interface, or with
+    no device interface given, the four blocks are computed together
+    in one sweep over the element pairs when the first block is
+    assembled.
+
+    """
+    import bempp.api
+    from bempp.api.assembly.blocked_operator import BlockedOperator
+
+    space = bempp.api.function_space(grid, "P", 1)
+
+    if target is not None:
+        target_space = bempp.api.function_space(target, "P", 1)
+    else:
+        target_space = space
+
+    assembler, device_interface = _common.multitrace_block_assembler(
+        "laplace", space, target_space, parameters, assembler, device_interface
+    )
+
+    blocked = BlockedOperator(2, 2)
+
+    blocked[0, 0] = -double_layer(
+        space,
+        target_space,
+        target_space,
+        parameters=parameters,
+        assembler=assembler,
+        device_interface=device_interface,
+        precision=precision,
+    )
+    blocked[0, 1] = single_layer(
+        space,
+        target_space,
+        target_space,
+        parameters=parameters,
+        assembler=assembler,
+        device_interface=device_interface,
+        precision=precision,
+    )
+    blocked[1, 0] = hypersingular(
+        space,
+        target_space,
+        target_space,
+        parameters=parameters,
+        assembler=assembler,
+        device_interface=device_interface,
+        precision=precision,
+    )
+    blocked[1, 1] = adjoint_double_layer(
+        space,
+        target_space,
+        target_space,
+        parameters=parameters,
+        assembler=assembler,
+        device_interface=device_interface,
+        precision=precision,
+    )
+
+    return blocked
@@ -44,13 +44,13 @@ class Shapeset(object):
         return self._dimension
 
 
-@_numba.njit
+@_numba.njit(cache=True)
 def _p0_shapeset_evaluate(local_coordinates):
     """Evaluate P0 shapeset."""
     return _np.ones((1, 1, local_coordinates.shape[1]), dtype=local_coordinates.dtype)
 
 
-@_numba.njit
+@_numba.njit(cache=True)
 def _p0_shapeset_gradient(local_coordinates):
     """Evaluate P0 gradient."""
     return _np.zeros(
@@ -58,7 +58,7 @@ def _p0_shapeset_gradient(local_coordinates):
     )
 
 
-@_numba.njit
+@_numba.njit(cache=True)
 def _p1_disc_shapeset_evaluate(local_coordinates):
     """Evaluate P1 discontinuous shapeset."""
     return _np.expand_dims(
@@ -73,7 +73,7 @@ def _p1_disc_shapeset_evaluate(local_coordinates):
     )
 
 
-@_numba.njit
+@_numba.njit(cache=True)
 def _p1_disc_shapeset_gradient(local_coordinates):
     """Evaluate P1 discontinuous shapeset gradient."""
     dtype = local_coordinates.dtype
@@ -95,7 +95,7 @@ def _p1_disc_shapeset_gradient(local_coordinates):
     return grad
 
 
-@_numba.njit
+@_numba.njit(cache=True)
 def _rwg0_shapeset_evaluate(local_coordinates):
     """Evaluate RWG 0 shapeset."""
     dtype = local_coordinates.dtype
@@ -109,7 +109,7 @@ def _rwg0_shapeset_evaluate(local_coordinates):
     return vals
 
 
-@_numba.njit
+@_numba.njit(cache=True)
 def _rwg0_shapeset_gradient(local_coordinates):
     """Evaluate RWG 0 shapeset gradient."""
     dtype = local_coordinates.dtype
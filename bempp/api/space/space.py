@@ -681,38 +681,57 @@ class FunctionSpace(object):
         self._id = new_id
 
     def _compute_color_map(self):
-        """Compute the color map."""
+        """
+        Compute the color map.
+
+        Two support elements are neighbors if they share a global dof.
+        The elements are colored greedily in a compiled loop over the
+        sparse element adjacency. If
+        GLOBAL_PARAMETERS.assembly.balanced_coloring is set, each element
+        gets the smallest admissible color class, which gives color
+        classes of similar sizes.
+        """
+        import bempp.api
+        from scipy.sparse import csr_matrix
+
+        support_elements = self.support_elements
+        number_of_support_elements = len(support_elements)
+        dofs = self.local2global[support_elements].ravel()
+
+        element_to_dof = csr_matrix(
+            (
+                _np.ones(len(dofs), dtype="int32"),
+                (
+                    _np.repeat(
+                        _np.arange(number_of_support_elements),
+                        self.number_of_shape_functions,
+                    ),
+                    dofs,
+                ),
+            ),
+            shape=(number_of_support_elements, 1 + _np.max(dofs, initial=0)),
+        )
+        adjacency = (element_to_dof @ element_to_dof.T).tocsr()
 
         self._color_map = -_np.ones(self.grid.number_of_elements, dtype=_np.int32)
-        for element_index in self.support_elements:
-            neighbors = {element_index}
-            global_dofs = self.local2global[element_index]
-            for dof in global_dofs:
-                for elem, _ in self.global2local[dof]:
-                    neighbors.add(elem)
-            neighbors.remove(element_index)
-
-            neighbor_colors = self._color_map[list(neighbors)]
-            self._color_map[element_index] = next(
-                color
-                for color in range(self.number_of_support_elements)
-                if color not in neighbor_colors
-            )
+        self._color_map[support_elements] = _numba_greedy_coloring(
+            adjacency.indices,
+            adjacency.indptr,
+            bempp.api.GLOBAL_PARAMETERS.assembly.balanced_coloring,
+        )
 
     def _sort_elements_by_color(self):
         """Implement elements by color computation."""
-        sorted_indices = _np.empty(self.number_of_support_elements, dtype="uint32")
-        ncolors = 1 + max(self.color_map)
+        colored_elements = _np.flatnonzero(self.color_map >= 0)
+        colors = self.color_map[colored_elements]
+        ncolors = 1 + _np.max(colors, initial=-1)
+
+        sorted_indices = colored_elements[_np.argsort(colors, kind="stable")]
         indexptr = _np.zeros(1 + ncolors, dtype="uint32")
+        indexptr[1:] = _np.cumsum(_np.bincount(colors, minlength=ncolors))
 
-        count = 0
-        for index, color in enumerate(_np.arange(ncolors, dtype="uint32")):
-            colors = _np.where(self.color_map == color)[0]
-            colors_length = len(colors)
-            sorted_indices[count : count + colors_length] = colors
-            count += colors_length
-            indexptr[index + 1] = count
-        self._sorted_indices, self._indexptr = sorted_indices, indexptr
+        self._sorted_indices = sorted_indices.astype("uint32")
+        self._indexptr = indexptr
 
     def __eq__(self, other):
         """Check if spaces are compatible."""
@@ -960,6 +979,49 @@ def _space_scatter_worker(
     bempp.api.log(f"Copied space {space.id} to worker {pool.get_id()}.", "debug")
 
 
+@_numba.njit
+def _numba_greedy_coloring(indices, indptr, balanced):
+    """
+    Color the nodes of a graph given by a CSR adjacency structure.
+
+    Nodes are colored in ascending order. Each node gets the first color
+    not used by its neighbors or, if balanced is True, the admissible
+    color with the fewest nodes. A new color is only opened if no
+    existing color is admissible.
+    """
+    number_of_nodes = len(indptr) - 1
+    colors = -_np.ones(number_of_nodes, dtype=_np.int32)
+    class_sizes = _np.zeros(number_of_nodes + 1, dtype=_np.int64)
+    # forbidden[c] == node marks color c as used by a neighbor of node.
+    forbidden = -_np.ones(number_of_nodes + 1, dtype=_np.int64)
+    number_of_colors = 0
+
+    for node in range(number_of_nodes):
+        for index in range(indptr[node], indptr[node + 1]):
+            color = colors[indices[index]]
+            if color >= 0:
+                forbidden[color] = node
+
+        chosen = -1
+        for color in range(number_of_colors):
+            if forbidden[color] == node:
+                continue
+            if not balanced:
+                chosen = color
+                break
+            if chosen == -1 or class_sizes[color] < class_sizes[chosen]:
+                chosen = color
+
+        if chosen == -1:
+            chosen = number_of_colors
+            number_of_colors += 1
+
+        colors[node] = chosen
+        class_sizes[chosen] += 1
+
+    return colors
+
+
 @_numba.njit
 def _numba_evaluate(
     element_index,
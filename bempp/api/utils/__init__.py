@@ -2,4 +2,12 @@
 
 from .which import which
 from .parameters import DefaultParameters
-from .octree import Octree
+
+
+def __getattr__(name):
+    """Import the Octree on first access, since it requires Numba."""
+    if name == "Octree":
+        from .octree import Octree
+
+        return Octree
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
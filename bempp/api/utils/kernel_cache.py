@@ -0,0 +1,229 @@
+"""
+Management of the on-disk cache for Numba compiled kernels.
+
+Numba kernels whose signatures only consist of arrays and scalars are
+compiled with cache=True and stored on disk. By default Numba stores
+the cache in __pycache__ directories next to the Bempp sources or in
+the directory given by the environment variable NUMBA_CACHE_DIR.
+The assembly drivers that receive grid data (jitclass instances) or
+kernel functions as arguments have process dependent signatures and
+cannot be loaded from disk. They are compiled on first use.
+
+The module can also be used as a command line tool:
+
+    python -m bempp.api.utils.kernel_cache [--cache-dir DIR] COMMAND
+
+with COMMAND one of warm, prebuild, clear or report.
+"""
+
+import os as _os
+
+_CACHED_MODULES = [
+    "bempp.core.numba_kernels",
+    "bempp.api.fmm.helpers",
+    "bempp.api.grid.grid",
+    "bempp.api.space.shapesets",
+    "bempp.api.space.scalar_spaces",
+    "bempp.api.space.maxwell_spaces",
+    "bempp.api.utils.octree",
+    "bempp.api.utils.interpolation",
+]
+
+
+def cached_dispatchers():
+    """Return a dictionary of all Numba dispatchers in Bempp that use the cache."""
+    import importlib
+    from numba.core.caching import NullCache
+    from numba.core.registry import CPUDispatcher
+
+    dispatchers = {}
+
+    for module_name in _CACHED_MODULES:
+        module = importlib.import_module(module_name)
+        for name, obj in vars(module).items():
+            if (
+                isinstance(obj, CPUDispatcher)
+                and obj.py_func.__module__ == module_name
+                and not isinstance(obj._cache, NullCache)
+            ):
+                dispatchers[f"{module_name}.{name}"] = obj
+
+    return dispatchers
+
+
+def cache_dir():
+    """
+    Return the kernel cache directory.
+
+    Returns None if Numba uses its default locations.
+    """
+    import numba
+
+    if numba.config.CACHE_DIR:
+        return numba.config.CACHE_DIR
+    return None
+
+
+def set_cache_dir(path):
+    """
+    Set the directory of the kernel cache.
+
+    All Bempp kernels that use the cache are redirected to the new
+    directory. Kernels that are already compiled in this process stay
+    available.
+    """
+    import numba
+
+    path = _os.path.abspath(_os.path.expanduser(path))
+    _os.makedirs(path, exist_ok=True)
+    numba.config.CACHE_DIR = path
+
+    for dispatcher in cached_dispatchers().values():
+        dispatcher.enable_caching()
+
+
+def warm():
+    """
+    Load all kernels from the disk cache into the current process.
+
+    Returns the number of loaded kernel signatures.
+    """
+    import bempp.api
+
+    count = 0
+
+    for name, dispatcher in cached_dispatchers().items():
+        cache = dispatcher._cache
+        codegen = dispatcher.targetctx.codegen()
+        # pylint: disable=protected-access
+        for key in cache._cache_file._load_index():
+            sig = key[0]
+            if key != cache._index_key(sig, codegen):
+                continue
+            if tuple(sig) in dispatcher.overloads:
+                continue
+            try:
+                dispatcher.compile(sig)
+            except Exception:  # pylint: disable=broad-except
+                bempp.api.log(
+                    f"Could not load {name} for signature {sig} from kernel cache.",
+                    level="debug",
+                )
+                continue
+            count += 1
+
+    bempp.api.log(f"Loaded {count} kernels from kernel cache.")
+
+    return count
+
+
+def prebuild(precisions=("double", "single")):
+    """
+    Compile all kernels and write them to the disk cache.
+
+    The kernels are compiled by assembling the Laplace, Helmholtz,
+    modified Helmholtz and Maxwell boundary operators on a small grid
+    for each given precision.
+    """
+    from bempp.api.utils.precompile import precompile
+
+    precompile(precision=list(precisions), device_interface="numba", background=False)
+
+
+def clear():
+    """
+    Remove all Bempp kernels from the disk cache.
+
+    Returns the number of removed files.
+    """
+    import glob
+
+    count = 0
+
+    for dispatcher in cached_dispatchers().values():
+        # pylint: disable=protected-access
+        cache_file = dispatcher._cache._cache_file
+        index_path = cache_file._index_path
+        file_stem = _os.path.splitext(index_path)[0]
+        for fname in [index_path] + glob.glob(glob.escape(file_stem) + ".*.nbc"):
+            try:
+                _os.remove(fname)
+                count += 1
+            except FileNotFoundError:
+                pass
+
+    return count
+
+
+def report():
+    """
+    Return cache hits and misses of the Bempp kernels in this process.
+
+    Returns a dictionary that maps the kernel names to tuples
+    (hits, misses) and logs a summary.
+    """
+    import bempp.api
+
+    stats = {}
+
+    for name, dispatcher in cached_dispatchers().items():
+        # pylint: disable=protected-access
+        hits = sum(dispatcher._cache_hits.values())
+        misses = sum(dispatcher._cache_misses.values())
+        if hits + misses > 0:
+            stats[name] = (hits, misses)
+
+    total_hits = sum(hits for hits, _ in stats.values())
+    total_misses = sum(misses for _, misses in stats.values())
+
+    bempp.api.log(
+        f"Kernel cache: {total_hits} hits, {total_misses} misses "
+        + f"in {len(stats)} kernels."
+    )
+
+    return stats
+
+
+def _main():
+    """Command line interface of the kernel cache."""
+    import argparse
+    import bempp.api
+
+    parser = argparse.ArgumentParser(
+        description="Manage the Bempp kernel cache.",
+        prog="python -m bempp.api.utils.kernel_cache",
+    )
+    parser.add_argument(
+        "command",
+        choices=["warm", "prebuild", "clear", "report"],
+        help="warm: load cached kernels, prebuild: compile kernels into the "
+        + "cache, clear: remove cached kernels, report: show cache statistics.",
+    )
+    parser.add_argument("--cache-dir", default=None, help="The cache directory.")
+    parser.add_argument(
+        "--precision",
+        action="append",
+        choices=["single", "double"],
+        help="Precision for prebuild. Can be given multiple times.",
+    )
+
+    args = parser.parse_args()
+
+    bempp.api.enable_console_logging()
+
+    if args.cache_dir is not None:
+        set_cache_dir(args.cache_dir)
+
+    if args.command == "warm":
+        warm()
+    elif args.command == "prebuild":
+        prebuild(args.precision or ("double", "single"))
+    elif args.command == "clear":
+        print(f"Removed {clear()} files from the kernel cache.")
+
+    for name, (hits, misses) in sorted(report().items()):
+        print(f"{name}: {hits} hits, {misses} misses")
+
+
+if __name__ == "__main__":
+    _main()
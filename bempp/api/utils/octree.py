@@ -1,26 +1,17 @@
-"""Implementation of an octree in Python."""
+"""Implementation of an octree."""
 
 import numpy as _np
 import numba as _numba
 
 
-@_numba.experimental.jitclass(
-    [
-        ("_lbound", _numba.float64[:]),
-        ("_ubound", _numba.float64[:]),
-        ("_maximum_level", _numba.int32),
-        ("_diameter", _numba.float64[:]),
-        ("_vertices", _numba.float64[:, :]),
-        ("_sorted_indices", _numba.uint32[:]),
-        ("_leaf_nodes", _numba.uint32[:]),
-        ("_leaf_nodes_index_ptr", _numba.uint32[:]),
-        ("_level_nodes", _numba.uint32[:]),
-        ("_level_nodes_index_ptr", _numba.uint32[:]),
-        ("_near_field_nodes", _numba.int32[:]),
-    ]
-)
 class Octree(object):
-    """Data structure for handling Octrees."""
+    """
+    Data structure for handling Octrees.
+
+    The Octree is built by Numba compiled functions that are stored
+    in the kernel cache. Non-empty nodes are found by a hash table over
+    their Morton indices.
+    """
 
     def __init__(self, lbound, ubound, maximum_level, vertices):
         """
@@ -35,18 +26,22 @@ class Octree(object):
             Numpy array of size (3, ) that specifies the upper
             bound of the Octree.
         maximum_level : integer
-            The maximum level of the Octree.
+            The maximum level of the Octree. At most 10 levels are
+            supported.
         vertices : np.ndarray
             An (3, N) float64 array of N vertices
         """
+        if not 0 <= maximum_level <= 10:
+            raise ValueError("The maximum level must be between 0 and 10.")
 
-        self._lbound = lbound
-        self._ubound = ubound
+        self._lbound = _np.asarray(lbound, dtype=_np.float64)
+        self._ubound = _np.asarray(ubound, dtype=_np.float64)
         self._maximum_level = maximum_level
-        self._diameter = ubound - lbound
+        self._diameter = self._ubound - self._lbound
         self._vertices = vertices
         self._assign_nodes(vertices)
         self._compute_nearfields()
+        self._compute_interaction_list()
 
     @property
     def diameter(self):
@@ -131,6 +126,24 @@ class Octree(object):
         """
         return _np.uint32(27) * self._level_nodes_index_ptr
 
+    @property
+    def interaction_list_nodes(self):
+        """Return interaction list nodes."""
+        return self._interaction_list_nodes
+
+    @property
+    def interaction_list_nodes_ptr(self):
+        """
+        Return an index ptr to the interaction list nodes.
+
+        Returns an array index_ptr, such that
+        self.interaction_list_nodes[index_ptr[j]:index_ptr[j+1]]
+        contains the interaction list nodes for all nodes in level j.
+        There are 189 entries for each node. The sequence of nodes
+        is the same as for the array non_empty_nodes_by_level.
+        """
+        return _np.uint32(189) * self._level_nodes_index_ptr
+
     def parent(self, node_index):
         """Return the parent index of a node."""
         return node_index >> 3
@@ -152,13 +165,40 @@ class Octree(object):
 
     def leaf_containing_point(self, point):
         """Return the Morton index of a node containing the point."""
-        leaf_size = self.nodes_per_side(self.maximum_level)
+        return self.leaves_containing_points(
+            _np.asarray(point, dtype=_np.float64).reshape(3, 1)
+        )[0]
 
-        fractions = ((point - self.lower_bound) / self.diameter) * leaf_size
+    def leaves_containing_points(self, points):
+        """
+        Return the Morton indices of the leaf nodes containing points.
 
-        indices = _np.fmin(_np.fmax(0, fractions).astype(_np.int32), leaf_size - 1)
+        The points are given as (3, N) array. Points outside the
+        Octree are assigned to the nearest leaf node.
+        """
+        return _leaves_containing_points(
+            _np.asarray(points, dtype=_np.float64),
+            self._lbound,
+            self._diameter,
+            self._maximum_level,
+        )
+
+    def node_positions(self, nodes, level):
+        """
+        Return the positions of nodes in the non-empty nodes of a level.
 
-        return morton(indices)
+        The position of a node with Morton index nodes[i] is the index j,
+        such that non_empty_nodes_by_level[index_ptr[level] + j] is the
+        node, where index_ptr is self.non_empty_nodes_ptr. Empty nodes
+        have the position -1.
+        """
+        return _node_positions(
+            _np.asarray(nodes, dtype=_np.int64).ravel(),
+            level,
+            self._hash_table,
+            self._level_nodes,
+            self._level_nodes_index_ptr,
+        )
 
     def node_bounds(self, morton_index, level):
         """
@@ -178,110 +218,261 @@ class Octree(object):
 
     def neighbors(self, node_index, level):
         """Return a list of indices of the neighbors of a node."""
-        return _neighbors(node_index, level)
+        return list(_neighbors(node_index, level))
 
     def node_diameter(self, level):
         """Return node diameter in a given level."""
-        return self.diameter / (1.0 * self.nodes_per_side(self.maximum_level))
+        return self.diameter / (1.0 * self.nodes_per_side(level))
 
     def _assign_nodes(self, vertices):
         """Computes leaf-nodes and parents."""
-        nvertices = vertices.shape[1]
-        node_indices = _np.empty(nvertices, dtype=_np.uint32)
+        (
+            self._sorted_indices,
+            self._leaf_nodes,
+            self._leaf_nodes_index_ptr,
+        ) = _sort_by_leaf(self.leaves_containing_points(vertices))
+
+        self._level_nodes, self._level_nodes_index_ptr = _compute_level_nodes(
+            self._leaf_nodes, self._maximum_level
+        )
+        self._hash_table = _make_hash_table(
+            self._level_nodes, self._level_nodes_index_ptr
+        )
+
+    def _compute_nearfields(self):
+        """
+        Compute near fields of all non empty nodes.
+
+        Each node can have at most 27 near field nodes (including
+        the node itself). If a near field node does not exist or is empty
+        then the value -1 is stored, otherwise the node number.
+        """
+        self._near_field_nodes = _compute_near_fields(
+            self._level_nodes, self._level_nodes_index_ptr, self._hash_table
+        )
+
+    def _compute_interaction_list(self):
+        """
+        Computes the interaction list for each non empty node.
 
-        for index in range(nvertices):
-            node_indices[index] = self.leaf_containing_point(vertices[:, index])
+        The interaction list of a node consists of the children of the
+        near field nodes of its parent that are not adjacent to the
+        node. There are at most 189 such nodes. Empty entries are
+        stored as -1. Nodes on the levels 0 and 1 have empty
+        interaction lists.
+        """
+        self._interaction_list_nodes = _compute_interaction_lists(
+            self._level_nodes,
+            self._level_nodes_index_ptr,
+            self._near_field_nodes,
+            self._hash_table,
+        )
 
-        self._sorted_indices = _np.argsort(node_indices).astype(_np.uint32)
-        index_ptr = []
-        nodes = []
 
-        tmp = -1
+@_numba.njit(cache=True)
+def _leaves_containing_points(points, lbound, diameter, maximum_level):
+    """Return the Morton indices of the leaves containing the points."""
+    leaf_size = 1 << maximum_level
+    npoints = points.shape[1]
+    nodes = _np.empty(npoints, dtype=_np.uint32)
+    indices = _np.empty(3, dtype=_np.int64)
+    for index in range(npoints):
+        for dim in range(3):
+            fraction = (points[dim, index] - lbound[dim]) / diameter[dim] * leaf_size
+            indices[dim] = min(int(max(0.0, fraction)), leaf_size - 1)
+        nodes[index] = (
+            _dilate(indices[0])
+            | (_dilate(indices[1]) << 1)
+            | (_dilate(indices[2]) << 2)
+        )
+    return nodes
 
-        for i, index in enumerate(self._sorted_indices):
-            if tmp != node_indices[index]:
-                index_ptr.append(i)
-                nodes.append(node_indices[index])
-                tmp = node_indices[index]
 
-        index_ptr.append(len(self._sorted_indices))
-        self._leaf_nodes = _np.array(nodes, dtype=_np.uint32)
-        self._leaf_nodes_index_ptr = _np.array(index_ptr, dtype=_np.uint32)
+@_numba.njit(cache=True)
+def _sort_by_leaf(point_nodes):
+    """Sort points by leaf and return the indices, leaves and index pointer."""
+    sorted_indices = _np.argsort(point_nodes, kind="mergesort").astype(_np.uint32)
+    npoints = len(point_nodes)
+
+    nleaves = 0
+    for index in range(npoints):
+        if (
+            index == 0
+            or point_nodes[sorted_indices[index]]
+            != point_nodes[sorted_indices[index - 1]]
+        ):
+            nleaves += 1
+
+    leaf_nodes = _np.empty(nleaves, dtype=_np.uint32)
+    index_ptr = _np.empty(nleaves + 1, dtype=_np.uint32)
+    count = 0
+    for index in range(npoints):
+        node = point_nodes[sorted_indices[index]]
+        if index == 0 or node != leaf_nodes[count - 1]:
+            leaf_nodes[count] = node
+            index_ptr[count] = index
+            count += 1
+    index_ptr[nleaves] = npoints
+
+    return sorted_indices, leaf_nodes, index_ptr
 
-        # Now compute the parents
 
-        self._level_nodes = self._leaf_nodes
-        self._level_nodes_index_ptr = _np.zeros(self.maximum_level + 2, _np.uint32)
-        nnodes = _np.empty(1 + self._maximum_level, _np.uint32)
-        nnodes[self.maximum_level] = len(self._leaf_nodes)
-        current_level = self._leaf_nodes
-        current_nodes = []
+@_numba.njit(cache=True)
+def _compute_level_nodes(leaf_nodes, maximum_level):
+    """
+    Compute the non-empty nodes on all levels from the leaf nodes.
+
+    The nodes of a level are the sorted unique parents of the nodes of
+    the next level. Returns the nodes of all levels, starting with level
+    0, and an index pointer to the levels.
+    """
+    levels = [leaf_nodes]
+    for _ in range(maximum_level):
+        children = levels[-1]
+        parents = _np.empty(len(children), dtype=_np.uint32)
+        count = 0
+        for child in children:
+            parent = child >> 3
+            if count == 0 or parent != parents[count - 1]:
+                parents[count] = parent
+                count += 1
+        levels.append(parents[:count])
 
-        for index in range(1, self.maximum_level + 1):
-            current_nodes.clear()
-            for node_index in current_level:
-                current_nodes.append(self.parent(node_index))
-            current_level = _make_unique(_np.array(current_nodes, dtype=_np.uint32))
-            self._level_nodes = _np.concatenate((current_level, self._level_nodes))
-            nnodes[self.maximum_level - index] = len(current_level)
+    index_ptr = _np.zeros(maximum_level + 2, dtype=_np.uint32)
+    for level in range(maximum_level + 1):
+        index_ptr[level + 1] = index_ptr[level] + len(levels[maximum_level - level])
 
-        tmp = 0
+    level_nodes = _np.empty(index_ptr[-1], dtype=_np.uint32)
+    for level in range(maximum_level + 1):
+        level_nodes[index_ptr[level] : index_ptr[level + 1]] = levels[
+            maximum_level - level
+        ]
 
-        for index in range(0, 1 + self.maximum_level):
-            self._level_nodes_index_ptr[index] = tmp
-            tmp += nnodes[index]
-        self._level_nodes_index_ptr[1 + self.maximum_level] = tmp
+    return level_nodes, index_ptr
 
-    def _compute_nearfields(self):
-        """
-        Compute near fields of all non empty nodes.
 
-        Each node can have at most 27 near field nodes (including
-        the node itself). If a near field node does not exist or is empty
-        then the value -1 is stored, otherwise the node number.
-        """
+@_numba.njit(cache=True)
+def _hash_key(node, level):
+    """
+    Return a key of a node that is unique over all levels.
 
-        self._near_field_nodes = _np.empty(27 * len(self._level_nodes), _np.int32)
+    The Morton index is prefixed by a bit at position 3 * level.
+    """
+    return _np.int64(node) | (_np.int64(1) << (3 * level))
 
-        count = 0
 
-        for level_index in range(self.maximum_level + 1):
-            sides = 1 << level_index
-            level_nodes = self.non_empty_nodes_by_level[
-                self.non_empty_nodes_ptr[level_index] : self.non_empty_nodes_ptr[
-                    level_index + 1
-                ]
-            ]
-            for node_index in level_nodes:
-                ind1, ind2, ind3 = de_morton(node_index)
-
-                for i in range(-1, 2):
-                    for j in range(-1, 2):
-                        for k in range(-1, 2):
-                            if _in_range(ind1 + i, ind2 + j, ind3 + k, sides):
-                                morton_index = morton((ind1 + i, ind2 + j, ind3 + k))
-                                if _np.any(level_nodes == morton_index):
-                                    self._near_field_nodes[count] = morton_index
-                                else:
-                                    self._near_field_nodes[count] = -1
-                            else:
-                                self._near_field_nodes[count] = -1
-                            count += 1
+@_numba.njit(cache=True)
+def _hash_slot(key, mask):
+    """Return the first slot of a key in the hash table."""
+    return ((key * 2654435761) >> 7) & mask
 
-    def _compute_interaction_list(self):
-        """Computes the interaction list for each non empty node."""
-        pass
-
-
-@_numba.njit
-def _make_unique(ar):
-    """An implementation of Numpy unique for Numba."""
-    sorted_ar = _np.sort(ar)
-    unique_lst = [sorted_ar[0]]
-    for elem in sorted_ar:
-        if elem != unique_lst[-1]:
-            unique_lst.append(elem)
-    return _np.array(unique_lst, dtype=ar.dtype)
+
+@_numba.njit(cache=True)
+def _make_hash_table(level_nodes, index_ptr):
+    """
+    Create an open addressing hash table for the non-empty nodes.
+
+    The table stores the index of each node in level_nodes. Free slots
+    are marked by -1. The table has at least twice as many slots as
+    there are nodes.
+    """
+    size = 2
+    while size < 2 * len(level_nodes):
+        size *= 2
+    mask = size - 1
+    table = -_np.ones(size, dtype=_np.int64)
+    for level in range(len(index_ptr) - 1):
+        for index in range(index_ptr[level], index_ptr[level + 1]):
+            slot = _hash_slot(_hash_key(level_nodes[index], level), mask)
+            while table[slot] != -1:
+                slot = (slot + 1) & mask
+            table[slot] = index
+    return table
+
+
+@_numba.njit(cache=True)
+def _hash_lookup(node, level, table, level_nodes, index_ptr):
+    """Return the index of a node in level_nodes or -1 if it is empty."""
+    if node < 0 or node >= (_np.int64(1) << (3 * level)):
+        return -1
+    mask = len(table) - 1
+    slot = _hash_slot(_hash_key(node, level), mask)
+    while table[slot] != -1:
+        index = table[slot]
+        if (
+            level_nodes[index] == node
+            and index_ptr[level] <= index < index_ptr[level + 1]
+        ):
+            return index
+        slot = (slot + 1) & mask
+    return -1
+
+
+@_numba.njit(cache=True)
+def _node_positions(nodes, level, table, level_nodes, index_ptr):
+    """Return the positions of nodes in the non-empty nodes of a level."""
+    positions = _np.empty(len(nodes), dtype=_np.int64)
+    for index in range(len(nodes)):
+        position = _hash_lookup(nodes[index], level, table, level_nodes, index_ptr)
+        if position != -1:
+            position -= index_ptr[level]
+        positions[index] = position
+    return positions
+
+
+@_numba.njit(parallel=True, cache=True)
+def _compute_near_fields(level_nodes, index_ptr, table):
+    """Compute the 27 near field nodes of all non-empty nodes."""
+    near_field_nodes = -_np.ones(27 * len(level_nodes), dtype=_np.int32)
+    for level in range(len(index_ptr) - 1):
+        sides = 1 << level
+        for index in _numba.prange(index_ptr[level], index_ptr[level + 1]):
+            ind1, ind2, ind3 = de_morton(_np.int64(level_nodes[index]))
+            count = 27 * index
+            for i in range(-1, 2):
+                for j in range(-1, 2):
+                    for k in range(-1, 2):
+                        if _in_range(ind1 + i, ind2 + j, ind3 + k, sides):
+                            node = (
+                                _dilate(ind1 + i)
+                                | (_dilate(ind2 + j) << 1)
+                                | (_dilate(ind3 + k) << 2)
+                            )
+                            if (
+                                _hash_lookup(node, level, table, level_nodes, index_ptr)
+                                != -1
+                            ):
+                                near_field_nodes[count] = node
+                        count += 1
+    return near_field_nodes
+
+
+@_numba.njit(parallel=True, cache=True)
+def _compute_interaction_lists(level_nodes, index_ptr, near_field_nodes, table):
+    """Compute the interaction lists of all non-empty nodes."""
+    interaction_list_nodes = -_np.ones(189 * len(level_nodes), dtype=_np.int32)
+    for level in range(2, len(index_ptr) - 1):
+        for index in _numba.prange(index_ptr[level], index_ptr[level + 1]):
+            node = _np.int64(level_nodes[index])
+            ind1, ind2, ind3 = de_morton(node)
+            parent = _hash_lookup(node >> 3, level - 1, table, level_nodes, index_ptr)
+            count = 189 * index
+            for near_index in range(27):
+                parent_neighbor = near_field_nodes[27 * parent + near_index]
+                if parent_neighbor == -1:
+                    continue
+                for child in range(parent_neighbor << 3, 8 + (parent_neighbor << 3)):
+                    cind1, cind2, cind3 = de_morton(child)
+                    if (
+                        abs(cind1 - ind1) <= 1
+                        and abs(cind2 - ind2) <= 1
+                        and abs(cind3 - ind3) <= 1
+                    ):
+                        continue
+                    if _hash_lookup(child, level, table, level_nodes, index_ptr) != -1:
+                        interaction_list_nodes[count] = child
+                        count += 1
+    return interaction_list_nodes
 
 
 @_numba.njit(cache=True)
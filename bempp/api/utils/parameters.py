@@ -35,12 +35,27 @@ class _Fmm(object):
 
     def __init__(self):
 
+        self.engine = "exafmm"
         self.expansion_order = 5
         self.depth = 4
         self.ncrit = 400
         self.near_field_representation = "opencl_evaluate"
         self.debug = False
         self.dense_evaluation = False
+        self.cache_size = 1024
+        self.cache_entries = 16
+
+
+class _Hmat(object):
+    """H-matrix options."""
+
+    def __init__(self):
+
+        self.eps = 1e-4
+        self.max_rank = 50
+        self.min_block_size = 64
+        self.admissibility = 2.0
+        self.aca_minimum_block_size = 16384
 
 
 class _DenseAssembly(object):
@@ -48,6 +63,11 @@ class _DenseAssembly(object):
 
     def __init__(self):
         self.workgroup_size_multiple = 2
+        self.test_tile_size = None
+        self.trial_tile_size = 1024
+        self.out_of_core = False
+        self.out_of_core_dir = None
+        self.out_of_core_tile_size = 256
 
 
 class _Assembly(object):
@@ -57,6 +77,10 @@ class _Assembly(object):
         self.dense = _DenseAssembly()
         self.always_promote_to_double = False
         self.discretization_type = "galerkin"
+        self.use_pool = True
+        self.weak_form_cache_size = 1024
+        self.balanced_coloring = False
+        self.symmetric = False
 
 
 class DefaultParameters(object):
@@ -70,3 +94,4 @@ class DefaultParameters(object):
         self.quadrature = _Quadrature()
         self.assembly = _Assembly()
         self.fmm = _Fmm()
+        self.hmat = _Hmat()
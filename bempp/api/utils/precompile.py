@@ -0,0 +1,180 @@
+"""Ahead of time compilation of assembly kernels."""
+
+import threading as _threading
+
+import numba as _numba
+import numpy as _np
+
+
+def default_operators():
+    """Return the list of boundary operators compiled by default."""
+    from bempp.api.operators.boundary import (
+        laplace,
+        helmholtz,
+        modified_helmholtz,
+        maxwell,
+        sparse,
+    )
+
+    return [
+        sparse.identity,
+        laplace.single_layer,
+        laplace.double_layer,
+        laplace.adjoint_double_layer,
+        laplace.hypersingular,
+        helmholtz.single_layer,
+        helmholtz.double_layer,
+        helmholtz.adjoint_double_layer,
+        helmholtz.hypersingular,
+        modified_helmholtz.single_layer,
+        modified_helmholtz.double_layer,
+        modified_helmholtz.adjoint_double_layer,
+        modified_helmholtz.hypersingular,
+        maxwell.electric_field,
+        maxwell.magnetic_field,
+    ]
+
+
+def precompile(
+    operators=None,
+    spaces=None,
+    precision=None,
+    device_interface=None,
+    background=True,
+):
+    """
+    Compile assembly kernels ahead of time.
+
+    Each requested operator is assembled on a small grid for each
+    requested space and precision. This drives select_numba_kernels
+    and get_kernel_from_operator_descriptor for all combinations
+    of assembly type, kernel type, shapeset and precision, so that
+    later assemblies on real meshes do not pay for compilation.
+    The compiled kernels stay loaded in the current process.
+
+    Parameters
+    ----------
+    operators : list
+        List of boundary operator functions, e.g.
+        bempp.api.operators.boundary.laplace.single_layer.
+        If None, all Laplace, Helmholtz, modified Helmholtz,
+        Maxwell and identity operators are compiled.
+    spaces : list
+        List of tuples (kind, degree) of scalar spaces, e.g.
+        [("DP", 0), ("P", 1)]. Maxwell operators are always
+        compiled for RWG/SNC spaces. Default is [("DP", 0), ("P", 1)].
+    precision : string or list
+        "single", "double" or a list of those. If None the default
+        precision is used.
+    device_interface : string or list
+        "numba", "opencl" or a list of those. If None the default
+        device interface is used.
+    background : bool
+        If True (default) the compilation runs in a daemon thread
+        and the thread object is returned. Call its join method
+        to wait for the compilation to finish. Otherwise the
+        compilation runs in the calling thread and None is returned.
+    """
+    import bempp.api
+
+    if operators is None:
+        operators = default_operators()
+    if spaces is None:
+        spaces = [("DP", 0), ("P", 1)]
+    if precision is None:
+        precision = bempp.api.DEFAULT_PRECISION
+    if device_interface is None:
+        device_interface = bempp.api.DEFAULT_DEVICE_INTERFACE
+
+    if isinstance(precision, str):
+        precision = [precision]
+    if isinstance(device_interface, str):
+        device_interface = [device_interface]
+
+    for prec in precision:
+        if prec not in ["single", "double"]:
+            raise ValueError("precision must be one of 'single' or 'double'.")
+
+    def worker():
+        """Run the compilation."""
+        with bempp.api.Timer(message="Precompiling kernels"):
+            _precompile_impl(operators, spaces, precision, device_interface)
+
+    if not background:
+        worker()
+        return None
+
+    # The Numba threading layer must be started from the calling thread.
+    # Otherwise, e.g. with TBB, the interpreter can hang on exit.
+    _launch_threads(_np.empty(1))
+
+    thread = _threading.Thread(target=worker, name="bempp-precompile", daemon=True)
+    thread.start()
+    return thread
+
+
+def _precompile_impl(operators, spaces, precisions, device_interfaces):
+    """Assemble all combinations of operators and spaces on a small grid."""
+    import inspect
+    import bempp.api
+
+    grid = _small_grid()
+
+    scalar_spaces = [bempp.api.function_space(grid, *space) for space in spaces]
+    maxwell_spaces = (
+        bempp.api.function_space(grid, "RWG", 0),
+        bempp.api.function_space(grid, "SNC", 0),
+    )
+
+    for operator in operators:
+        if operator.__module__.endswith("maxwell"):
+            space_triples = [(maxwell_spaces[0], maxwell_spaces[0], maxwell_spaces[1])]
+        else:
+            space_triples = [(space, space, space) for space in scalar_spaces]
+
+        # Wavenumber dependent operators take a fourth positional argument.
+        nargs = len(
+            [
+                param
+                for param in inspect.signature(operator).parameters.values()
+                if param.default is inspect.Parameter.empty
+            ]
+        )
+        extra_args = (1.0,) if nargs > 3 else ()
+
+        for precision in precisions:
+            for device_interface in device_interfaces:
+                for space_triple in space_triples:
+                    operator(
+                        *(space_triple + extra_args),
+                        device_interface=device_interface,
+                        precision=precision,
+                    ).weak_form()
+                    bempp.api.log(
+                        f"Precompiled {operator.__module__}.{operator.__name__} "
+                        + f"for {space_triple[0].identifier}, {precision}, "
+                        + f"{device_interface}.",
+                        level="debug",
+                    )
+
+
+@_numba.njit(parallel=True, cache=True)
+def _launch_threads(values):
+    """Launch the Numba threading layer."""
+    for index in _numba.prange(len(values)):
+        values[index] = index
+
+
+def _small_grid():
+    """Return an octahedron with outward pointing normals."""
+    from bempp.api.grid.grid import Grid
+
+    vertices = _np.array(
+        [[1, -1, 0, 0, 0, 0], [0, 0, 1, -1, 0, 0], [0, 0, 0, 0, 1, -1]],
+        dtype="float64",
+    )
+    elements = _np.array(
+        [[0, 2, 1, 3, 2, 1, 3, 0], [2, 1, 3, 0, 0, 2, 1, 3], [4, 4, 4, 4, 5, 5, 5, 5]],
+        dtype="uint32",
+    )
+    return Grid(vertices, elements)
@@ -46,6 +46,12 @@ class DenseAssembler(_assembler.AssemblerBase):
             device_interface,
         )
 
+        if isinstance(mat, _np.memmap):
+            # The file already stores the matrix in the requested precision.
+            return DenseDiscreteBoundaryOperator(
+                mat, tile_size=self.parameters.assembly.dense.out_of_core_tile_size
+            )
+
         if self.parameters.assembly.always_promote_to_double:
             mat = promote_to_double_precision(mat)
 
@@ -58,8 +64,8 @@ def assemble_dense(
     """Assembles the operator and returns a dense matrix."""
     import bempp.api
     from bempp.api.utils.helpers import get_type
+    from bempp.core import pool_assemblers
     from bempp.core.dispatcher import dense_assembler_dispatcher
-    from bempp.core.singular_assembler import assemble_singular_part
 
     precision = operator_descriptor.precision
 
@@ -71,50 +77,276 @@ def assemble_dense(
     else:
         result_type = get_type(precision).real
 
+    if parameters.assembly.dense.out_of_core:
+        return _assemble_dense_out_of_core(
+            domain,
+            dual_to_range,
+            parameters,
+            operator_descriptor,
+            device_interface,
+            result_type,
+        )
+
     result = _np.zeros((rows, cols), dtype=result_type)
 
+    numba_device = device_interface.split("_")[0] == "numba"
+    use_pool = numba_device and pool_assemblers.is_available(
+        domain, dual_to_range, parameters, result.nbytes
+    )
+
     with bempp.api.Timer(
         message=f"Regular assembler:{operator_descriptor.identifier}:{device_interface}"
     ):
-        dense_assembler_dispatcher(
-            device_interface,
-            operator_descriptor,
-            domain,
-            dual_to_range,
-            parameters,
-            result,
+        if use_pool:
+            pool_assemblers.dense_assembler(
+                operator_descriptor, domain, dual_to_range, parameters, result
+            )
+        else:
+            dense_assembler_dispatcher(
+                device_interface,
+                operator_descriptor,
+                domain,
+                dual_to_range,
+                parameters,
+                result,
+            )
+
+    if symmetric_regular_part(
+        operator_descriptor, domain, dual_to_range, parameters, device_interface
+    ):
+        # Only the element pairs with a larger trial element were assembled.
+        from bempp.core.numba_kernels import symmetrize_dense
+
+        symmetrize_dense(result)
+
+    if domain.grid == dual_to_range.grid:
+        singular_rows, singular_cols, singular_values = _singular_entries(
+            domain, dual_to_range, parameters, operator_descriptor, device_interface
         )
+        _np.add.at(result, (singular_rows, singular_cols), singular_values)
 
-    grids_identical = domain.grid == dual_to_range.grid
+    return result
 
-    if grids_identical:
 
-        trial_local2global = domain.local2global.ravel()
-        test_local2global = dual_to_range.local2global.ravel()
-        trial_multipliers = domain.local_multipliers.ravel()
-        test_multipliers = dual_to_range.local_multipliers.ravel()
+def _singular_entries(
+    domain, dual_to_range, parameters, operator_descriptor, device_interface
+):
+    """Return global rows, columns and values of the singular part."""
+    from bempp.core.singular_assembler import assemble_singular_part
 
-        singular_rows, singular_cols, singular_values = assemble_singular_part(
-            domain.localised_space,
-            dual_to_range.localised_space,
-            parameters,
-            operator_descriptor,
-            device_interface,
-        )
+    trial_local2global = domain.local2global.ravel()
+    test_local2global = dual_to_range.local2global.ravel()
+    trial_multipliers = domain.local_multipliers.ravel()
+    test_multipliers = dual_to_range.local_multipliers.ravel()
+
+    singular_rows, singular_cols, singular_values = assemble_singular_part(
+        domain.localised_space,
+        dual_to_range.localised_space,
+        parameters,
+        operator_descriptor,
+        device_interface,
+        scattered_spaces=(domain, dual_to_range),
+    )
+
+    rows = test_local2global[singular_rows]
+    cols = trial_local2global[singular_cols]
+    values = (
+        singular_values
+        * trial_multipliers[singular_cols]
+        * test_multipliers[singular_rows]
+    )
+
+    return rows, cols, values
+
+
+def _assemble_dense_out_of_core(
+    domain,
+    dual_to_range,
+    parameters,
+    operator_descriptor,
+    device_interface,
+    result_type,
+):
+    """
+    Assemble a dense matrix into a memory mapped file.
+
+    The matrix is assembled in blocks of rows of about
+    parameters.assembly.dense.out_of_core_tile_size MB. Each block is
+    assembled in memory with the Numba kernels, which write directly
+    into the block, and is then written to the file. The file is
+    therefore written once and sequentially. Test elements with
+    degrees of freedom in several blocks are assembled for each of
+    them. If parameters.assembly.always_promote_to_double is set, the
+    file stores the matrix in double precision.
+    """
+    import bempp.api
+    from bempp.core.numba_assemblers import dense_assembler_elements
+
+    rows = dual_to_range.global_dof_count
+    cols = domain.global_dof_count
+
+    storage_type = result_type
+    if parameters.assembly.always_promote_to_double:
+        storage_type = _np.promote_types(result_type, _np.float64)
+
+    result = _out_of_core_array(
+        (rows, cols), storage_type, parameters.assembly.dense.out_of_core_dir
+    )
 
-        rows = test_local2global[singular_rows]
-        cols = trial_local2global[singular_cols]
-        values = (
-            singular_values
-            * trial_multipliers[singular_cols]
-            * test_multipliers[singular_rows]
+    if domain.grid == dual_to_range.grid:
+        singular_rows, singular_cols, singular_values = _singular_entries(
+            domain, dual_to_range, parameters, operator_descriptor, device_interface
         )
+        order = _np.argsort(singular_rows, kind="stable")
+        singular_rows = singular_rows[order]
+        singular_cols = singular_cols[order]
+        singular_values = singular_values[order]
+    else:
+        singular_rows = _np.zeros(0, dtype=_np.int64)
+
+    block_size = max(
+        1,
+        parameters.assembly.dense.out_of_core_tile_size
+        * 1024**2
+        // (cols * _np.dtype(result_type).itemsize),
+    )
 
-        _np.add.at(result, (rows, cols), values)
+    local2global = dual_to_range.local2global
+    local_multipliers = dual_to_range.local_multipliers
+    test_indices, test_color_indexptr = dual_to_range.get_elements_by_color()
+
+    with bempp.api.Timer(
+        message=f"Regular assembler:{operator_descriptor.identifier}:numba"
+    ):
+        for start in range(0, rows, block_size):
+            end = min(start + block_size, rows)
+
+            # Dofs outside of the block are mapped with a zero multiplier
+            # to an extra row, which is discarded.
+            block = _np.zeros((1 + end - start, cols), dtype=result_type)
+            in_block = (local2global >= start) & (local2global < end)
+            test_dofs = (
+                _np.where(in_block, local2global - start, end - start).astype(
+                    local2global.dtype
+                ),
+                _np.where(in_block, local_multipliers, 0).astype(
+                    local_multipliers.dtype
+                ),
+            )
+            elements_in_block = _np.any(in_block, axis=1)
+
+            for test_color_index in range(len(test_color_indexptr) - 1):
+                color_elements = test_indices[
+                    test_color_indexptr[test_color_index] : test_color_indexptr[
+                        1 + test_color_index
+                    ]
+                ]
+                color_elements = color_elements[elements_in_block[color_elements]]
+                if len(color_elements) > 0:
+                    dense_assembler_elements(
+                        operator_descriptor,
+                        domain,
+                        dual_to_range,
+                        parameters,
+                        color_elements,
+                        block,
+                        test_dofs,
+                    )
+
+            first, last = _np.searchsorted(singular_rows, [start, end])
+            if last > first:
+                _np.add.at(
+                    block,
+                    (singular_rows[first:last] - start, singular_cols[first:last]),
+                    singular_values[first:last],
+                )
+
+            result[start:end] = block[:-1]
+
+    result.flush()
 
     return result
 
 
+def is_symmetric(operator_descriptor, domain, dual_to_range, parameters):
+    """
+    Return True if an operator is assembled as a symmetric matrix.
+
+    This is the case for the single layer and hypersingular operators
+    of Laplace, Helmholtz and modified Helmholtz if domain and
+    dual_to_range are the same space. Symmetric assembly is enabled
+    with parameters.assembly.symmetric.
+    """
+    return (
+        parameters.assembly.symmetric
+        and operator_descriptor.identifier in _SYMMETRIC_OPERATORS
+        and (domain.id == dual_to_range.id or domain.hash == dual_to_range.hash)
+    )
+
+
+def symmetric_regular_part(
+    operator_descriptor, domain, dual_to_range, parameters, device_interface
+):
+    """
+    Return True if the regular part is assembled from half the element pairs.
+
+    Only the Numba kernels support this. The assembled matrix needs to
+    be symmetrized afterwards, which is not done for out-of-core matrices.
+    """
+    return (
+        device_interface.split("_")[0] == "numba"
+        and not parameters.assembly.dense.out_of_core
+        and is_symmetric(operator_descriptor, domain, dual_to_range, parameters)
+    )
+
+
+_SYMMETRIC_OPERATORS = [
+    "laplace_single_layer_boundary",
+    "laplace_hypersingular_boundary",
+    "helmholtz_single_layer_boundary",
+    "helmholtz_hypersingular_boundary",
+    "modified_helmholtz_single_layer_boundary",
+    "modified_helmholtz_hypersingular_boundary",
+]
+
+
+def _out_of_core_array(shape, dtype, directory):
+    """
+    Create a zero initialised array in a memory mapped file.
+
+    The file is created in directory, or in the default temporary
+    directory if directory is None. It is removed once the array
+    is garbage collected.
+    """
+    import os
+    import tempfile
+    import weakref
+    import bempp.api
+
+    fd, filename = tempfile.mkstemp(suffix=".dat", prefix="bempp_dense_", dir=directory)
+    os.close(fd)
+
+    result = _np.memmap(filename, dtype=dtype, mode="w+", shape=shape)
+    weakref.finalize(result, _remove_file, filename)
+
+    bempp.api.log(
+        f"Assembling dense matrix of size {result.nbytes // 1024 ** 2} MB "
+        + f"into {filename}."
+    )
+
+    return result
+
+
+def _remove_file(filename):
+    """Remove a file and ignore errors."""
+    import os
+
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
 # @_timeit
 # def assemble_dense(
 # domain,
@@ -0,0 +1,219 @@
+"""Dense assembly of batches of operators in one sweep over the elements."""
+
+import numpy as _np
+
+
+def assemble_dense_batched(
+    domain,
+    dual_to_range,
+    parameters,
+    assembly_functions,
+    kernel_functions,
+    kernel_parameters,
+    nbatch,
+    result_type,
+    precision,
+    name,
+):
+    """
+    Assemble a batch of dense operators.
+
+    The assembly functions and kernel functions are pairs of Numba
+    functions for the regular and the singular part. The kernels return
+    the values of all operators in the batch for each point pair, so
+    that geometry and quadrature are processed once for the whole batch.
+    Returns an array of shape (nbatch, rows, cols).
+    """
+    for space in [domain, dual_to_range]:
+        if space.requires_dof_transformation:
+            raise ValueError(
+                "Spaces that require dof transformations not supported for dense assembly."
+            )
+
+    result = _np.zeros(
+        (nbatch, dual_to_range.global_dof_count, domain.global_dof_count),
+        dtype=result_type,
+    )
+
+    _assemble_regular_part(
+        domain,
+        dual_to_range,
+        parameters,
+        assembly_functions[0],
+        kernel_functions[0],
+        kernel_parameters,
+        precision,
+        name,
+        result,
+    )
+
+    if domain.grid == dual_to_range.grid:
+        _add_singular_part(
+            domain,
+            dual_to_range,
+            parameters,
+            assembly_functions[1],
+            kernel_functions[1],
+            kernel_parameters,
+            precision,
+            name,
+            result,
+        )
+
+    return result
+
+
+def _assemble_regular_part(
+    domain,
+    dual_to_range,
+    parameters,
+    assembly_function,
+    kernel_function,
+    kernel_parameters,
+    precision,
+    name,
+    result,
+):
+    """Assemble the regular part of a batch by colors and tiles."""
+    import bempp.api
+    from bempp.api.utils.helpers import get_type
+    from bempp.api.integration.triangle_gauss import rule
+
+    data_type = get_type(precision).real
+
+    quad_points, quad_weights = rule(parameters.quadrature.regular)
+    quad_points = quad_points.astype(data_type)
+    quad_weights = quad_weights.astype(data_type)
+    test_multipliers = dual_to_range.local_multipliers.astype(data_type)
+    trial_multipliers = domain.local_multipliers.astype(data_type)
+    grids_identical = domain.grid == dual_to_range.grid
+
+    test_indices, test_color_indexptr = dual_to_range.get_elements_by_color()
+    trial_elements, _ = domain.get_elements_by_color()
+
+    with bempp.api.Timer(message=f"Regular assembler:{name}:numba"):
+        for test_color_index in range(len(test_color_indexptr) - 1):
+            test_elements = test_indices[
+                test_color_indexptr[test_color_index] : test_color_indexptr[
+                    1 + test_color_index
+                ]
+            ]
+            test_tile_size = parameters.assembly.dense.test_tile_size or len(
+                test_elements
+            )
+            trial_tile_size = parameters.assembly.dense.trial_tile_size or len(
+                trial_elements
+            )
+            for test_start in range(0, len(test_elements), test_tile_size):
+                for trial_start in range(0, len(trial_elements), trial_tile_size):
+                    assembly_function(
+                        dual_to_range.grid.data(precision),
+                        domain.grid.data(precision),
+                        dual_to_range.number_of_shape_functions,
+                        domain.number_of_shape_functions,
+                        test_elements[test_start : test_start + test_tile_size],
+                        trial_elements[trial_start : trial_start + trial_tile_size],
+                        test_multipliers,
+                        trial_multipliers,
+                        dual_to_range.local2global,
+                        domain.local2global,
+                        dual_to_range.normal_multipliers,
+                        domain.normal_multipliers,
+                        quad_points,
+                        quad_weights,
+                        kernel_function,
+                        kernel_parameters,
+                        grids_identical,
+                        dual_to_range.shapeset.evaluate,
+                        domain.shapeset.evaluate,
+                        result,
+                    )
+
+
+def _add_singular_part(
+    domain,
+    dual_to_range,
+    parameters,
+    assembly_function,
+    kernel_function,
+    kernel_parameters,
+    precision,
+    name,
+    result,
+):
+    """Assemble the singular part of a batch and add it to the result."""
+    import bempp.api
+    from bempp.core.singular_assembler import (
+        _SingularQuadratureRuleInterfaceGalerkin,
+        singular_local_indices,
+    )
+
+    nbatch = result.shape[0]
+    nshape_test = dual_to_range.number_of_shape_functions
+    nshape_trial = domain.number_of_shape_functions
+    local_domain = domain.localised_space
+    local_dual_to_range = dual_to_range.localised_space
+
+    singular_rule = _SingularQuadratureRuleInterfaceGalerkin(
+        domain.grid,
+        parameters.quadrature.singular,
+        local_domain.support,
+        local_dual_to_range.support,
+    )
+
+    [
+        test_points,
+        trial_points,
+        quad_weights,
+        test_elements,
+        trial_elements,
+        test_offsets,
+        trial_offsets,
+        weights_offsets,
+        number_of_quad_points,
+    ] = singular_rule.get_arrays(precision)
+
+    singular_values = _np.zeros(
+        (nbatch, nshape_test * nshape_trial * len(test_elements)), dtype=result.dtype
+    )
+
+    with bempp.api.Timer(message=f"Singular assembler:{name}:numba"):
+        assembly_function(
+            domain.grid.data(precision),
+            test_points,
+            trial_points,
+            quad_weights,
+            test_elements,
+            trial_elements,
+            test_offsets,
+            trial_offsets,
+            weights_offsets,
+            number_of_quad_points,
+            local_dual_to_range.normal_multipliers,
+            local_domain.normal_multipliers,
+            nshape_test,
+            nshape_trial,
+            local_dual_to_range.shapeset.evaluate,
+            local_domain.shapeset.evaluate,
+            kernel_function,
+            kernel_parameters,
+            singular_values,
+        )
+
+    singular_rows, singular_cols = singular_local_indices(
+        singular_rule, nshape_test, nshape_trial
+    )
+
+    rows = dual_to_range.local2global.ravel()[singular_rows]
+    cols = domain.local2global.ravel()[singular_cols]
+    multipliers = (
+        dual_to_range.local_multipliers.ravel()[singular_rows]
+        * domain.local_multipliers.ravel()[singular_cols]
+    )
+
+    for batch_index in range(nbatch):
+        _np.add.at(
+            result[batch_index],
+            (rows, cols),
+            singular_values[batch_index] * multipliers,
+        )
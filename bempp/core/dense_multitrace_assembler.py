@@ -0,0 +1,114 @@
+"""Fused dense assembly of the blocks of multitrace operators."""
+
+import numpy as _np
+
+from bempp.api.assembly import assembler as _assembler
+
+_BLOCK_NAMES = [
+    "single_layer",
+    "double_layer",
+    "adjoint_double_layer",
+    "hypersingular",
+]
+
+
+class DenseMultitraceAssembler(_assembler.AssemblerBase):
+    """
+    Dense assembler for the four blocks of a multitrace operator.
+
+    One instance is shared by the single layer, double layer, adjoint
+    double layer and hypersingular operator of a multitrace operator.
+    The first assembly of any of these operators computes all four
+    blocks in one sweep over the element pairs with the Numba kernels.
+    The other blocks are kept until their operators are assembled.
+    """
+
+    def __init__(self, domain, dual_to_range, kernel, parameters=None):
+        """
+        Create a multitrace assembler.
+
+        The kernel is either 'laplace' or 'helmholtz'.
+        """
+        super().__init__(domain, dual_to_range, parameters)
+
+        if kernel not in ["laplace", "helmholtz"]:
+            raise ValueError("Kernel must be one of 'laplace' or 'helmholtz'.")
+
+        self._kernel = kernel
+        self._blocks = {}
+
+    def assemble(
+        self, operator_descriptor, device_interface, precision, *args, **kwargs
+    ):
+        """Return the dense block of the multitrace operator."""
+        from bempp.api.assembly.discrete_boundary_operator import (
+            DenseDiscreteBoundaryOperator,
+        )
+        from bempp.api.utils.helpers import promote_to_double_precision
+
+        options = tuple(operator_descriptor.options)
+        key = (operator_descriptor.identifier, options, precision)
+
+        if key not in self._blocks:
+            matrices = assemble_dense_multitrace(
+                self.domain,
+                self.dual_to_range,
+                self.parameters,
+                self._kernel,
+                options,
+                precision,
+            )
+            for name, mat in zip(_BLOCK_NAMES, matrices):
+                identifier = f"{self._kernel}_{name}_boundary"
+                self._blocks[(identifier, options, precision)] = mat
+
+        mat = self._blocks.pop(key)
+
+        if self.parameters.assembly.always_promote_to_double:
+            mat = promote_to_double_precision(mat)
+
+        return DenseDiscreteBoundaryOperator(mat)
+
+
+def assemble_dense_multitrace(
+    domain, dual_to_range, parameters, kernel, options, precision
+):
+    """
+    Assemble the dense blocks of a multitrace operator.
+
+    Returns an array of shape (4, rows, cols) with the single layer,
+    double layer, adjoint double layer and hypersingular operator. The
+    domain and dual_to_range must be linear spaces.
+    """
+    from bempp.api.utils.helpers import get_type
+    from bempp.core import numba_kernels
+    from bempp.core.dense_batched_assembler import assemble_dense_batched
+
+    for space in [domain, dual_to_range]:
+        if space.number_of_shape_functions != 3:
+            raise ValueError("Multitrace assembly requires linear spaces.")
+
+    data_type = get_type(precision).real
+    if kernel == "helmholtz":
+        result_type = get_type(precision).complex
+    else:
+        result_type = data_type
+
+    return assemble_dense_batched(
+        domain,
+        dual_to_range,
+        parameters,
+        (
+            numba_kernels.default_scalar_multitrace_regular,
+            numba_kernels.default_scalar_multitrace_singular,
+        ),
+        (
+            getattr(numba_kernels, f"{kernel}_multitrace_regular"),
+            getattr(numba_kernels, f"{kernel}_multitrace_singular"),
+        ),
+        _np.array(options, dtype=data_type),
+        4,
+        result_type,
+        precision,
+        f"{kernel}_multitrace",
+    )
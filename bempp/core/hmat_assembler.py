@@ -0,0 +1,621 @@
+"""Hierarchical matrix assembler based on adaptive cross approximation."""
+
+import numpy as _np
+
+from bempp.api.assembly import assembler as _assembler
+
+
+class HMatAssembler(_assembler.AssemblerBase):
+    """Assembler that compresses integral operators into H-matrices."""
+
+    # pylint: disable=useless-super-delegation
+    def __init__(self, domain, dual_to_range, parameters=None):
+        """Create an H-matrix assembler instance."""
+        super().__init__(domain, dual_to_range, parameters)
+
+    def assemble(
+        self, operator_descriptor, device_interface, precision, *args, **kwargs
+    ):
+        """H-matrix assembly of the integral operator."""
+        from bempp.api.assembly.discrete_boundary_operator import (
+            GenericDiscreteBoundaryOperator,
+        )
+
+        if (
+            self.domain.requires_dof_transformation
+            or self.dual_to_range.requires_dof_transformation
+        ):
+            raise ValueError(
+                "Spaces that require dof transformations not supported for H-matrix assembly."
+            )
+
+        hmatrix = assemble_hmatrix(
+            self.domain,
+            self.dual_to_range,
+            self.parameters,
+            operator_descriptor,
+            device_interface,
+        )
+
+        return GenericDiscreteBoundaryOperator(hmatrix)
+
+
+class HMatrix(object):
+    """
+    Block compressed representation of an integral operator.
+
+    The matrix is stored as a list of dense near-field blocks,
+    a list of low-rank far-field blocks of the form U @ V and
+    a sparse matrix with the singular contributions from
+    adjacent elements.
+    """
+
+    def __init__(self, shape, dtype, dense_blocks, low_rank_blocks, singular_part):
+        """Initialize an H-matrix. Should not be called by the user."""
+
+        self.shape = shape
+        self.dtype = _np.dtype(dtype)
+        self._dense_blocks = dense_blocks
+        self._low_rank_blocks = low_rank_blocks
+        self._singular_part = singular_part
+
+    @property
+    def dense_blocks(self):
+        """Return the list of (rows, cols, mat) near-field blocks."""
+        return self._dense_blocks
+
+    @property
+    def low_rank_blocks(self):
+        """Return the list of (rows, cols, U, V) far-field blocks."""
+        return self._low_rank_blocks
+
+    @property
+    def singular_part(self):
+        """Return the sparse singular part."""
+        return self._singular_part
+
+    @property
+    def memory(self):
+        """Return the number of bytes used by the compressed blocks."""
+        nbytes = sum(block[2].nbytes for block in self._dense_blocks)
+        nbytes += sum(
+            block[2].nbytes + block[3].nbytes for block in self._low_rank_blocks
+        )
+        if self._singular_part is not None:
+            nbytes += (
+                self._singular_part.data.nbytes
+                + self._singular_part.indices.nbytes
+                + self._singular_part.indptr.nbytes
+            )
+        return nbytes
+
+    @property
+    def compression_rate(self):
+        """Return the ratio of compressed to dense storage."""
+        return self.memory / (self.shape[0] * self.shape[1] * self.dtype.itemsize)
+
+    @property
+    def maximum_rank(self):
+        """Return the maximum rank of the far-field blocks."""
+        return max((block[2].shape[1] for block in self._low_rank_blocks), default=0)
+
+    def matvec(self, x):
+        """Perform a matvec."""
+
+        ndim = len(x.shape)
+
+        if ndim > 2:
+            raise ValueError(
+                "x must have shape (N, ) or (N, K), where N is number of columns."
+            )
+
+        mat = x.reshape(self.shape[1], -1)
+        result = _np.zeros(
+            (self.shape[0], mat.shape[1]), dtype=_np.result_type(self.dtype, mat)
+        )
+
+        for rows, cols, block in self._dense_blocks:
+            result[rows] += block @ mat[cols]
+
+        for rows, cols, u_mat, v_mat in self._low_rank_blocks:
+            result[rows] += u_mat @ (v_mat @ mat[cols])
+
+        if self._singular_part is not None:
+            result += self._singular_part @ mat
+
+        if ndim == 1:
+            return result.ravel()
+        return result
+
+
+class _SpaceBlockData(object):
+    """Element and dof data of a space required for block evaluations."""
+
+    def __init__(self, space, precision):
+        """Initialize the block data for a given space."""
+        from bempp.api.utils.helpers import get_type
+
+        data_type = get_type(precision).real
+
+        self.space = space
+        self.grid_data = space.grid.data(precision)
+        self.local2global = space.local2global
+        self.multipliers = space.local_multipliers.astype(data_type)
+        self.color_map = space.color_map
+
+        elements = _np.repeat(
+            _np.arange(space.grid.number_of_elements, dtype="uint32"),
+            space.number_of_shape_functions,
+        ).reshape(space.local2global.shape)
+        mask = space.local_multipliers != 0
+
+        dofs = space.local2global[mask]
+        order = _np.argsort(dofs, kind="stable")
+        self.dof_elements = elements[mask][order]
+        self.dof_elements_ptr = _np.zeros(1 + space.global_dof_count, dtype="int64")
+        self.dof_elements_ptr[1:] = _np.cumsum(
+            _np.bincount(dofs, minlength=space.global_dof_count)
+        )
+
+        # Scratch arrays to map global dofs into the index space of a block.
+        self._positions = -_np.ones(space.global_dof_count, dtype="int64")
+        self._block_local2global = _np.zeros_like(space.local2global)
+
+    def dof_bounding_boxes(self):
+        """Return (lbound, ubound) arrays of shape (N, 3) for the dof supports."""
+        grid = self.space.grid
+        element_vertices = grid.vertices[:, grid.elements]
+        element_lbound = _np.min(element_vertices, axis=1).T
+        element_ubound = _np.max(element_vertices, axis=1).T
+
+        count = self.space.global_dof_count
+        lbound = _np.full((count, 3), _np.inf)
+        ubound = _np.full((count, 3), -_np.inf)
+
+        dofs = _np.repeat(_np.arange(count), _np.diff(self.dof_elements_ptr))
+        _np.minimum.at(lbound, dofs, element_lbound[self.dof_elements])
+        _np.maximum.at(ubound, dofs, element_ubound[self.dof_elements])
+
+        return lbound, ubound
+
+    def elements_for_dofs(self, dofs):
+        """Return the elements in the support of a set of dofs."""
+        starts = self.dof_elements_ptr[dofs]
+        counts = self.dof_elements_ptr[_np.asarray(dofs) + 1] - starts
+        if len(dofs) == 1:
+            return self.dof_elements[starts[0] : starts[0] + counts[0]]
+        offsets = _np.repeat(starts - _np.cumsum(counts) + counts, counts)
+        return _np.unique(self.dof_elements[offsets + _np.arange(_np.sum(counts))])
+
+    def block_local2global(self, dofs, elements):
+        """
+        Return a local2global map into the index space of a block.
+
+        The dofs of the block are numbered 0, ..., len(dofs) - 1. Other
+        dofs on the given elements are mapped to the dummy index len(dofs).
+        Only the rows of the given elements are valid.
+        """
+        self._positions[dofs] = _np.arange(len(dofs))
+        local = self._positions[self.local2global[elements]]
+        local[local == -1] = len(dofs)
+        self._block_local2global[elements] = local
+        self._positions[dofs] = -1
+        return self._block_local2global
+
+
+class _BlockEvaluator(object):
+    """Evaluate arbitrary blocks of the regular part of the Galerkin matrix."""
+
+    def __init__(self, domain, dual_to_range, parameters, operator_descriptor):
+        """Initialize the block evaluator."""
+        from bempp.api.integration.triangle_gauss import rule
+        from bempp.api.utils.helpers import get_type
+        from bempp.core.numba_kernels import select_numba_kernels
+
+        precision = operator_descriptor.precision
+        data_type = get_type(precision).real
+
+        if operator_descriptor.is_complex:
+            self.dtype = _np.dtype(get_type(precision).complex)
+        else:
+            self.dtype = _np.dtype(data_type)
+
+        (
+            self._assembly_function,
+            self._kernel_function,
+        ) = select_numba_kernels(operator_descriptor, mode="regular")
+
+        quad_points, quad_weights = rule(parameters.quadrature.regular)
+        self._quad_points = quad_points.astype(data_type)
+        self._quad_weights = quad_weights.astype(data_type)
+        self._kernel_parameters = _np.array(
+            operator_descriptor.options, dtype=data_type
+        )
+
+        self._grids_identical = domain.grid == dual_to_range.grid
+        self.test = _SpaceBlockData(dual_to_range, precision)
+        self.trial = _SpaceBlockData(domain, precision)
+
+    def evaluate(self, rows, cols, test_elements=None, trial_elements=None):
+        """
+        Return the dense block with the given global rows and columns.
+
+        The supports of the rows and columns can be passed as
+        test_elements and trial_elements if already known.
+        """
+        if test_elements is None:
+            test_elements = self.test.elements_for_dofs(rows)
+        if trial_elements is None:
+            trial_elements = self.trial.elements_for_dofs(cols)
+
+        test_local2global = self.test.block_local2global(rows, test_elements)
+        trial_local2global = self.trial.block_local2global(cols, trial_elements)
+
+        # Extra row and column collect contributions from dofs outside the block
+        result = _np.zeros((1 + len(rows), 1 + len(cols)), dtype=self.dtype)
+
+        # Elements of the same color do not share dofs, so that
+        # the parallel regular kernels can sum into the result safely.
+        test_colors = self.test.color_map[test_elements]
+        for color in _np.unique(test_colors):
+            self._assembly_function(
+                self.test.grid_data,
+                self.trial.grid_data,
+                self.test.space.number_of_shape_functions,
+                self.trial.space.number_of_shape_functions,
+                test_elements[test_colors == color],
+                trial_elements,
+                self.test.multipliers,
+                self.trial.multipliers,
+                test_local2global,
+                trial_local2global,
+                self.test.space.normal_multipliers,
+                self.trial.space.normal_multipliers,
+                self._quad_points,
+                self._quad_weights,
+                self._kernel_function,
+                self._kernel_parameters,
+                self._grids_identical,
+                self.test.space.shapeset.evaluate,
+                self.trial.space.shapeset.evaluate,
+                result,
+            )
+
+        return result[:-1, :-1]
+
+
+def assemble_hmatrix(
+    domain, dual_to_range, parameters, operator_descriptor, device_interface
+):
+    """Assemble the operator and return an H-matrix."""
+    import bempp.api
+    from bempp.api.utils.helpers import promote_to_double_precision
+    from bempp.core.singular_assembler import SingularAssembler
+
+    evaluator = _BlockEvaluator(domain, dual_to_range, parameters, operator_descriptor)
+
+    dense_blocks = []
+    low_rank_blocks = []
+
+    with bempp.api.Timer(
+        message=f"H-matrix assembler:{operator_descriptor.identifier}"
+    ):
+        near_field, far_field = compute_block_partition(
+            evaluator.test, evaluator.trial, parameters.hmat
+        )
+
+        for rows, cols in near_field:
+            dense_blocks.append((rows, cols, evaluator.evaluate(rows, cols)))
+
+        for rows, cols in far_field:
+            test_elements = evaluator.test.elements_for_dofs(rows)
+            trial_elements = evaluator.trial.elements_for_dofs(cols)
+            mat = None
+            if len(rows) * len(cols) <= parameters.hmat.aca_minimum_block_size:
+                # Small blocks are cheaper to evaluate in one kernel call
+                # than row by row, so compress them directly.
+                mat = evaluator.evaluate(rows, cols, test_elements, trial_elements)
+                low_rank = truncated_svd(mat, parameters.hmat.eps)
+            else:
+                low_rank = aca(
+                    lambda i, r=rows, c=cols, e=trial_elements: evaluator.evaluate(
+                        r[i : i + 1], c, trial_elements=e
+                    )[0],
+                    lambda j, r=rows, c=cols, e=test_elements: evaluator.evaluate(
+                        r, c[j : j + 1], test_elements=e
+                    )[:, 0],
+                    len(rows),
+                    len(cols),
+                    parameters.hmat.eps,
+                    parameters.hmat.max_rank,
+                )
+            if low_rank is None:
+                if mat is None:
+                    mat = evaluator.evaluate(rows, cols, test_elements, trial_elements)
+                dense_blocks.append((rows, cols, mat))
+            else:
+                low_rank_blocks.append((rows, cols) + low_rank)
+
+    if domain.grid == dual_to_range.grid:
+        singular_part = (
+            SingularAssembler(domain, dual_to_range, parameters)
+            .assemble(
+                operator_descriptor, device_interface, operator_descriptor.precision
+            )
+            .A
+        )
+    else:
+        singular_part = None
+
+    dtype = evaluator.dtype
+
+    if parameters.assembly.always_promote_to_double:
+        dense_blocks = [
+            (rows, cols, promote_to_double_precision(mat))
+            for rows, cols, mat in dense_blocks
+        ]
+        low_rank_blocks = [
+            (
+                rows,
+                cols,
+                promote_to_double_precision(u_mat),
+                promote_to_double_precision(v_mat),
+            )
+            for rows, cols, u_mat, v_mat in low_rank_blocks
+        ]
+        dtype = promote_to_double_precision(_np.zeros(1, dtype=dtype)).dtype
+
+    hmatrix = HMatrix(
+        (dual_to_range.global_dof_count, domain.global_dof_count),
+        dtype,
+        dense_blocks,
+        low_rank_blocks,
+        singular_part,
+    )
+
+    bempp.api.log(
+        f"H-matrix: {len(dense_blocks)} dense blocks, {len(low_rank_blocks)} "
+        + f"low-rank blocks, maximum rank {hmatrix.maximum_rank}, "
+        + f"compression rate {hmatrix.compression_rate:.3f}."
+    )
+
+    return hmatrix
+
+
+def compute_block_partition(test_data, trial_data, hmat_parameters):
+    """
+    Compute the near-field and far-field blocks of an H-matrix.
+
+    Cluster trees for the test and trial dofs are obtained from
+    Octrees over the centers of the dof supports with a common
+    bounding box. Starting with the root pair the block tree is
+    refined until a block is admissible, that is
+    min(diam(s), diam(t)) <= admissibility * dist(s, t), or one
+    of the clusters is a leaf.
+
+    Returns a tuple (near_field, far_field) of lists of (rows, cols)
+    index arrays.
+    """
+    from bempp.api.utils.octree import Octree
+
+    test_lbound, test_ubound = test_data.dof_bounding_boxes()
+    trial_lbound, trial_ubound = trial_data.dof_bounding_boxes()
+
+    lbound = _np.minimum(_np.min(test_lbound, axis=0), _np.min(trial_lbound, axis=0))
+    ubound = _np.maximum(_np.max(test_ubound, axis=0), _np.max(trial_ubound, axis=0))
+
+    # Enlarge the box slightly so that all points are strictly inside.
+    diameter = ubound - lbound
+    lbound = lbound - 1e-5 * _np.max(diameter)
+    ubound = ubound + 1e-5 * _np.max(diameter)
+
+    min_block_size = hmat_parameters.min_block_size
+    max_dofs = max(len(test_lbound), len(trial_lbound))
+    # Surface dofs approximately quadruple in each refinement level.
+    maximum_level = max(
+        1, int(_np.ceil(_np.log(max(1, max_dofs / min_block_size)) / _np.log(4)))
+    )
+
+    test_tree = _ClusterTree(
+        Octree(
+            lbound, ubound, maximum_level, (0.5 * (test_lbound + test_ubound)).T.copy()
+        ),
+        test_lbound,
+        test_ubound,
+    )
+    trial_tree = _ClusterTree(
+        Octree(
+            lbound,
+            ubound,
+            maximum_level,
+            (0.5 * (trial_lbound + trial_ubound)).T.copy(),
+        ),
+        trial_lbound,
+        trial_ubound,
+    )
+
+    near_field = []
+    far_field = []
+
+    stack = [(0, 0, 0)]
+
+    while stack:
+        level, test_node, trial_node = stack.pop()
+        rows = test_tree.dofs(test_node, level)
+        cols = trial_tree.dofs(trial_node, level)
+        if len(rows) == 0 or len(cols) == 0:
+            continue
+        test_box = test_tree.bounding_box(rows)
+        trial_box = trial_tree.bounding_box(cols)
+        if _is_admissible(test_box, trial_box, hmat_parameters.admissibility):
+            far_field.append((rows, cols))
+        elif (
+            level == maximum_level
+            or len(rows) <= min_block_size
+            or len(cols) <= min_block_size
+        ):
+            near_field.append((rows, cols))
+        else:
+            for test_child in range(test_node << 3, 8 + (test_node << 3)):
+                for trial_child in range(trial_node << 3, 8 + (trial_node << 3)):
+                    stack.append((level + 1, test_child, trial_child))
+
+    return near_field, far_field
+
+
+class _ClusterTree(object):
+    """Map Octree nodes to the dofs they contain."""
+
+    def __init__(self, octree, lbound, ubound):
+        """Initialize the cluster tree."""
+        self._leaf_nodes = octree.non_empty_leaf_nodes.astype("int64")
+        self._leaf_nodes_ptr = octree.leaf_nodes_ptr.astype("int64")
+        self._sorted_indices = octree.sorted_indices.astype("int64")
+        self._maximum_level = octree.maximum_level
+        self._lbound = lbound
+        self._ubound = ubound
+
+    def dofs(self, node, level):
+        """Return the dofs contained in a node of a given level."""
+        # Morton indices of the leafs below a node form a contiguous range.
+        shift = 3 * (self._maximum_level - level)
+        first, last = _np.searchsorted(
+            self._leaf_nodes, [node << shift, (node + 1) << shift]
+        )
+        return self._sorted_indices[
+            self._leaf_nodes_ptr[first] : self._leaf_nodes_ptr[last]
+        ]
+
+    def bounding_box(self, dofs):
+        """Return the bounding box of the supports of a set of dofs."""
+        return (
+            _np.min(self._lbound[dofs], axis=0),
+            _np.max(self._ubound[dofs], axis=0),
+        )
+
+
+def _is_admissible(box1, box2, admissibility):
+    """Check the admissibility condition of two bounding boxes."""
+    diam1 = _np.linalg.norm(box1[1] - box1[0])
+    diam2 = _np.linalg.norm(box2[1] - box2[0])
+    gap = _np.maximum(0, _np.maximum(box1[0] - box2[1], box2[0] - box1[1]))
+    dist = _np.linalg.norm(gap)
+    return dist > 0 and min(diam1, diam2) <= admissibility * dist
+
+
+def aca(row_fun, col_fun, m, n, eps, max_rank):
+    """
+    Adaptive cross approximation with partial pivoting.
+
+    Approximates an m x n matrix given by the functions row_fun(i)
+    and col_fun(j), which return the ith row and jth column,
+    by a product U @ V with U of shape (m, k) and V of shape (k, n).
+    The approximation is stopped if the relative Frobenius norm of the
+    last update is below eps and then recompressed by a truncated SVD.
+
+    Returns (U, V) or None if the rank exceeds max_rank or
+    if the low-rank representation is not cheaper than the dense block.
+    """
+    u_list = []
+    v_list = []
+
+    used_rows = _np.zeros(m, dtype=_np.bool_)
+    used_cols = _np.zeros(n, dtype=_np.bool_)
+
+    max_rank = min(max_rank, m, n)
+
+    norm_squared = 0
+    pivot_row = 0
+    converged = False
+
+    while len(u_list) < max_rank:
+        used_rows[pivot_row] = True
+        row = row_fun(pivot_row)
+        for u_vec, v_vec in zip(u_list, v_list):
+            row = row - u_vec[pivot_row] * v_vec
+
+        abs_row = _np.abs(row)
+        abs_row[used_cols] = -1
+        pivot_col = _np.argmax(abs_row)
+
+        if abs_row[pivot_col] <= 0:
+            # Row is already represented exactly. Try another row.
+            remaining = _np.flatnonzero(~used_rows)
+            if len(remaining) == 0:
+                converged = True
+                break
+            pivot_row = remaining[0]
+            continue
+
+        used_cols[pivot_col] = True
+        v_vec = row / row[pivot_col]
+        u_vec = col_fun(pivot_col)
+        for u_old, v_old in zip(u_list, v_list):
+            u_vec = u_vec - v_old[pivot_col] * u_old
+
+        u_norm = _np.linalg.norm(u_vec)
+        v_norm = _np.linalg.norm(v_vec)
+
+        for u_old, v_old in zip(u_list, v_list):
+            norm_squared += 2 * _np.real(
+                _np.vdot(u_old, u_vec) * _np.vdot(v_old, v_vec)
+            )
+        norm_squared += (u_norm * v_norm) ** 2
+
+        u_list.append(u_vec)
+        v_list.append(v_vec)
+
+        if u_norm * v_norm <= eps * _np.sqrt(abs(norm_squared)):
+            converged = True
+            break
+
+        abs_col = _np.abs(u_vec)
+        abs_col[used_rows] = -1
+        pivot_row = _np.argmax(abs_col)
+        if abs_col[pivot_row] < 0:
+            converged = True
+            break
+
+    if not converged:
+        return None
+
+    if len(u_list) == 0:
+        return _np.zeros((m, 0), dtype=row.dtype), _np.zeros((0, n), dtype=row.dtype)
+
+    # Recompress the cross approximation via QR and SVD.
+    q_u, r_u = _np.linalg.qr(_np.array(u_list).T)
+    q_v, r_v = _np.linalg.qr(_np.array(v_list).T)
+    left, sigma, right = _truncated_svd(r_u @ r_v.T, eps)
+
+    if len(sigma) * (m + n) >= m * n:
+        return None
+
+    return q_u @ (left * sigma), right @ q_v.T
+
+
+def truncated_svd(mat, eps):
+    """
+    Compress a matrix via a truncated SVD.
+
+    The rank is chosen as the smallest rank such that the
+    relative Frobenius norm error is below eps. Returns (U, V)
+    or None if the low-rank representation is not cheaper
+    than the dense matrix.
+    """
+    m, n = mat.shape
+    left, sigma, right = _truncated_svd(mat, eps)
+
+    if len(sigma) * (m + n) >= m * n:
+        return None
+
+    return left * sigma, right
+
+
+def _truncated_svd(mat, eps):
+    """Return the SVD of mat truncated to relative Frobenius accuracy eps."""
+    left, sigma, right = _np.linalg.svd(mat, full_matrices=False)
+
+    tail = _np.sqrt(_np.cumsum(sigma[::-1] ** 2))[::-1]
+    rank = _np.count_nonzero(tail > eps * tail[0]) if len(sigma) > 0 else 0
+
+    return left[:, :rank], sigma[:rank], right[:rank, :]
@@ -58,6 +58,52 @@ def dense_assembler(
     device_interface, operator_descriptor, domain, dual_to_range, parameters, result
 ):
     """Numba based dense assembler."""
+    test_indices, test_color_indexptr = dual_to_range.get_elements_by_color()
+    number_of_test_colors = len(test_color_indexptr) - 1
+
+    for test_color_index in range(number_of_test_colors):
+        dense_assembler_elements(
+            operator_descriptor,
+            domain,
+            dual_to_range,
+            parameters,
+            test_indices[
+                test_color_indexptr[test_color_index] : test_color_indexptr[
+                    1 + test_color_index
+                ]
+            ],
+            result,
+        )
+
+
+def dense_assembler_elements(
+    operator_descriptor,
+    domain,
+    dual_to_range,
+    parameters,
+    test_elements,
+    result,
+    test_dofs=None,
+):
+    """
+    Assemble the regular part for a subset of test elements.
+
+    The test elements must not share any degrees of freedom,
+    e.g. they all have the same color. The element pairs are processed
+    in tiles of parameters.assembly.dense.test_tile_size test elements
+    and parameters.assembly.dense.trial_tile_size trial elements. A value
+    of None means no tiling in that direction. The tiles bound the
+    temporary storage of the kernels, which is proportional to the
+    number of trial elements in each parallel test iteration.
+
+    For symmetric operators only the element pairs with a larger trial
+    element are assembled. The result must then be symmetrized.
+
+    If given, test_dofs is a tuple of a local2global map and local
+    multipliers that replace those of dual_to_range. This is used to
+    assemble a block of rows.
+    """
+    from bempp.core.dense_assembler import symmetric_regular_part
     from bempp.core.numba_kernels import select_numba_kernels
     from bempp.api.utils.helpers import get_type
     from bempp.api.integration.triangle_gauss import rule
@@ -74,45 +120,67 @@ def dense_assembler(
 
     data_type = get_type(precision).real
 
-    test_indices, test_color_indexptr = dual_to_range.get_elements_by_color()
-    trial_indices, trial_color_indexptr = domain.get_elements_by_color()
-    number_of_test_colors = len(test_color_indexptr) - 1
-    # number_of_trial_colors = len(trial_color_indexptr) - 1
-
-    # rows = dual_to_range.global_dof_count
-    # cols = domain.global_dof_count
+    trial_elements, _ = domain.get_elements_by_color()
 
     nshape_test = dual_to_range.number_of_shape_functions
     nshape_trial = domain.number_of_shape_functions
     grids_identical = domain.grid == dual_to_range.grid
 
-    for test_color_index in range(number_of_test_colors):
-        numba_assembly_function_regular(
-            dual_to_range.grid.data(precision),
-            domain.grid.data(precision),
-            nshape_test,
-            nshape_trial,
-            test_indices[
-                test_color_indexptr[test_color_index] : test_color_indexptr[
-                    1 + test_color_index
-                ]
-            ],
-            trial_indices,
-            dual_to_range.local_multipliers.astype(data_type),
-            domain.local_multipliers.astype(data_type),
-            dual_to_range.local2global,
-            domain.local2global,
-            dual_to_range.normal_multipliers,
-            domain.normal_multipliers,
-            quad_points.astype(data_type),
-            quad_weights.astype(data_type),
-            numba_kernel_function_regular,
-            _np.array(operator_descriptor.options, dtype=data_type),
-            grids_identical,
-            dual_to_range.shapeset.evaluate,
-            domain.shapeset.evaluate,
-            result,
-        )
+    if test_dofs is None:
+        test_dofs = (dual_to_range.local2global, dual_to_range.local_multipliers)
+
+    test_local2global = test_dofs[0]
+    test_multipliers = test_dofs[1].astype(data_type)
+    trial_multipliers = domain.local_multipliers.astype(data_type)
+    quad_points = quad_points.astype(data_type)
+    quad_weights = quad_weights.astype(data_type)
+    kernel_parameters = _np.array(operator_descriptor.options, dtype=data_type)
+
+    symmetric = symmetric_regular_part(
+        operator_descriptor, domain, dual_to_range, parameters, "numba"
+    )
+
+    if symmetric:
+        # The kernels need sorted trial elements. Interleaving test elements
+        # with few and many pairs balances the work of the parallel loop.
+        trial_elements = _np.sort(trial_elements)
+        sorted_elements = _np.sort(test_elements)
+        test_elements = _np.empty_like(sorted_elements)
+        test_elements[0::2] = sorted_elements[: (len(sorted_elements) + 1) // 2]
+        test_elements[1::2] = sorted_elements[::-1][: len(sorted_elements) // 2]
+
+    # Only the kernels of symmetric operators take the symmetric argument.
+    symmetric_args = (True,) if symmetric else ()
+
+    test_tile_size = parameters.assembly.dense.test_tile_size or len(test_elements)
+    trial_tile_size = parameters.assembly.dense.trial_tile_size or len(trial_elements)
+
+    for test_start in range(0, len(test_elements), test_tile_size):
+        test_tile = test_elements[test_start : test_start + test_tile_size]
+        for trial_start in range(0, len(trial_elements), trial_tile_size):
+            numba_assembly_function_regular(
+                dual_to_range.grid.data(precision),
+                domain.grid.data(precision),
+                nshape_test,
+                nshape_trial,
+                test_tile,
+                trial_elements[trial_start : trial_start + trial_tile_size],
+                test_multipliers,
+                trial_multipliers,
+                test_local2global,
+                domain.local2global,
+                dual_to_range.normal_multipliers,
+                domain.normal_multipliers,
+                quad_points,
+                quad_weights,
+                numba_kernel_function_regular,
+                kernel_parameters,
+                grids_identical,
+                dual_to_range.shapeset.evaluate,
+                domain.shapeset.evaluate,
+                result,
+                *symmetric_args,
+            )
 
 
 def potential_assembler(
@@ -123,7 +191,7 @@ def potential_assembler(
     from bempp.api.integration.triangle_gauss import rule
     from bempp.api.utils.helpers import get_type
 
-    (numba_assembly_function, numba_kernel_function_regular) = select_numba_kernels(
+    numba_assembly_function, numba_kernel_function_regular = select_numba_kernels(
         operator_descriptor, mode="potential"
     )
 
@@ -164,7 +164,12 @@ def get_normals(grid_data, nrepetitions, elements, multipliers):
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def elements_adjacent(elements, index1, index2):
     """Check if two elements are adjacent."""
@@ -182,7 +187,12 @@ def elements_adjacent(elements, index1, index2):
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def laplace_single_layer_regular(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -201,7 +211,12 @@ def laplace_single_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def laplace_double_layer_regular(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -228,7 +243,12 @@ def laplace_double_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def laplace_adjoint_double_layer_regular(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -255,7 +275,12 @@ def laplace_adjoint_double_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def laplace_single_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -274,7 +299,12 @@ def laplace_single_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def laplace_double_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -301,7 +331,12 @@ def laplace_double_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def laplace_adjoint_double_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -328,7 +363,12 @@ def laplace_adjoint_double_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_single_layer_regular(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -358,7 +398,12 @@ def helmholtz_single_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_double_layer_regular(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -405,7 +450,12 @@ def helmholtz_double_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_adjoint_double_layer_regular(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -452,7 +502,12 @@ def helmholtz_adjoint_double_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_far_field_single_layer(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -479,7 +534,12 @@ def helmholtz_far_field_single_layer(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_far_field_double_layer(
     test_point, trial_points, test_normal, trial_normals, kernel_parameters
@@ -517,7 +577,12 @@ def helmholtz_far_field_double_layer(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_single_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -547,7 +612,12 @@ def helmholtz_single_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_double_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -593,7 +663,12 @@ def helmholtz_double_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def helmholtz_adjoint_double_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -639,7 +714,12 @@ def helmholtz_adjoint_double_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def modified_helmholtz_single_layer_regular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -664,7 +744,12 @@ def modified_helmholtz_single_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def modified_helmholtz_single_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -689,7 +774,12 @@ def modified_helmholtz_single_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def modified_helmholtz_double_layer_regular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -726,7 +816,12 @@ def modified_helmholtz_double_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def modified_helmholtz_double_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -763,7 +858,12 @@ def modified_helmholtz_double_layer_singular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def modified_helmholtz_adjoint_double_layer_regular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -800,7 +900,12 @@ def modified_helmholtz_adjoint_double_layer_regular(
 
 
 @_numba.jit(
-    nopython=True, parallel=False, error_model="numpy", fastmath=True, boundscheck=False
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
 )
 def modified_helmholtz_adjoint_double_layer_singular(
     test_points, trial_points, test_normal, trial_normal, kernel_parameters
@@ -965,6 +1070,7 @@ def default_scalar_regular_kernel(
     test_shapeset,
     trial_shapeset,
     result,
+    symmetric=False,
 ):
     # Compute global points
     result_type = result.dtype
@@ -995,6 +1101,12 @@ def default_scalar_regular_kernel(
 
     for i in _numba.prange(n_test_elements):
         test_element = test_elements[i]
+        # In symmetric mode the trial elements are sorted and only pairs
+        # with a larger trial element are assembled.
+        first = 0
+        if symmetric:
+            first = _np.searchsorted(trial_elements, test_element, side="right")
+        offset = first * n_quad_points
         local_result = _np.zeros(
             (n_trial_elements, nshape_test, nshape_trial), dtype=result_type
         )
@@ -1021,19 +1133,28 @@ def default_scalar_regular_kernel(
             )
         for test_point_index in range(n_quad_points):
             test_global_point = test_global_points[:, test_point_index]
-            kernel_values = kernel_evaluator(
-                test_global_point,
-                trial_global_points,
-                test_normal,
-                trial_normals,
-                kernel_parameters,
-            )
-            for index in range(n_trial_elements * n_quad_points):
-                tmp[index] = kernel_values[index] * (
+            if symmetric:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points[:, offset:],
+                    test_normal,
+                    trial_normals[:, offset:],
+                    kernel_parameters,
+                )
+            else:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points,
+                    test_normal,
+                    trial_normals,
+                    kernel_parameters,
+                )
+            for index in range(offset, n_trial_elements * n_quad_points):
+                tmp[index] = kernel_values[index - offset] * (
                     local_factors[index] * quad_weights[test_point_index]
                 )
 
-            for trial_element_index in range(n_trial_elements):
+            for trial_element_index in range(first, n_trial_elements):
                 if is_adjacent[trial_element_index]:
                     continue
                 trial_element = trial_elements[trial_element_index]
@@ -1055,7 +1176,7 @@ def default_scalar_regular_kernel(
                                 ]
                             )
 
-        for trial_element_index in range(n_trial_elements):
+        for trial_element_index in range(first, n_trial_elements):
             trial_element = trial_elements[trial_element_index]
             for test_fun_index in range(nshape_test):
                 for trial_fun_index in range(nshape_trial):
@@ -1095,6 +1216,7 @@ def laplace_hypersingular_regular(
     test_shapeset,
     trial_shapeset,
     result,
+    symmetric=False,
 ):
     # Compute global points
     dtype = test_grid_data.vertices.dtype
@@ -1158,6 +1280,12 @@ def laplace_hypersingular_regular(
 
     for i in _numba.prange(n_test_elements):
         test_element = test_elements[i]
+        # In symmetric mode the trial elements are sorted and only pairs
+        # with a larger trial element are assembled.
+        first = 0
+        if symmetric:
+            first = _np.searchsorted(trial_elements, test_element, side="right")
+        offset = first * n_quad_points
         local_result = _np.zeros(
             (n_trial_elements, nshape_test, nshape_trial), dtype=result_type
         )
@@ -1186,21 +1314,30 @@ def laplace_hypersingular_regular(
             )
         for test_point_index in range(n_quad_points):
             test_global_point = test_global_points[:, test_point_index]
-            kernel_values = kernel_evaluator(
-                test_global_point,
-                trial_global_points,
-                test_normal,
-                trial_normals,
-                kernel_parameters,
-            )
-            for index in range(n_trial_elements * n_quad_points):
+            if symmetric:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points[:, offset:],
+                    test_normal,
+                    trial_normals[:, offset:],
+                    kernel_parameters,
+                )
+            else:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points,
+                    test_normal,
+                    trial_normals,
+                    kernel_parameters,
+                )
+            for index in range(offset, n_trial_elements * n_quad_points):
                 tmp[index] = (
                     local_factors[index]
-                    * kernel_values[index]
+                    * kernel_values[index - offset]
                     * quad_weights[test_point_index]
                 )
 
-            for trial_element_index in range(n_trial_elements):
+            for trial_element_index in range(first, n_trial_elements):
                 if is_adjacent[trial_element_index]:
                     continue
                 trial_element = trial_elements[trial_element_index]
@@ -1221,7 +1358,7 @@ def laplace_hypersingular_regular(
                                 * curl_product[test_fun_index, trial_fun_index]
                             )
 
-        for trial_element_index in range(n_trial_elements):
+        for trial_element_index in range(first, n_trial_elements):
             trial_element = trial_elements[trial_element_index]
             for test_fun_index in range(nshape_test):
                 for trial_fun_index in range(nshape_trial):
@@ -1261,6 +1398,7 @@ def helmholtz_hypersingular_regular(
     test_shapeset,
     trial_shapeset,
     result,
+    symmetric=False,
 ):
     # Compute global points
     wavenumber = kernel_parameters[0] + 1j * kernel_parameters[1]
@@ -1325,6 +1463,12 @@ def helmholtz_hypersingular_regular(
 
     for i in _numba.prange(n_test_elements):
         test_element = test_elements[i]
+        # In symmetric mode the trial elements are sorted and only pairs
+        # with a larger trial element are assembled.
+        first = 0
+        if symmetric:
+            first = _np.searchsorted(trial_elements, test_element, side="right")
+        offset = first * n_quad_points
         local_result = _np.zeros(
             (n_trial_elements, nshape_test, nshape_trial), dtype=result_type
         )
@@ -1351,19 +1495,28 @@ def helmholtz_hypersingular_regular(
             )
         for test_point_index in range(n_quad_points):
             test_global_point = test_global_points[:, test_point_index]
-            kernel_values = kernel_evaluator(
-                test_global_point,
-                trial_global_points,
-                test_normal,
-                trial_normals,
-                kernel_parameters,
-            )
-            for index in range(n_trial_elements * n_quad_points):
-                tmp[index] = kernel_values[index] * (
+            if symmetric:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points[:, offset:],
+                    test_normal,
+                    trial_normals[:, offset:],
+                    kernel_parameters,
+                )
+            else:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points,
+                    test_normal,
+                    trial_normals,
+                    kernel_parameters,
+                )
+            for index in range(offset, n_trial_elements * n_quad_points):
+                tmp[index] = kernel_values[index - offset] * (
                     local_factors[index] * quad_weights[test_point_index]
                 )
 
-            for trial_element_index in range(n_trial_elements):
+            for trial_element_index in range(first, n_trial_elements):
                 if is_adjacent[trial_element_index]:
                     continue
                 trial_element = trial_elements[trial_element_index]
@@ -1396,7 +1549,7 @@ def helmholtz_hypersingular_regular(
                                 * normal_prod
                             )
 
-        for trial_element_index in range(n_trial_elements):
+        for trial_element_index in range(first, n_trial_elements):
             trial_element = trial_elements[trial_element_index]
             for test_fun_index in range(nshape_test):
                 for trial_fun_index in range(nshape_trial):
@@ -1436,6 +1589,7 @@ def modified_helmholtz_hypersingular_regular(
     test_shapeset,
     trial_shapeset,
     result,
+    symmetric=False,
 ):
     # Compute global points
     wavenumber = kernel_parameters[0]
@@ -1500,6 +1654,12 @@ def modified_helmholtz_hypersingular_regular(
 
     for i in _numba.prange(n_test_elements):
         test_element = test_elements[i]
+        # In symmetric mode the trial elements are sorted and only pairs
+        # with a larger trial element are assembled.
+        first = 0
+        if symmetric:
+            first = _np.searchsorted(trial_elements, test_element, side="right")
+        offset = first * n_quad_points
         local_result = _np.zeros(
             (n_trial_elements, nshape_test, nshape_trial), dtype=result_type
         )
@@ -1526,19 +1686,28 @@ def modified_helmholtz_hypersingular_regular(
             )
         for test_point_index in range(n_quad_points):
             test_global_point = test_global_points[:, test_point_index]
-            kernel_values = kernel_evaluator(
-                test_global_point,
-                trial_global_points,
-                test_normal,
-                trial_normals,
-                kernel_parameters,
-            )
-            for index in range(n_trial_elements * n_quad_points):
-                tmp[index] = kernel_values[index] * (
+            if symmetric:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points[:, offset:],
+                    test_normal,
+                    trial_normals[:, offset:],
+                    kernel_parameters,
+                )
+            else:
+                kernel_values = kernel_evaluator(
+                    test_global_point,
+                    trial_global_points,
+                    test_normal,
+                    trial_normals,
+                    kernel_parameters,
+                )
+            for index in range(offset, n_trial_elements * n_quad_points):
+                tmp[index] = kernel_values[index - offset] * (
                     local_factors[index] * quad_weights[test_point_index]
                 )
 
-            for trial_element_index in range(n_trial_elements):
+            for trial_element_index in range(first, n_trial_elements):
                 if is_adjacent[trial_element_index]:
                     continue
                 trial_element = trial_elements[trial_element_index]
@@ -1571,7 +1740,7 @@ def modified_helmholtz_hypersingular_regular(
                                 * normal_prod
                             )
 
-        for trial_element_index in range(n_trial_elements):
+        for trial_element_index in range(first, n_trial_elements):
             trial_element = trial_elements[trial_element_index]
             for test_fun_index in range(nshape_test):
                 for trial_fun_index in range(nshape_trial):
@@ -1998,6 +2167,1016 @@ def modified_helmholtz_hypersingular_singular(
                 )
 
 
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def laplace_multitrace_regular(
+    test_point, trial_points, test_normal, trial_normals, kernel_parameters
+):
+    """
+    Laplace multitrace kernels for regular integrals.
+
+    Returns an array of shape (4, npoints) with the single layer, double
+    layer and adjoint double layer kernels and the squared wavenumber
+    times the single layer kernel, which is zero for Laplace.
+    """
+    npoints = trial_points.shape[1]
+    dtype = trial_points.dtype
+    output = _np.zeros((4, npoints), dtype=dtype)
+    m_inv_4pi = dtype.type(M_INV_4PI)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        trial_product = dtype.type(0)
+        test_product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_point[i]
+            dist += diff * diff
+            trial_product += diff * trial_normals[i, j]
+            test_product += diff * test_normal[i]
+        dist = _np.sqrt(dist)
+        factor = m_inv_4pi / (dist * dist * dist)
+        output[0, j] = m_inv_4pi / dist
+        output[1, j] = -trial_product * factor
+        output[2, j] = test_product * factor
+    return output
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def laplace_multitrace_singular(
+    test_points, trial_points, test_normal, trial_normal, kernel_parameters
+):
+    """Laplace multitrace kernels for singular integrals."""
+    npoints = trial_points.shape[1]
+    dtype = trial_points.dtype
+    output = _np.zeros((4, npoints), dtype=dtype)
+    m_inv_4pi = dtype.type(M_INV_4PI)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        trial_product = dtype.type(0)
+        test_product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_points[i, j]
+            dist += diff * diff
+            trial_product += diff * trial_normal[i]
+            test_product += diff * test_normal[i]
+        dist = _np.sqrt(dist)
+        factor = m_inv_4pi / (dist * dist * dist)
+        output[0, j] = m_inv_4pi / dist
+        output[1, j] = -trial_product * factor
+        output[2, j] = test_product * factor
+    return output
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_multitrace_regular(
+    test_point, trial_points, test_normal, trial_normals, kernel_parameters
+):
+    """
+    Helmholtz multitrace kernels for regular integrals.
+
+    Returns an array of shape (4, npoints) with the single layer, double
+    layer and adjoint double layer kernels and the squared wavenumber
+    times the single layer kernel.
+    """
+    wavenumber_real = kernel_parameters[0]
+    wavenumber_imag = kernel_parameters[1]
+    npoints = trial_points.shape[1]
+    dtype = trial_points.dtype
+    output_real = _np.zeros((4, npoints), dtype=dtype)
+    output_imag = _np.zeros((4, npoints), dtype=dtype)
+    m_inv_4pi = dtype.type(M_INV_4PI)
+    wavenumber_squared_real = (
+        wavenumber_real * wavenumber_real - wavenumber_imag * wavenumber_imag
+    )
+    wavenumber_squared_imag = 2 * wavenumber_real * wavenumber_imag
+    for j in range(npoints):
+        dist = dtype.type(0)
+        trial_product = dtype.type(0)
+        test_product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_point[i]
+            dist += diff * diff
+            trial_product += diff * trial_normals[i, j]
+            test_product += diff * test_normal[i]
+        dist = _np.sqrt(dist)
+        single_layer_real = _np.cos(wavenumber_real * dist) * m_inv_4pi / dist
+        single_layer_imag = _np.sin(wavenumber_real * dist) * m_inv_4pi / dist
+        if wavenumber_imag != 0:
+            single_layer_real *= _np.exp(-wavenumber_imag * dist)
+            single_layer_imag *= _np.exp(-wavenumber_imag * dist)
+        # The double layer factor is the single layer times (ikr - 1) / r^2.
+        first = -wavenumber_imag * dist - 1
+        second = wavenumber_real * dist
+        factor_real = (single_layer_real * first - single_layer_imag * second) / (
+            dist * dist
+        )
+        factor_imag = (single_layer_real * second + single_layer_imag * first) / (
+            dist * dist
+        )
+        output_real[0, j] = single_layer_real
+        output_imag[0, j] = single_layer_imag
+        output_real[1, j] = trial_product * factor_real
+        output_imag[1, j] = trial_product * factor_imag
+        output_real[2, j] = -test_product * factor_real
+        output_imag[2, j] = -test_product * factor_imag
+        output_real[3, j] = (
+            wavenumber_squared_real * single_layer_real
+            - wavenumber_squared_imag * single_layer_imag
+        )
+        output_imag[3, j] = (
+            wavenumber_squared_real * single_layer_imag
+            + wavenumber_squared_imag * single_layer_real
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_multitrace_singular(
+    test_points, trial_points, test_normal, trial_normal, kernel_parameters
+):
+    """Helmholtz multitrace kernels for singular integrals."""
+    wavenumber_real = kernel_parameters[0]
+    wavenumber_imag = kernel_parameters[1]
+    npoints = trial_points.shape[1]
+    dtype = trial_points.dtype
+    output_real = _np.zeros((4, npoints), dtype=dtype)
+    output_imag = _np.zeros((4, npoints), dtype=dtype)
+    m_inv_4pi = dtype.type(M_INV_4PI)
+    wavenumber_squared_real = (
+        wavenumber_real * wavenumber_real - wavenumber_imag * wavenumber_imag
+    )
+    wavenumber_squared_imag = 2 * wavenumber_real * wavenumber_imag
+    for j in range(npoints):
+        dist = dtype.type(0)
+        trial_product = dtype.type(0)
+        test_product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_points[i, j]
+            dist += diff * diff
+            trial_product += diff * trial_normal[i]
+            test_product += diff * test_normal[i]
+        dist = _np.sqrt(dist)
+        single_layer_real = _np.cos(wavenumber_real * dist) * m_inv_4pi / dist
+        single_layer_imag = _np.sin(wavenumber_real * dist) * m_inv_4pi / dist
+        if wavenumber_imag != 0:
+            single_layer_real *= _np.exp(-wavenumber_imag * dist)
+            single_layer_imag *= _np.exp(-wavenumber_imag * dist)
+        # The double layer factor is the single layer times (ikr - 1) / r^2.
+        first = -wavenumber_imag * dist - 1
+        second = wavenumber_real * dist
+        factor_real = (single_layer_real * first - single_layer_imag * second) / (
+            dist * dist
+        )
+        factor_imag = (single_layer_real * second + single_layer_imag * first) / (
+            dist * dist
+        )
+        output_real[0, j] = single_layer_real
+        output_imag[0, j] = single_layer_imag
+        output_real[1, j] = trial_product * factor_real
+        output_imag[1, j] = trial_product * factor_imag
+        output_real[2, j] = -test_product * factor_real
+        output_imag[2, j] = -test_product * factor_imag
+        output_real[3, j] = (
+            wavenumber_squared_real * single_layer_real
+            - wavenumber_squared_imag * single_layer_imag
+        )
+        output_imag[3, j] = (
+            wavenumber_squared_real * single_layer_imag
+            + wavenumber_squared_imag * single_layer_real
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True, parallel=True, error_model="numpy", fastmath=True, boundscheck=False
+)
+def default_scalar_multitrace_regular(
+    test_grid_data,
+    trial_grid_data,
+    nshape_test,
+    nshape_trial,
+    test_elements,
+    trial_elements,
+    test_multipliers,
+    trial_multipliers,
+    test_global_dofs,
+    trial_global_dofs,
+    test_normal_multipliers,
+    trial_normal_multipliers,
+    quad_points,
+    quad_weights,
+    kernel_evaluator,
+    kernel_parameters,
+    grids_identical,
+    test_shapeset,
+    trial_shapeset,
+    result,
+):
+    """
+    Assemble the regular part of the four blocks of a multitrace operator.
+
+    The result has the shape (4, rows, cols) and receives the single
+    layer, double layer, adjoint double layer and hypersingular operator.
+    All four blocks are computed from one evaluation of the kernels for
+    each pair of quadrature points. The spaces must be linear.
+    """
+    dtype = test_grid_data.vertices.dtype
+    result_type = result.dtype
+    n_quad_points = len(quad_weights)
+    n_test_elements = len(test_elements)
+    n_trial_elements = len(trial_elements)
+
+    local_test_fun_values = test_shapeset(quad_points)
+    local_trial_fun_values = trial_shapeset(quad_points)
+    trial_normals = get_normals(
+        trial_grid_data, n_quad_points, trial_elements, trial_normal_multipliers
+    )
+    trial_global_points = get_global_points(
+        trial_grid_data, trial_elements, quad_points
+    )
+
+    factors = _np.empty(
+        n_quad_points * n_trial_elements, dtype=trial_global_points.dtype
+    )
+    for trial_element_index in range(n_trial_elements):
+        for trial_point_index in range(n_quad_points):
+            factors[n_quad_points * trial_element_index + trial_point_index] = (
+                quad_weights[trial_point_index]
+                * trial_grid_data.integration_elements[
+                    trial_elements[trial_element_index]
+                ]
+            )
+
+    reference_gradient = _np.array([[-1, 1, 0], [-1, 0, 1]], dtype=dtype)
+
+    trial_surface_curls = _np.empty((n_trial_elements, 3, 3), dtype=dtype)
+    for trial_index in range(n_trial_elements):
+        trial_element = trial_elements[trial_index]
+        trial_surface_gradients = (
+            trial_grid_data.jac_inv_trans[trial_element] @ reference_gradient
+        )
+        for i in range(3):
+            trial_surface_curls[trial_index, :, i] = (
+                _np.cross(
+                    trial_grid_data.normals[trial_element],
+                    trial_surface_gradients[:, i],
+                )
+                * trial_normal_multipliers[trial_element]
+            )
+
+    for i in _numba.prange(n_test_elements):
+        test_element = test_elements[i]
+        local_result = _np.zeros(
+            (4, n_trial_elements, nshape_test, nshape_trial), dtype=result_type
+        )
+        test_global_points = test_grid_data.local2global(test_element, quad_points)
+        test_normal = (
+            test_grid_data.normals[test_element] * test_normal_multipliers[test_element]
+        )
+        test_surface_gradients = (
+            test_grid_data.jac_inv_trans[test_element] @ reference_gradient
+        )
+        test_surface_curls_trans = _np.empty((3, 3), dtype=dtype)
+        for fun_index in range(3):
+            test_surface_curls_trans[fun_index, :] = (
+                _np.cross(
+                    test_grid_data.normals[test_element],
+                    test_surface_gradients[:, fun_index],
+                )
+                * test_normal_multipliers[test_element]
+            )
+        local_factors = _np.empty(
+            n_trial_elements * n_quad_points, dtype=test_global_points.dtype
+        )
+        tmp = _np.empty((4, n_trial_elements * n_quad_points), dtype=result_type)
+        is_adjacent = _np.zeros(n_trial_elements, dtype=_np.bool_)
+
+        for trial_element_index in range(n_trial_elements):
+            trial_element = trial_elements[trial_element_index]
+            if grids_identical and elements_adjacent(
+                test_grid_data.elements, test_element, trial_element
+            ):
+                is_adjacent[trial_element_index] = True
+
+        for index in range(n_trial_elements * n_quad_points):
+            local_factors[index] = (
+                factors[index] * test_grid_data.integration_elements[test_element]
+            )
+        for test_point_index in range(n_quad_points):
+            test_global_point = test_global_points[:, test_point_index]
+            kernel_values = kernel_evaluator(
+                test_global_point,
+                trial_global_points,
+                test_normal,
+                trial_normals,
+                kernel_parameters,
+            )
+            for block in range(4):
+                for index in range(n_trial_elements * n_quad_points):
+                    tmp[block, index] = kernel_values[block, index] * (
+                        local_factors[index] * quad_weights[test_point_index]
+                    )
+
+            for trial_element_index in range(n_trial_elements):
+                if is_adjacent[trial_element_index]:
+                    continue
+                trial_element = trial_elements[trial_element_index]
+                normal_prod = _np.dot(
+                    test_normal,
+                    trial_grid_data.normals[trial_element]
+                    * trial_normal_multipliers[trial_element],
+                )
+                curl_product = (
+                    test_surface_curls_trans @ trial_surface_curls[trial_element_index]
+                )
+                for test_fun_index in range(nshape_test):
+                    for trial_fun_index in range(nshape_trial):
+                        for quad_point_index in range(n_quad_points):
+                            index = (
+                                trial_element_index * n_quad_points + quad_point_index
+                            )
+                            fun_product = (
+                                local_test_fun_values[
+                                    0, test_fun_index, test_point_index
+                                ]
+                                * local_trial_fun_values[
+                                    0, trial_fun_index, quad_point_index
+                                ]
+                            )
+                            for block in range(3):
+                                local_result[
+                                    block,
+                                    trial_element_index,
+                                    test_fun_index,
+                                    trial_fun_index,
+                                ] += (
+                                    tmp[block, index] * fun_product
+                                )
+                            local_result[
+                                3, trial_element_index, test_fun_index, trial_fun_index
+                            ] += (
+                                tmp[0, index]
+                                * curl_product[test_fun_index, trial_fun_index]
+                                - tmp[3, index] * fun_product * normal_prod
+                            )
+
+        for trial_element_index in range(n_trial_elements):
+            trial_element = trial_elements[trial_element_index]
+            for test_fun_index in range(nshape_test):
+                for trial_fun_index in range(nshape_trial):
+                    for block in range(4):
+                        result[
+                            block,
+                            test_global_dofs[test_element, test_fun_index],
+                            trial_global_dofs[trial_element, trial_fun_index],
+                        ] += (
+                            local_result[
+                                block,
+                                trial_element_index,
+                                test_fun_index,
+                                trial_fun_index,
+                            ]
+                            * test_multipliers[test_element, test_fun_index]
+                            * trial_multipliers[trial_element, trial_fun_index]
+                        )
+
+
+@_numba.jit(
+    nopython=True, parallel=True, error_model="numpy", fastmath=True, boundscheck=False
+)
+def default_scalar_multitrace_singular(
+    grid_data,
+    test_points,
+    trial_points,
+    quad_weights,
+    test_elements,
+    trial_elements,
+    test_offsets,
+    trial_offsets,
+    weights_offsets,
+    number_of_quad_points,
+    test_normal_multipliers,
+    trial_normal_multipliers,
+    nshape_test,
+    nshape_trial,
+    test_shapeset,
+    trial_shapeset,
+    kernel_evaluator,
+    kernel_parameters,
+    result,
+):
+    """
+    Assemble the singular part of the four blocks of a multitrace operator.
+
+    The result has the shape (4, n), where n is the number of singular
+    element pairs times the number of local test and trial functions.
+    """
+    dtype = grid_data.vertices.dtype
+    nelements = len(test_elements)
+
+    reference_gradient = _np.array([[-1, 1, 0], [-1, 0, 1]], dtype=dtype)
+
+    for index in _numba.prange(nelements):
+        test_element = test_elements[index]
+        trial_element = trial_elements[index]
+        test_offset = test_offsets[index]
+        trial_offset = trial_offsets[index]
+        weights_offset = weights_offsets[index]
+        npoints = number_of_quad_points[index]
+        test_local_points = test_points[:, test_offset : test_offset + npoints]
+        trial_local_points = trial_points[:, trial_offset : trial_offset + npoints]
+        test_global_points = grid_data.local2global(test_element, test_local_points)
+        trial_global_points = grid_data.local2global(trial_element, trial_local_points)
+        test_fun_values = test_shapeset(test_local_points)
+        trial_fun_values = trial_shapeset(trial_local_points)
+
+        test_normal = (
+            grid_data.normals[test_element] * test_normal_multipliers[test_element]
+        )
+        trial_normal = (
+            grid_data.normals[trial_element] * trial_normal_multipliers[trial_element]
+        )
+        normal_product = _np.dot(test_normal, trial_normal)
+
+        test_surface_gradient = (
+            grid_data.jac_inv_trans[test_element] @ reference_gradient
+        )
+        trial_surface_gradient = (
+            grid_data.jac_inv_trans[trial_element] @ reference_gradient
+        )
+        test_surface_curl_trans = _np.empty((3, 3), dtype=dtype)
+        trial_surface_curl = _np.empty((3, 3), dtype=dtype)
+        for fun_index in range(3):
+            test_surface_curl_trans[fun_index, :] = _np.cross(
+                test_normal, test_surface_gradient[:, fun_index]
+            )
+            trial_surface_curl[:, fun_index] = _np.cross(
+                trial_normal, trial_surface_gradient[:, fun_index]
+            )
+        surface_curl_products = test_surface_curl_trans @ trial_surface_curl
+
+        kernel_values = kernel_evaluator(
+            test_global_points,
+            trial_global_points,
+            test_normal,
+            trial_normal,
+            kernel_parameters,
+        )
+
+        integration_elements = (
+            grid_data.integration_elements[test_element]
+            * grid_data.integration_elements[trial_element]
+        )
+
+        for test_fun_index in range(nshape_test):
+            for trial_fun_index in range(nshape_trial):
+                result_index = (
+                    nshape_trial * nshape_test * index
+                    + test_fun_index * nshape_trial
+                    + trial_fun_index
+                )
+                for point_index in range(npoints):
+                    weight = quad_weights[weights_offset + point_index]
+                    fun_product = (
+                        test_fun_values[0, test_fun_index, point_index]
+                        * trial_fun_values[0, trial_fun_index, point_index]
+                    )
+                    for block in range(3):
+                        result[block, result_index] += (
+                            kernel_values[block, point_index] * fun_product * weight
+                        )
+                    result[3, result_index] += (
+                        kernel_values[0, point_index]
+                        * surface_curl_products[test_fun_index, trial_fun_index]
+                        - kernel_values[3, point_index] * fun_product * normal_product
+                    ) * weight
+                for block in range(4):
+                    result[block, result_index] *= integration_elements
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def _helmholtz_batched_values(
+    dist, product, derivative, kernel_parameters, index, output_real, output_imag
+):
+    """
+    Write the Helmholtz kernel for a batch of wavenumbers.
+
+    The kernel parameters hold the real and imaginary parts of the
+    wavenumbers. For derivative=False the Green's function is written
+    into column index of the outputs. Otherwise product times the
+    derivative factor exp(ikr)(ikr - 1) / (4 pi r^3) is written.
+    """
+    nwavenumbers = len(kernel_parameters) // 2
+    m_inv_4pi = output_real.dtype.type(M_INV_4PI)
+    for wavenumber_index in range(nwavenumbers):
+        wavenumber_real = kernel_parameters[2 * wavenumber_index]
+        wavenumber_imag = kernel_parameters[2 * wavenumber_index + 1]
+        value_real = _np.cos(wavenumber_real * dist) * m_inv_4pi / dist
+        value_imag = _np.sin(wavenumber_real * dist) * m_inv_4pi / dist
+        if wavenumber_imag != 0:
+            value_real *= _np.exp(-wavenumber_imag * dist)
+            value_imag *= _np.exp(-wavenumber_imag * dist)
+        if derivative:
+            first = -wavenumber_imag * dist - 1
+            second = wavenumber_real * dist
+            factor = product / (dist * dist)
+            value_real, value_imag = (
+                (value_real * first - value_imag * second) * factor,
+                (value_real * second + value_imag * first) * factor,
+            )
+        output_real[wavenumber_index, index] = value_real
+        output_imag[wavenumber_index, index] = value_imag
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_single_layer_batched_regular(
+    test_point, trial_points, test_normal, trial_normals, kernel_parameters
+):
+    """Helmholtz single layer for a batch of wavenumbers for regular integrals."""
+    npoints = trial_points.shape[1]
+    nwavenumbers = len(kernel_parameters) // 2
+    dtype = trial_points.dtype
+    output_real = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    output_imag = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_point[i]
+            dist += diff * diff
+        _helmholtz_batched_values(
+            _np.sqrt(dist),
+            dtype.type(1),
+            False,
+            kernel_parameters,
+            j,
+            output_real,
+            output_imag,
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_single_layer_batched_singular(
+    test_points, trial_points, test_normal, trial_normal, kernel_parameters
+):
+    """Helmholtz single layer for a batch of wavenumbers for singular integrals."""
+    npoints = trial_points.shape[1]
+    nwavenumbers = len(kernel_parameters) // 2
+    dtype = trial_points.dtype
+    output_real = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    output_imag = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_points[i, j]
+            dist += diff * diff
+        _helmholtz_batched_values(
+            _np.sqrt(dist),
+            dtype.type(1),
+            False,
+            kernel_parameters,
+            j,
+            output_real,
+            output_imag,
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_double_layer_batched_regular(
+    test_point, trial_points, test_normal, trial_normals, kernel_parameters
+):
+    """Helmholtz double layer for a batch of wavenumbers for regular integrals."""
+    npoints = trial_points.shape[1]
+    nwavenumbers = len(kernel_parameters) // 2
+    dtype = trial_points.dtype
+    output_real = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    output_imag = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_point[i]
+            dist += diff * diff
+            product += diff * trial_normals[i, j]
+        _helmholtz_batched_values(
+            _np.sqrt(dist),
+            product,
+            True,
+            kernel_parameters,
+            j,
+            output_real,
+            output_imag,
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_double_layer_batched_singular(
+    test_points, trial_points, test_normal, trial_normal, kernel_parameters
+):
+    """Helmholtz double layer for a batch of wavenumbers for singular integrals."""
+    npoints = trial_points.shape[1]
+    nwavenumbers = len(kernel_parameters) // 2
+    dtype = trial_points.dtype
+    output_real = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    output_imag = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_points[i, j]
+            dist += diff * diff
+            product += diff * trial_normal[i]
+        _helmholtz_batched_values(
+            _np.sqrt(dist),
+            product,
+            True,
+            kernel_parameters,
+            j,
+            output_real,
+            output_imag,
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_adjoint_double_layer_batched_regular(
+    test_point, trial_points, test_normal, trial_normals, kernel_parameters
+):
+    """Helmholtz adjoint double layer for a batch of wavenumbers for regular integrals."""
+    npoints = trial_points.shape[1]
+    nwavenumbers = len(kernel_parameters) // 2
+    dtype = trial_points.dtype
+    output_real = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    output_imag = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_point[i]
+            dist += diff * diff
+            product -= diff * test_normal[i]
+        _helmholtz_batched_values(
+            _np.sqrt(dist),
+            product,
+            True,
+            kernel_parameters,
+            j,
+            output_real,
+            output_imag,
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True,
+    parallel=False,
+    error_model="numpy",
+    fastmath=True,
+    boundscheck=False,
+    cache=True,
+)
+def helmholtz_adjoint_double_layer_batched_singular(
+    test_points, trial_points, test_normal, trial_normal, kernel_parameters
+):
+    """Helmholtz adjoint double layer for a batch of wavenumbers for singular integrals."""
+    npoints = trial_points.shape[1]
+    nwavenumbers = len(kernel_parameters) // 2
+    dtype = trial_points.dtype
+    output_real = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    output_imag = _np.empty((nwavenumbers, npoints), dtype=dtype)
+    for j in range(npoints):
+        dist = dtype.type(0)
+        product = dtype.type(0)
+        for i in range(3):
+            diff = trial_points[i, j] - test_points[i, j]
+            dist += diff * diff
+            product -= diff * test_normal[i]
+        _helmholtz_batched_values(
+            _np.sqrt(dist),
+            product,
+            True,
+            kernel_parameters,
+            j,
+            output_real,
+            output_imag,
+        )
+    return output_real + 1j * output_imag
+
+
+@_numba.jit(
+    nopython=True, parallel=True, error_model="numpy", fastmath=True, boundscheck=False
+)
+def default_scalar_batched_regular(
+    test_grid_data,
+    trial_grid_data,
+    nshape_test,
+    nshape_trial,
+    test_elements,
+    trial_elements,
+    test_multipliers,
+    trial_multipliers,
+    test_global_dofs,
+    trial_global_dofs,
+    test_normal_multipliers,
+    trial_normal_multipliers,
+    quad_points,
+    quad_weights,
+    kernel_evaluator,
+    kernel_parameters,
+    grids_identical,
+    test_shapeset,
+    trial_shapeset,
+    result,
+):
+    """
+    Assemble the regular part of a batch of scalar operators.
+
+    The kernel evaluator returns the values of all kernels in the batch
+    as an array of shape (nbatch, npoints) and the result has the shape
+    (nbatch, rows, cols).
+    """
+    result_type = result.dtype
+    nbatch = result.shape[0]
+    n_quad_points = len(quad_weights)
+    n_test_elements = len(test_elements)
+    n_trial_elements = len(trial_elements)
+
+    local_test_fun_values = test_shapeset(quad_points)
+    local_trial_fun_values = trial_shapeset(quad_points)
+    trial_normals = get_normals(
+        trial_grid_data, n_quad_points, trial_elements, trial_normal_multipliers
+    )
+    trial_global_points = get_global_points(
+        trial_grid_data, trial_elements, quad_points
+    )
+
+    factors = _np.empty(
+        n_quad_points * n_trial_elements, dtype=trial_global_points.dtype
+    )
+    for trial_element_index in range(n_trial_elements):
+        for trial_point_index in range(n_quad_points):
+            factors[n_quad_points * trial_element_index + trial_point_index] = (
+                quad_weights[trial_point_index]
+                * trial_grid_data.integration_elements[
+                    trial_elements[trial_element_index]
+                ]
+            )
+
+    for i in _numba.prange(n_test_elements):
+        test_element = test_elements[i]
+        local_result = _np.zeros(
+            (nbatch, n_trial_elements, nshape_test, nshape_trial), dtype=result_type
+        )
+        test_global_points = test_grid_data.local2global(test_element, quad_points)
+        test_normal = (
+            test_grid_data.normals[test_element] * test_normal_multipliers[test_element]
+        )
+        local_factors = _np.empty(
+            n_trial_elements * n_quad_points, dtype=test_global_points.dtype
+        )
+        tmp = _np.empty((nbatch, n_trial_elements * n_quad_points), dtype=result_type)
+        is_adjacent = _np.zeros(n_trial_elements, dtype=_np.bool_)
+
+        for trial_element_index in range(n_trial_elements):
+            trial_element = trial_elements[trial_element_index]
+            if grids_identical and elements_adjacent(
+                test_grid_data.elements, test_element, trial_element
+            ):
+                is_adjacent[trial_element_index] = True
+
+        for index in range(n_trial_elements * n_quad_points):
+            local_factors[index] = (
+                factors[index] * test_grid_data.integration_elements[test_element]
+            )
+        for test_point_index in range(n_quad_points):
+            test_global_point = test_global_points[:, test_point_index]
+            kernel_values = kernel_evaluator(
+                test_global_point,
+                trial_global_points,
+                test_normal,
+                trial_normals,
+                kernel_parameters,
+            )
+            for batch_index in range(nbatch):
+                for index in range(n_trial_elements * n_quad_points):
+                    tmp[batch_index, index] = kernel_values[batch_index, index] * (
+                        local_factors[index] * quad_weights[test_point_index]
+                    )
+
+            for trial_element_index in range(n_trial_elements):
+                if is_adjacent[trial_element_index]:
+                    continue
+                for test_fun_index in range(nshape_test):
+                    for trial_fun_index in range(nshape_trial):
+                        for quad_point_index in range(n_quad_points):
+                            index = (
+                                trial_element_index * n_quad_points + quad_point_index
+                            )
+                            fun_product = (
+                                local_trial_fun_values[
+                                    0, trial_fun_index, quad_point_index
+                                ]
+                                * local_test_fun_values[
+                                    0, test_fun_index, test_point_index
+                                ]
+                            )
+                            for batch_index in range(nbatch):
+                                local_result[
+                                    batch_index,
+                                    trial_element_index,
+                                    test_fun_index,
+                                    trial_fun_index,
+                                ] += (
+                                    tmp[batch_index, index] * fun_product
+                                )
+
+        for trial_element_index in range(n_trial_elements):
+            trial_element = trial_elements[trial_element_index]
+            for test_fun_index in range(nshape_test):
+                for trial_fun_index in range(nshape_trial):
+                    multiplier = (
+                        test_multipliers[test_element, test_fun_index]
+                        * trial_multipliers[trial_element, trial_fun_index]
+                    )
+                    for batch_index in range(nbatch):
+                        result[
+                            batch_index,
+                            test_global_dofs[test_element, test_fun_index],
+                            trial_global_dofs[trial_element, trial_fun_index],
+                        ] += (
+                            local_result[
+                                batch_index,
+                                trial_element_index,
+                                test_fun_index,
+                                trial_fun_index,
+                            ]
+                            * multiplier
+                        )
+
+
+@_numba.jit(
+    nopython=True, parallel=True, error_model="numpy", fastmath=True, boundscheck=False
+)
+def default_scalar_batched_singular(
+    grid_data,
+    test_points,
+    trial_points,
+    quad_weights,
+    test_elements,
+    trial_elements,
+    test_offsets,
+    trial_offsets,
+    weights_offsets,
+    number_of_quad_points,
+    test_normal_multipliers,
+    trial_normal_multipliers,
+    nshape_test,
+    nshape_trial,
+    test_shapeset,
+    trial_shapeset,
+    kernel_evaluator,
+    kernel_parameters,
+    result,
+):
+    """
+    Assemble the singular part of a batch of scalar operators.
+
+    The result has the shape (nbatch, n), where n is the number of
+    singular element pairs times the number of local test and trial
+    functions.
+    """
+    nbatch = result.shape[0]
+    nelements = len(test_elements)
+
+    for index in _numba.prange(nelements):
+        test_element = test_elements[index]
+        trial_element = trial_elements[index]
+        test_offset = test_offsets[index]
+        trial_offset = trial_offsets[index]
+        weights_offset = weights_offsets[index]
+        npoints = number_of_quad_points[index]
+        test_local_points = test_points[:, test_offset : test_offset + npoints]
+        trial_local_points = trial_points[:, trial_offset : trial_offset + npoints]
+        test_global_points = grid_data.local2global(test_element, test_local_points)
+        trial_global_points = grid_data.local2global(trial_element, trial_local_points)
+        test_fun_values = test_shapeset(test_local_points)
+        trial_fun_values = trial_shapeset(trial_local_points)
+        kernel_values = kernel_evaluator(
+            test_global_points,
+            trial_global_points,
+            grid_data.normals[test_element] * test_normal_multipliers[test_element],
+            grid_data.normals[trial_element] * trial_normal_multipliers[trial_element],
+            kernel_parameters,
+        )
+        integration_elements = (
+            grid_data.integration_elements[test_element]
+            * grid_data.integration_elements[trial_element]
+        )
+        for test_fun_index in range(nshape_test):
+            for trial_fun_index in range(nshape_trial):
+                result_index = (
+                    nshape_trial * nshape_test * index
+                    + test_fun_index * nshape_trial
+                    + trial_fun_index
+                )
+                for point_index in range(npoints):
+                    factor = (
+                        quad_weights[weights_offset + point_index]
+                        * test_fun_values[0, test_fun_index, point_index]
+                        * trial_fun_values[0, trial_fun_index, point_index]
+                    )
+                    for batch_index in range(nbatch):
+                        result[batch_index, result_index] += (
+                            kernel_values[batch_index, point_index] * factor
+                        )
+                for batch_index in range(nbatch):
+                    result[batch_index, result_index] *= integration_elements
+
+
+@_numba.jit(
+    nopython=True, parallel=True, error_model="numpy", fastmath=True, boundscheck=False
+)
+def symmetrize_dense(result):
+    """Replace a square matrix B by B + B^T in place."""
+    n = result.shape[0]
+    for i in _numba.prange(n):
+        result[i, i] *= 2
+        for j in range(i + 1, n):
+            value = result[i, j] + result[j, i]
+            result[i, j] = value
+            result[j, i] = value
+
+
 @_numba.jit(
     nopython=True, parallel=True, error_model="numpy", fastmath=True, boundscheck=False
 )
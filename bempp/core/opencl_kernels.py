@@ -2,6 +2,7 @@
 
 import pyopencl as _cl
 import os as _os
+import threading as _threading
 
 _CURRENT_PATH = _os.path.dirname(_os.path.realpath(__file__))
 _INCLUDE_PATH = _os.path.abspath(_os.path.join(_CURRENT_PATH, "./sources/include"))
@@ -10,6 +11,14 @@ _KERNEL_PATH = _os.path.abspath(_os.path.join(_CURRENT_PATH, "./sources/kernels"
 _DEFAULT_DEVICE = None
 _DEFAULT_CONTEXT = None
 
+_PROGRAM_CACHE = {}
+_PROGRAM_CACHE_LOCK = _threading.Lock()
+_INCLUDE_SOURCES = None
+_PROGRAM_CACHE_DIR = _os.environ.get(
+    "BEMPP_OPENCL_CACHE_DIR",
+    _os.path.join(_os.path.expanduser("~"), ".cache", "bempp", "opencl"),
+)
+
 
 def select_cl_kernel(operator_descriptor, mode):
     """Select OpenCL kernel."""
@@ -109,19 +118,145 @@ def get_kernel_compile_options(options, precision):
 
 
 def build_program(assembly_function, options, precision):
-    """Build the kernel and return it."""
-
+    """
+    Build the kernel and return it.
+
+    Built programs are cached in memory for the lifetime of the process,
+    keyed on the kernel file, the compile options, the precision and the
+    default device. Program binaries are also stored in the program cache
+    directory and reused across runs.
+    """
     file_name = assembly_function + ".cl"
     kernel_file = _os.path.join(_KERNEL_PATH, file_name)
 
-    kernel_string = open(kernel_file).read()
     kernel_options = get_kernel_compile_options(options, precision)
+    context = default_context()
+    device = default_device()
 
-    return (
-        _cl.Program(default_context(), kernel_string)
-        .build(options=kernel_options)
-        .kernel_function
-    )
+    key = (kernel_file, tuple(kernel_options), precision, context.int_ptr)
+
+    if key not in _PROGRAM_CACHE:
+        with _PROGRAM_CACHE_LOCK:
+            if key not in _PROGRAM_CACHE:
+                _PROGRAM_CACHE[key] = _build_program_from_cache(
+                    kernel_file, kernel_options, context, device
+                )
+
+    return _cl.Kernel(_PROGRAM_CACHE[key], "kernel_function")
+
+
+def _build_program_from_cache(kernel_file, kernel_options, context, device):
+    """Build a program, reusing a stored binary if possible."""
+    import hashlib
+    import bempp.api
+
+    kernel_string = open(kernel_file).read()
+
+    hasher = hashlib.sha256()
+    for item in [
+        kernel_string,
+        " ".join(kernel_options),
+        _include_sources(),
+        device.platform.name,
+        device.name,
+        device.driver_version,
+        _cl.VERSION_TEXT,
+    ]:
+        hasher.update(item.encode("utf-8"))
+        hasher.update(b"\0")
+    binary_file = None
+    if _PROGRAM_CACHE_DIR is not None:
+        binary_file = _os.path.join(_PROGRAM_CACHE_DIR, hasher.hexdigest() + ".bin")
+
+    if binary_file is not None and _os.path.isfile(binary_file):
+        try:
+            with open(binary_file, "rb") as f:
+                binary = f.read()
+            program = _cl.Program(context, [device], [binary]).build(
+                options=kernel_options
+            )
+            bempp.api.log(
+                f"Loaded OpenCL program {_os.path.basename(kernel_file)} "
+                + "from program cache.",
+                level="debug",
+            )
+            return program
+        except (OSError, _cl.Error):
+            bempp.api.log(
+                f"Could not load {binary_file} from program cache.", level="debug"
+            )
+
+    program = _cl.Program(context, kernel_string).build(options=kernel_options)
+
+    if binary_file is not None:
+        try:
+            binary = program.get_info(_cl.program_info.BINARIES)[
+                context.devices.index(device)
+            ]
+            _os.makedirs(_PROGRAM_CACHE_DIR, exist_ok=True)
+            tmp_file = binary_file + f".{_os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(binary)
+            _os.replace(tmp_file, binary_file)
+        except (OSError, ValueError, _cl.Error):
+            bempp.api.log(
+                f"Could not write {binary_file} to program cache.", level="debug"
+            )
+
+    return program
+
+
+def _include_sources():
+    """Return the concatenated sources of all OpenCL include files."""
+    # pylint: disable=W0603
+    global _INCLUDE_SOURCES
+
+    if _INCLUDE_SOURCES is None:
+        sources = []
+        for fname in sorted(_os.listdir(_INCLUDE_PATH)):
+            with open(_os.path.join(_INCLUDE_PATH, fname)) as f:
+                sources.append(fname + "\n" + f.read())
+        _INCLUDE_SOURCES = "\n".join(sources)
+    return _INCLUDE_SOURCES
+
+
+def program_cache_dir():
+    """Return the directory of the OpenCL program cache."""
+    return _PROGRAM_CACHE_DIR
+
+
+def set_program_cache_dir(path):
+    """
+    Set the directory of the OpenCL program cache.
+
+    If path is None, program binaries are not stored on disk.
+    Programs already built in this process stay available.
+    """
+    # pylint: disable=W0603
+    global _PROGRAM_CACHE_DIR
+
+    if path is not None:
+        path = _os.path.abspath(_os.path.expanduser(path))
+    _PROGRAM_CACHE_DIR = path
+
+
+def clear_program_cache(disk=False):
+    """
+    Clear the in-memory OpenCL program cache.
+
+    If disk is True, also remove stored program binaries and
+    return the number of removed files.
+    """
+    with _PROGRAM_CACHE_LOCK:
+        _PROGRAM_CACHE.clear()
+
+    count = 0
+    if disk and _PROGRAM_CACHE_DIR is not None and _os.path.isdir(_PROGRAM_CACHE_DIR):
+        for fname in _os.listdir(_PROGRAM_CACHE_DIR):
+            if fname.endswith(".bin"):
+                _os.remove(_os.path.join(_PROGRAM_CACHE_DIR, fname))
+                count += 1
+    return count
 
 
 def get_kernel_from_operator_descriptor(
@@ -0,0 +1,242 @@
+"""Distribute the assembly of integral operators across pool workers."""
+
+import numpy as _np
+
+
+def is_available(domain, dual_to_range, parameters, nbytes):
+    """
+    Return True if an assembly can be distributed across the pool.
+
+    This requires an initialised pool, spaces that were scattered to
+    the workers and a shared memory buffer that can hold nbytes.
+    """
+    import bempp.api
+    from bempp.api.utils import pool
+
+    if not (
+        parameters.assembly.use_pool
+        and pool.is_initialised()
+        and not pool.is_worker()
+        and domain._is_scattered
+        and dual_to_range._is_scattered
+    ):
+        return False
+
+    if nbytes > len(pool._BUFFER):
+        bempp.api.log(
+            f"Pool buffer too small for result of size {nbytes // 1024**2} MB. "
+            + "Assembling in the host process.",
+            level="warning",
+        )
+        return False
+
+    return True
+
+
+def dense_assembler(operator_descriptor, domain, dual_to_range, parameters, result):
+    """
+    Assemble the regular part of a dense operator on the pool workers.
+
+    The test elements of each color are split into one block per
+    worker. Elements of the same color do not share degrees of freedom,
+    so that all workers can add into the shared result matrix without
+    synchronisation. The colors are processed one after another.
+    """
+    from bempp.api.utils import pool
+
+    from bempp.core.dense_assembler import symmetric_regular_part
+
+    nworkers = pool.number_of_workers()
+    symmetric = symmetric_regular_part(
+        operator_descriptor, domain, dual_to_range, parameters, "numba"
+    )
+    # The singular part references the spaces and cannot be sent to the workers.
+    operator_descriptor = operator_descriptor._replace(singular_part=None)
+    test_indices, test_color_indexptr = dual_to_range.get_elements_by_color()
+    number_of_test_colors = len(test_color_indexptr) - 1
+
+    shared_result = pool.as_array(result.dtype, 0, result.shape)
+    shared_result[:] = 0
+
+    for test_color_index in range(number_of_test_colors):
+        color_elements = test_indices[
+            test_color_indexptr[test_color_index] : test_color_indexptr[
+                1 + test_color_index
+            ]
+        ]
+        pool.starmap(
+            _dense_assembler_worker,
+            [
+                (
+                    operator_descriptor,
+                    domain.id,
+                    dual_to_range.id,
+                    parameters,
+                    elements,
+                    result.dtype,
+                    result.shape,
+                )
+                for elements in _split_elements(color_elements, nworkers, symmetric)
+            ],
+        )
+
+    result[:] = shared_result
+
+
+def singular_assembler(
+    device_interface,
+    operator_descriptor,
+    domain,
+    dual_to_range,
+    test_points,
+    trial_points,
+    quad_weights,
+    test_elements,
+    trial_elements,
+    test_offsets,
+    trial_offsets,
+    weights_offsets,
+    number_of_quad_points,
+    kernel_options,
+    result,
+):
+    """
+    Assemble the singular part on the pool workers.
+
+    The singular element pairs are split into one contiguous block per
+    worker. Each worker writes the values of its block into the shared
+    result vector. The spaces domain and dual_to_range are the scattered
+    spaces whose localised spaces are assembled.
+    """
+    from bempp.api.utils import pool
+
+    nworkers = pool.number_of_workers()
+    operator_descriptor = operator_descriptor._replace(singular_part=None)
+    nshape = domain.number_of_shape_functions * dual_to_range.number_of_shape_functions
+
+    shared_result = pool.as_array(result.dtype, 0, result.shape)
+    shared_result[:] = 0
+
+    bounds = _np.linspace(0, len(test_elements), nworkers + 1).astype("int64")
+    pool.starmap(
+        _singular_assembler_worker,
+        [
+            (
+                device_interface,
+                operator_descriptor,
+                domain.id,
+                dual_to_range.id,
+                test_points,
+                trial_points,
+                quad_weights,
+                test_elements[start:end],
+                trial_elements[start:end],
+                test_offsets[start:end],
+                trial_offsets[start:end],
+                weights_offsets[start:end],
+                number_of_quad_points[start:end],
+                kernel_options,
+                result.dtype,
+                result.shape,
+                nshape * start,
+                nshape * end,
+            )
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ],
+    )
+
+    result[:] = shared_result
+
+
+def _set_worker_threads():
+    """Share the Numba threads of the node between the workers."""
+    import numba
+    from bempp.api.utils import pool
+
+    numba.set_num_threads(max(1, numba.config.NUMBA_NUM_THREADS // pool.nworkers()))
+
+
+def _split_elements(elements, nworkers, symmetric):
+    """
+    Split the test elements of a color into one block per worker.
+
+    Symmetric assembly of test elements with larger indices involves
+    fewer element pairs, so that blocks are taken with a stride.
+    """
+    if symmetric:
+        return [elements[index::nworkers] for index in range(nworkers)]
+    return _np.array_split(elements, nworkers)
+
+
+def _dense_assembler_worker(
+    operator_descriptor, domain_id, dual_to_range_id, parameters, elements, dtype, shape
+):
+    """Assemble the regular part for a block of test elements."""
+    from bempp.api.utils import pool
+    from bempp.core.numba_assemblers import dense_assembler_elements
+
+    if len(elements) == 0:
+        return
+
+    _set_worker_threads()
+
+    dense_assembler_elements(
+        operator_descriptor,
+        pool.get_data(domain_id),
+        pool.get_data(dual_to_range_id),
+        parameters,
+        elements,
+        pool.as_array(dtype, 0, shape),
+    )
+
+
+def _singular_assembler_worker(
+    device_interface,
+    operator_descriptor,
+    domain_id,
+    dual_to_range_id,
+    test_points,
+    trial_points,
+    quad_weights,
+    test_elements,
+    trial_elements,
+    test_offsets,
+    trial_offsets,
+    weights_offsets,
+    number_of_quad_points,
+    kernel_options,
+    dtype,
+    shape,
+    start,
+    end,
+):
+    """Assemble the singular part for a block of element pairs."""
+    from bempp.api.utils import pool
+    from bempp.core.dispatcher import singular_assembler_dispatcher
+
+    if start == end:
+        return
+
+    _set_worker_threads()
+
+    domain = pool.get_data(domain_id).localised_space
+    dual_to_range = pool.get_data(dual_to_range_id).localised_space
+
+    singular_assembler_dispatcher(
+        device_interface,
+        operator_descriptor,
+        domain.grid,
+        domain,
+        dual_to_range,
+        test_points,
+        trial_points,
+        quad_weights,
+        test_elements,
+        trial_elements,
+        test_offsets,
+        trial_offsets,
+        weights_offsets,
+        number_of_quad_points,
+        kernel_options,
+        pool.as_array(dtype, 0, shape)[start:end],
+    )
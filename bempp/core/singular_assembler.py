@@ -49,6 +49,7 @@ class SingularAssembler(_assembler.AssemblerBase):
             self.parameters,
             operator_descriptor,
             device_interface,
+            scattered_spaces=(domain, dual_to_range),
         )
         global_rows = test_local2global[rows]
         global_cols = trial_local2global[cols]
@@ -72,10 +73,27 @@ class SingularAssembler(_assembler.AssemblerBase):
 
 
 def assemble_singular_part(
-    domain, dual_to_range, parameters, operator_descriptor, device_interface
+    domain,
+    dual_to_range,
+    parameters,
+    operator_descriptor,
+    device_interface,
+    scattered_spaces=None,
 ):
-    """Actually assemble the Numba kernel."""
+    """
+    Actually assemble the Numba kernel.
+
+    If scattered_spaces is a tuple (domain, dual_to_range) of spaces
+    that were scattered to the pool workers and whose localised spaces
+    are domain and dual_to_range, the assembly is distributed across
+    the pool.
+
+    For symmetric operators only one ordering of each pair of adjacent
+    elements is assembled and the values are mirrored.
+    """
     from bempp.api.utils.helpers import get_type
+    from bempp.core.dense_assembler import is_symmetric
+    from bempp.core import pool_assemblers
     from bempp.core.dispatcher import singular_assembler_dispatcher
     import bempp.api
 
@@ -86,8 +104,10 @@ def assemble_singular_part(
     grid = domain.grid
     order = parameters.quadrature.singular
 
+    symmetric = is_symmetric(operator_descriptor, domain, dual_to_range, parameters)
+
     rule = _SingularQuadratureRuleInterfaceGalerkin(
-        grid, order, domain.support, dual_to_range.support
+        grid, order, domain.support, dual_to_range.support, symmetric
     )
 
     number_of_test_shape_functions = dual_to_range.number_of_shape_functions
@@ -117,30 +137,82 @@ def assemble_singular_part(
         dtype=result_type,
     )
 
+    use_pool = scattered_spaces is not None and pool_assemblers.is_available(
+        *scattered_spaces, parameters, result.nbytes
+    )
+
     with bempp.api.Timer(
         message=(
             f"Singular assembler:{operator_descriptor.identifier}:{device_interface}"
         )
     ):
-        singular_assembler_dispatcher(
-            device_interface,
-            operator_descriptor,
-            grid,
-            domain,
-            dual_to_range,
-            test_points,
-            trial_points,
-            quad_weights,
-            test_elements,
-            trial_elements,
-            test_offsets,
-            trial_offsets,
-            weights_offsets,
-            number_of_quad_points,
-            kernel_options,
-            result,
+        if use_pool:
+            pool_assemblers.singular_assembler(
+                device_interface,
+                operator_descriptor,
+                *scattered_spaces,
+                test_points,
+                trial_points,
+                quad_weights,
+                test_elements,
+                trial_elements,
+                test_offsets,
+                trial_offsets,
+                weights_offsets,
+                number_of_quad_points,
+                kernel_options,
+                result,
+            )
+        else:
+            singular_assembler_dispatcher(
+                device_interface,
+                operator_descriptor,
+                grid,
+                domain,
+                dual_to_range,
+                test_points,
+                trial_points,
+                quad_weights,
+                test_elements,
+                trial_elements,
+                test_offsets,
+                trial_offsets,
+                weights_offsets,
+                number_of_quad_points,
+                kernel_options,
+                result,
+            )
+
+    i_ind, j_ind = singular_local_indices(
+        rule, number_of_test_shape_functions, number_of_trial_shape_functions
+    )
+
+    if symmetric:
+        # Coincident elements are always assembled completely.
+        start = (
+            rule.index_count["coincident"]
+            * number_of_test_shape_functions
+            * number_of_trial_shape_functions
         )
+        i_ind, j_ind = (
+            _np.concatenate([i_ind, j_ind[start:]]),
+            _np.concatenate([j_ind, i_ind[start:]]),
+        )
+        result = _np.concatenate([result, result[start:]])
 
+    return (i_ind, j_ind, result)
+
+
+def singular_local_indices(
+    rule, number_of_test_shape_functions, number_of_trial_shape_functions
+):
+    """
+    Return the local row and column indices of the singular values.
+
+    The indices refer to the localised spaces and follow the layout of
+    the singular assembly results, which store the values of all pairs
+    of local test and trial functions for each singular element pair.
+    """
     irange = _np.arange(number_of_test_shape_functions)
     jrange = _np.arange(number_of_trial_shape_functions)
 
@@ -158,7 +230,7 @@ def assemble_singular_part(
         number_of_test_shape_functions * number_of_trial_shape_functions,
     )
 
-    return (i_ind, j_ind, result)
+    return i_ind, j_ind
 
 
 _SingularQuadratureRule = _collections.namedtuple(
@@ -169,8 +241,13 @@ _SingularQuadratureRule = _collections.namedtuple(
 class _SingularQuadratureRuleInterfaceGalerkin(object):
     """Interface for a singular quadrature rule."""
 
-    def __init__(self, grid, order, test_support, trial_support):
-        """Initialize singular quadrature rule."""
+    def __init__(self, grid, order, test_support, trial_support, symmetric=False):
+        """
+        Initialize singular quadrature rule.
+
+        If symmetric is True, only adjacent element pairs whose first
+        element has the smaller index are included.
+        """
 
         self._grid = grid
         self._order = order
@@ -203,6 +280,7 @@ class _SingularQuadratureRuleInterfaceGalerkin(object):
         edge_adjacent_pairs = _np.flatnonzero(
             test_support[grid.edge_adjacency[0, :]]
             * trial_support[grid.edge_adjacency[1, :]]
+            * (not symmetric or grid.edge_adjacency[0, :] < grid.edge_adjacency[1, :])
         )
 
         self._edge_adjacency = grid.edge_adjacency[:, edge_adjacent_pairs]
@@ -210,6 +288,10 @@ class _SingularQuadratureRuleInterfaceGalerkin(object):
         vertex_adjacent_pairs = _np.flatnonzero(
             test_support[grid.vertex_adjacency[0, :]]
             * trial_support[grid.vertex_adjacency[1, :]]
+            * (
+                not symmetric
+                or grid.vertex_adjacency[0, :] < grid.vertex_adjacency[1, :]
+            )
         )
 
         self._vertex_adjacency = grid.vertex_adjacency[:, vertex_adjacent_pairs]
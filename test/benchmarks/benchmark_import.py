@@ -0,0 +1,26 @@
+"""Benchmark for importing bempp.api."""
+
+import subprocess
+import sys
+
+
+def import_benchmark(benchmark):
+    """Benchmark importing bempp.api in a fresh interpreter."""
+
+    fun = lambda: subprocess.run([sys.executable, "-c", "import bempp.api"], check=True)
+
+    benchmark(fun)
+
+
+def first_space_benchmark(benchmark):
+    """Benchmark importing bempp.api and creating a first space."""
+
+    code = (
+        "import bempp.api\n"
+        "grid = bempp.api.Grid([[0, 1, 0], [0, 0, 1], [0, 0, 0]], [[0], [1], [2]])\n"
+        "bempp.api.function_space(grid, 'DP', 0)"
+    )
+
+    fun = lambda: subprocess.run([sys.executable, "-c", code], check=True)
+
+    benchmark(fun)
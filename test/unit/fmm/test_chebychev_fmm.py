@@ -0,0 +1,102 @@
+"""Unit tests for the Chebychev Fmm."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api.fmm.chebychev import ChebychevFmmInterface
+from bempp.api.fmm.helpers import dense_interaction_evaluator
+from bempp.api.operators.boundary import laplace
+
+
+def _sphere_points(npoints, seed):
+    """Return random points on the unit sphere."""
+    rng = np.random.default_rng(seed)
+    points = rng.normal(size=(npoints, 3))
+    return points / np.linalg.norm(points, axis=1)[:, np.newaxis]
+
+
+def _relative_error(actual, expected):
+    """Return the relative error in the Frobenius norm."""
+    return np.linalg.norm(actual - expected) / np.linalg.norm(expected)
+
+
+@pytest.mark.parametrize(
+    "mode, wavenumber",
+    [("laplace", None), ("helmholtz", 2.0), ("modified_helmholtz", 2.0)],
+)
+def test_chebychev_fmm_against_dense_evaluation(mode, wavenumber):
+    """The Chebychev Fmm agrees with a dense evaluation."""
+    sources = _sphere_points(1500, 0)
+    targets = 1.2 * _sphere_points(1000, 1)
+    charges = np.random.default_rng(2).random((1500, 2))
+
+    if wavenumber is None:
+        kernel_parameters = np.array([], dtype="float64")
+    else:
+        kernel_parameters = np.array([wavenumber], dtype="float64")
+
+    fmm = ChebychevFmmInterface(
+        sources, targets, mode, wavenumber=wavenumber, depth=3, expansion_order=5
+    )
+    expected = dense_interaction_evaluator(
+        targets, sources, charges, mode, kernel_parameters
+    )
+
+    result = fmm.evaluate(charges)
+    assert result.shape == (1000, 4, 2)
+    assert _relative_error(result, expected) < 1e-4
+
+    single = fmm.evaluate(charges[:, 1])
+    assert single.shape == (1000, 4)
+    assert np.allclose(single, result[:, :, 1])
+
+
+def test_chebychev_fmm_with_complex_charges():
+    """A real kernel is applied to real and imaginary part of the charges."""
+    points = _sphere_points(1500, 0)
+    rng = np.random.default_rng(1)
+    charges = rng.random(1500) + 1j * rng.random(1500)
+
+    fmm = ChebychevFmmInterface(points, points, "laplace", depth=3)
+    expected = dense_interaction_evaluator(
+        points, points, np.ascontiguousarray(charges.real), "laplace", np.array([])
+    ) + 1j * dense_interaction_evaluator(
+        points, points, np.ascontiguousarray(charges.imag), "laplace", np.array([])
+    )
+
+    assert _relative_error(fmm.evaluate(charges), expected) < 1e-4
+
+
+def test_chebychev_fmm_engine():
+    """The Fmm assembler uses the engine from the parameters."""
+    from bempp.api.fmm.fmm_assembler import get_fmm_interface_class
+
+    parameters = bempp.api.DefaultParameters()
+    assert get_fmm_interface_class(parameters).__name__ == "ExafmmInterface"
+
+    parameters.fmm.engine = "chebychev"
+    assert get_fmm_interface_class(parameters) is ChebychevFmmInterface
+
+    parameters.fmm.engine = "unknown"
+    with pytest.raises(ValueError):
+        get_fmm_interface_class(parameters)
+
+
+def test_laplace_single_layer_with_chebychev_engine(helpers):
+    """The Chebychev engine reproduces the dense single layer operator."""
+    grid = helpers.load_grid("sphere")
+    space = bempp.api.function_space(grid, "DP", 0)
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.fmm.engine = "chebychev"
+
+    bempp.api.clear_fmm_cache()
+    dense = laplace.single_layer(space, space, space, assembler="dense")
+    fmm = laplace.single_layer(
+        space, space, space, assembler="fmm", parameters=parameters
+    )
+
+    vec = np.random.default_rng(0).random(space.global_dof_count)
+    assert _relative_error(fmm.weak_form() @ vec, dense.weak_form() @ vec) < 1e-4
+
+    bempp.api.clear_fmm_cache()
@@ -0,0 +1,136 @@
+"""Unit tests for the batched evaluation of Fmm operators."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api.fmm.exafmm import ExafmmInterface
+from bempp.api.fmm.helpers import dense_interaction_evaluator
+from bempp.api.operators.boundary import helmholtz, laplace, maxwell
+
+
+class _DenseInterface(object):
+    """Fmm interface that evaluates the interactions densely."""
+
+    def __init__(self, source_grid, mode, wavenumber, target_grid):
+        order = bempp.api.GLOBAL_PARAMETERS.quadrature.regular
+        self.sources = source_grid.map_to_point_cloud(order)
+        self.targets = target_grid.map_to_point_cloud(order)
+        self.mode = mode
+        if wavenumber is None:
+            self.kernel_parameters = np.array([], dtype="float64")
+        else:
+            self.kernel_parameters = np.array([wavenumber], dtype="float64")
+        self.nbytes = 0
+        self.ncalls = 0
+
+    def evaluate(self, vec):
+        self.ncalls += 1
+        return dense_interaction_evaluator(
+            self.targets, self.sources, vec, self.mode, self.kernel_parameters
+        )
+
+    def remove_tmp_file(self):
+        pass
+
+
+@pytest.fixture
+def dense_interfaces(monkeypatch):
+    """Replace the Exafmm setup by dense evaluations."""
+    created = []
+
+    def from_grid(source_grid, mode, wavenumber=None, target_grid=None):
+        interface = _DenseInterface(source_grid, mode, wavenumber, target_grid)
+        created.append(interface)
+        return interface
+
+    monkeypatch.setattr(ExafmmInterface, "from_grid", staticmethod(from_grid))
+    bempp.api.clear_fmm_cache()
+    yield created
+    bempp.api.clear_fmm_cache()
+
+
+def test_dense_interaction_evaluator_with_multiple_charges():
+    """Each charge vector gives the same result as a single evaluation."""
+    rng = np.random.default_rng(0)
+    sources = rng.random((20, 3))
+    targets = rng.random((15, 3)) + 2
+    charges = rng.random((20, 3))
+    kernel_parameters = np.array([1.5])
+
+    batch = dense_interaction_evaluator(
+        targets, sources, charges, "helmholtz", kernel_parameters
+    )
+
+    assert batch.shape == (15, 4, 3)
+    for index in range(3):
+        single = dense_interaction_evaluator(
+            targets, sources, charges[:, index], "helmholtz", kernel_parameters
+        )
+        np.testing.assert_allclose(batch[:, :, index], single, rtol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "make_operator",
+    [
+        lambda p1, rwg, snc: laplace.double_layer(p1, p1, p1, assembler="fmm"),
+        lambda p1, rwg, snc: laplace.hypersingular(p1, p1, p1, assembler="fmm"),
+        lambda p1, rwg, snc: helmholtz.hypersingular(p1, p1, p1, 1.5, assembler="fmm"),
+        lambda p1, rwg, snc: maxwell.electric_field(
+            rwg, rwg, snc, 1.5, assembler="fmm"
+        ),
+        lambda p1, rwg, snc: maxwell.magnetic_field(
+            rwg, rwg, snc, 1.5, assembler="fmm"
+        ),
+    ],
+)
+def test_fmm_matmat(dense_interfaces, helpers, make_operator):
+    """A block product evaluates the Fmm once and matches the matvecs."""
+    grid = helpers.load_grid("fmm_grid")
+    p1 = bempp.api.function_space(grid, "P", 1)
+    rwg = bempp.api.function_space(grid, "RWG", 0)
+    snc = bempp.api.function_space(grid, "SNC", 0)
+
+    weak_form = make_operator(p1, rwg, snc).weak_form()
+    (interface,) = dense_interfaces
+
+    rng = np.random.default_rng(0)
+    x = rng.random((weak_form.shape[1], 3)) + 1j * rng.random((weak_form.shape[1], 3))
+
+    interface.ncalls = 0
+    batch = weak_form @ x
+    assert interface.ncalls == 1
+
+    for index in range(3):
+        np.testing.assert_allclose(
+            batch[:, index], weak_form @ x[:, index], rtol=1e-10, atol=1e-14
+        )
+
+
+@pytest.mark.parametrize("mode, wavenumber", [("laplace", None), ("helmholtz", 1.5)])
+def test_exafmm_with_multiple_charges(mode, wavenumber):
+    """Exafmm evaluates each column of a block of charges."""
+    pytest.importorskip("exafmm")
+
+    rng = np.random.default_rng(0)
+    sources = rng.random((500, 3))
+    targets = rng.random((400, 3)) + 2
+    charges = rng.random((500, 3))
+    if mode == "helmholtz":
+        charges = charges + 1j * rng.random((500, 3))
+
+    interface = ExafmmInterface(sources, targets, mode, wavenumber=wavenumber)
+    batch = interface.evaluate(charges)
+    expected = dense_interaction_evaluator(
+        targets, sources, charges, mode, interface._kernel_parameters
+    )
+
+    assert batch.shape == (400, 4, 3)
+    for index in range(3):
+        np.testing.assert_allclose(
+            batch[:, :, index], interface.evaluate(charges[:, index]), rtol=1e-12
+        )
+    np.testing.assert_allclose(
+        batch, expected, rtol=1e-3, atol=1e-3 * np.max(np.abs(expected))
+    )
+
+    interface.remove_tmp_file()
@@ -0,0 +1,96 @@
+"""Unit tests for the Fmm interface cache."""
+
+import os
+
+import pytest
+import bempp.api
+from bempp.api.fmm import fmm_assembler
+from bempp.api.fmm.exafmm import ExafmmInterface
+
+
+class _FakeInterface(object):
+    """Stand in for an Exafmm interface with a precomputation file."""
+
+    def __init__(self, fname, nbytes):
+        self.fname = fname
+        self.nbytes = nbytes
+        with open(fname, "w") as f:
+            f.write("tables")
+
+    def remove_tmp_file(self):
+        if os.path.exists(self.fname):
+            os.remove(self.fname)
+
+
+@pytest.fixture
+def fake_interfaces(monkeypatch, tmp_path):
+    """Replace the Exafmm setup by fake interfaces of 1 MB each."""
+    created = []
+
+    def from_grid(source_grid, mode, wavenumber=None, target_grid=None):
+        interface = _FakeInterface(str(tmp_path / f"{len(created)}.tmp"), 1024**2)
+        created.append(interface)
+        return interface
+
+    monkeypatch.setattr(ExafmmInterface, "from_grid", staticmethod(from_grid))
+    bempp.api.clear_fmm_cache()
+    yield created
+    bempp.api.clear_fmm_cache()
+
+
+def _statistics_delta(before):
+    after = bempp.api.fmm_cache_statistics()
+    return {name: after[name] - before[name] for name in before}
+
+
+def test_fmm_cache_hits_and_misses(fake_interfaces, two_element_grid):
+    """Identical requests share an interface."""
+    space = bempp.api.function_space(two_element_grid, "DP", 0)
+    before = bempp.api.fmm_cache_statistics()
+
+    first = fmm_assembler.get_fmm_interface(space, space, "helmholtz", 1.0)
+    second = fmm_assembler.get_fmm_interface(space, space, "helmholtz", 1.0)
+
+    delta = _statistics_delta(before)
+
+    assert first is second
+    assert delta["hits"] == 1
+    assert delta["misses"] == 1
+    assert bempp.api.fmm_cache_statistics()["entries"] == 1
+
+
+def test_fmm_cache_evicts_by_size(fake_interfaces, two_element_grid):
+    """Old interfaces are evicted and their files removed."""
+    space = bempp.api.function_space(two_element_grid, "DP", 0)
+    parameters = bempp.api.DefaultParameters()
+    parameters.fmm.cache_size = 2
+
+    for wavenumber in [1.0, 2.0, 3.0]:
+        fmm_assembler.get_fmm_interface(
+            space, space, "helmholtz", wavenumber, parameters
+        )
+
+    statistics = bempp.api.fmm_cache_statistics()
+    assert statistics["entries"] == 2
+    assert statistics["bytes"] == 2 * 1024**2
+    assert not os.path.exists(fake_interfaces[0].fname)
+    assert os.path.exists(fake_interfaces[2].fname)
+
+    bempp.api.clear_fmm_cache()
+
+    assert bempp.api.fmm_cache_statistics()["entries"] == 0
+    assert not os.path.exists(fake_interfaces[2].fname)
+
+
+def test_fmm_cache_evicts_by_entries(fake_interfaces, two_element_grid):
+    """The number of cached interfaces is limited."""
+    space = bempp.api.function_space(two_element_grid, "DP", 0)
+    parameters = bempp.api.DefaultParameters()
+    parameters.fmm.cache_entries = 1
+
+    first = fmm_assembler.get_fmm_interface(space, space, "helmholtz", 1.0, parameters)
+    fmm_assembler.get_fmm_interface(space, space, "helmholtz", 2.0, parameters)
+    third = fmm_assembler.get_fmm_interface(space, space, "helmholtz", 1.0, parameters)
+
+    assert first is not third
+    assert bempp.api.fmm_cache_statistics()["entries"] == 1
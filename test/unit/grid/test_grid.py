@@ -119,3 +119,70 @@ def test_integration_element(two_element_geometries):
     """Check the volume of an element."""
     for geom in two_element_geometries:
         np.testing.assert_almost_equal(geom.integration_element, 1)
+
+
+def test_grid_data_is_created_on_demand(helpers):
+    """Grid data is only computed when it is requested."""
+    grid = helpers.load_grid("sphere")
+
+    assert grid._edges is None
+    assert grid._grid_data_single is None
+
+    data = grid.data("double")
+
+    assert grid.data("double") is data
+    assert grid._grid_data_single is None
+    assert grid._edge_neighbors is None
+
+    single = grid.data("single")
+
+    assert single.vertices.dtype == np.float32
+    np.testing.assert_allclose(single.volumes, grid.volumes, rtol=1e-6)
+
+
+def test_edge_neighbors(helpers):
+    """The neighbors of each edge contain the edge."""
+    grid = helpers.load_grid("sphere")
+
+    assert len(grid.edge_neighbors) == grid.number_of_edges
+    for edge_index, neighbors in enumerate(grid.edge_neighbors):
+        assert len(neighbors) == 2
+        assert list(neighbors) == sorted(neighbors)
+        for element in neighbors:
+            assert edge_index in grid.element_edges[:, element]
+
+
+def test_refine(two_element_grid):
+    """Refinement splits each element into four elements."""
+    refined = two_element_grid.refine()
+
+    assert refined.number_of_elements == 8
+    assert refined.number_of_vertices == 9
+    np.testing.assert_allclose(np.sum(refined.volumes), 1)
+    np.testing.assert_allclose(
+        refined.vertices[:, 4:],
+        0.5
+        * (
+            two_element_grid.vertices[:, two_element_grid.edges[0]]
+            + two_element_grid.vertices[:, two_element_grid.edges[1]]
+        ),
+    )
+
+
+def test_refine_multiple_levels(helpers):
+    """Refining several levels at once gives the same grid as single steps."""
+    grid = helpers.load_grid("sphere")
+
+    expected = grid.refine().refine()
+    actual = grid.refine(levels=2)
+
+    np.testing.assert_array_equal(actual.vertices, expected.vertices)
+    np.testing.assert_array_equal(actual.elements, expected.elements)
+    np.testing.assert_array_equal(actual.domain_indices, expected.domain_indices)
+
+
+@pytest.mark.parametrize("levels", [0, -1])
+def test_refine_invalid_levels(two_element_grid, levels):
+    """Refining with less than one level raises an error."""
+    with pytest.raises(ValueError):
+        two_element_grid.refine(levels=levels)
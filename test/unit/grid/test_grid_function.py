@@ -41,3 +41,32 @@ def test_interpolation_python_callable():
     fun = bempp.api.GridFunction(space, fun=f)
 
     assert np.isclose(fun.l2_norm(), sqrt(14 / 3))
+
+
+def test_evaluate_on_elements(helpers):
+    """Test batched evaluation with separate coordinates on each element."""
+    grid = helpers.load_grid("sphere")
+    space = bempp.api.function_space(grid, "RWG", 0)
+    rand = np.random.RandomState(0)
+    fun = bempp.api.GridFunction(space, coefficients=rand.rand(space.global_dof_count))
+    local_coordinates = 0.5 * rand.rand(grid.number_of_elements, 2, 4)
+
+    values = fun.evaluate_on_elements(local_coordinates)
+
+    assert values.shape == (3, grid.number_of_elements, 4)
+    for index in space.support_elements:
+        np.testing.assert_allclose(
+            values[:, index], fun.evaluate(index, local_coordinates[index])
+        )
+
+
+def test_evaluate_on_element_centers_and_vertices(helpers):
+    """Test evaluation of a linear function on centers and vertices."""
+    grid = helpers.load_grid("sphere")
+    space = bempp.api.function_space(grid, "P", 1)
+    fun = bempp.api.GridFunction(space, coefficients=grid.vertices[0])
+
+    np.testing.assert_allclose(fun.evaluate_on_vertices()[0], grid.vertices[0])
+    np.testing.assert_allclose(
+        fun.evaluate_on_element_centers()[0], grid.centroids[:, 0]
+    )
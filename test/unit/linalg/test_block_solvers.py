@@ -0,0 +1,76 @@
+"""Unit tests for the block Krylov solvers."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api.operators.boundary import laplace
+
+
+@pytest.fixture
+def single_layer(helpers):
+    """A Laplace single layer operator on a small grid."""
+    grid = helpers.load_grid("fmm_grid")
+    space = bempp.api.function_space(grid, "DP", 0)
+    return laplace.single_layer(space, space, space, assembler="dense")
+
+
+def _right_hand_sides(space, count):
+    rng = np.random.default_rng(0)
+    return [
+        bempp.api.GridFunction(space, coefficients=rng.random(space.global_dof_count))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("solver", [bempp.api.block_gmres, bempp.api.block_cg])
+def test_block_solver(single_layer, solver):
+    """All right-hand sides are solved to the requested tolerance."""
+    rhs = _right_hand_sides(single_layer.range, 4)
+
+    solutions, info, count = solver(
+        single_layer, rhs, tol=1e-8, return_iteration_count=True
+    )
+
+    assert info == 0
+    assert len(solutions) == 4
+
+    mat = single_layer.weak_form().A
+    for sol, fun in zip(solutions, rhs):
+        expected = np.linalg.solve(mat, fun.projections(single_layer.dual_to_range))
+        np.testing.assert_allclose(
+            sol.coefficients, expected, atol=1e-5 * np.max(np.abs(expected))
+        )
+
+    _, _, single_count = solver(
+        single_layer, rhs[:1], tol=1e-8, return_iteration_count=True
+    )
+    assert count <= single_count
+
+
+def test_block_gmres_blocked_operator(single_layer):
+    """Block GMRES solves systems with blocked operators."""
+    space = single_layer.domain
+    op = bempp.api.BlockedOperator(2, 2)
+    op[0, 0] = single_layer
+    op[1, 1] = 2 * single_layer
+    op[0, 1] = 0.1 * single_layer
+    op[1, 0] = 0.1 * single_layer
+
+    rhs = [_right_hand_sides(space, 2) for _ in range(3)]
+
+    solutions, info, residuals = bempp.api.block_gmres(
+        op, rhs, tol=1e-8, return_residuals=True
+    )
+
+    assert info == 0
+    assert np.all(residuals[-1] <= 1e-8)
+
+    mat = op.weak_form().A
+    for sol, funs in zip(solutions, rhs):
+        vec = np.concatenate([fun.projections(space) for fun in funs])
+        expected = np.linalg.solve(mat, vec)
+        np.testing.assert_allclose(
+            np.concatenate([fun.coefficients for fun in sol]),
+            expected,
+            atol=1e-5 * np.max(np.abs(expected)),
+        )
@@ -0,0 +1,146 @@
+"""Unit tests for the near field preconditioners."""
+
+import numpy as np
+import pytest
+import scipy.sparse.linalg
+import bempp.api
+from bempp.api.fmm.exafmm import ExafmmInterface
+from bempp.api.linalg.preconditioners import near_field_matrix
+from bempp.api.operators.boundary import laplace, maxwell, sparse
+
+
+def _gmres_iterations(A_op, b, M=None):
+    """Return the number of GMRES iterations and the solution."""
+    count = [0]
+
+    def callback(_):
+        count[0] += 1
+
+    x, info = scipy.sparse.linalg.gmres(
+        A_op, b, M=M, restart=200, callback=callback, callback_type="pr_norm"
+    )
+    assert info == 0
+    return count[0], x
+
+
+@pytest.fixture
+def dense_fmm(monkeypatch):
+    """Evaluate Fmm operators densely without setting up Exafmm."""
+
+    def init(self, source_points, target_points, mode, wavenumber=None, **kwargs):
+        self._fname = ""
+        self._tmp_file_finalizer = lambda: None
+        self._singular_correction = kwargs.get("singular_correction")
+        self._source_points = source_points
+        self._target_points = target_points
+        self._mode = mode
+        if wavenumber is None:
+            self._kernel_parameters = np.array([], dtype="float64")
+        else:
+            self._kernel_parameters = np.array([wavenumber], dtype="float64")
+
+    monkeypatch.setattr(ExafmmInterface, "__init__", init)
+    monkeypatch.setattr(bempp.api.GLOBAL_PARAMETERS.fmm, "dense_evaluation", True)
+    bempp.api.clear_fmm_cache()
+    yield
+    bempp.api.clear_fmm_cache()
+
+
+@pytest.mark.parametrize("method", ["ilu", "block_jacobi"])
+def test_near_field_preconditioner(helpers, method):
+    """The preconditioner reduces the number of GMRES iterations."""
+    grid = helpers.load_grid("fmm_grid")
+    space = bempp.api.function_space(grid, "DP", 0)
+    op = laplace.single_layer(space, space, space, assembler="dense")
+
+    rng = np.random.default_rng(0)
+    b = rng.random(space.global_dof_count)
+
+    M = bempp.api.near_field_preconditioner(op, method=method, block_size=32)
+
+    plain_count, _ = _gmres_iterations(op.weak_form(), b)
+    count, x = _gmres_iterations(op.weak_form(), b, M)
+
+    assert M.shape == op.weak_form().shape
+    assert count < plain_count
+    assert np.linalg.norm(op.weak_form() @ x - b) < 1e-4 * np.linalg.norm(b)
+
+
+def test_near_field_matrix_blocked_operator(helpers):
+    """Near fields of blocked operators combine the blocks."""
+    grid = helpers.load_grid("fmm_grid")
+    p0 = bempp.api.function_space(grid, "DP", 0)
+    p1 = bempp.api.function_space(grid, "P", 1)
+
+    op = bempp.api.BlockedOperator(2, 2)
+    op[0, 0] = laplace.single_layer(p0, p0, p0)
+    op[0, 1] = -laplace.double_layer(p1, p0, p0)
+    op[1, 1] = laplace.hypersingular(p1, p1, p1) + sparse.identity(p1, p1, p1)
+
+    near_field = near_field_matrix(op)
+    n0 = p0.global_dof_count
+
+    assert near_field.shape == (n0 + p1.global_dof_count,) * 2
+    assert near_field[n0:, :n0].nnz == 0
+    np.testing.assert_allclose(
+        near_field[:n0, :n0].toarray(),
+        op[0, 0].descriptor.singular_part.weak_form().A.toarray(),
+    )
+
+    M = bempp.api.near_field_preconditioner(op, method="block_jacobi")
+    assert M.shape == near_field.shape
+
+
+def test_efie_calderon_preconditioner(dense_fmm, helpers):
+    """The Calderon preconditioner reduces the number of GMRES iterations."""
+    grid = helpers.load_grid("sphere")
+    rwg = bempp.api.function_space(grid, "RWG", 0)
+    snc = bempp.api.function_space(grid, "SNC", 0)
+    op = maxwell.electric_field(rwg, rwg, snc, 2.0, assembler="dense")
+
+    rng = np.random.default_rng(0)
+    b = rng.random(rwg.global_dof_count) + 1j * rng.random(rwg.global_dof_count)
+
+    M = bempp.api.efie_calderon_preconditioner(grid, 2.0)
+
+    plain_count, _ = _gmres_iterations(op.weak_form(), b)
+    count, x = _gmres_iterations(op.weak_form(), b, M)
+
+    assert M.shape == op.weak_form().shape
+    assert count < plain_count / 4
+    assert np.linalg.norm(op.weak_form() @ x - b) < 1e-4 * np.linalg.norm(b)
+
+
+def test_single_layer_preconditioner(dense_fmm, helpers):
+    """The hypersingular operator on dual spaces preconditions the single layer."""
+    grid = helpers.load_grid("sphere")
+    space = bempp.api.function_space(grid, "DP", 0)
+    op = laplace.single_layer(space, space, space, assembler="dense")
+
+    rng = np.random.default_rng(0)
+    b = rng.random(space.global_dof_count)
+
+    M = bempp.api.single_layer_preconditioner(grid)
+
+    plain_count, _ = _gmres_iterations(op.weak_form(), b)
+    count, x = _gmres_iterations(op.weak_form(), b, M)
+
+    assert count < plain_count
+    assert np.linalg.norm(op.weak_form() @ x - b) < 1e-4 * np.linalg.norm(b)
+
+
+def test_hypersingular_preconditioner(dense_fmm, helpers):
+    """The preconditioned hypersingular operator satisfies the Calderon bound."""
+    grid = helpers.load_grid("sphere")
+    space = bempp.api.function_space(grid, "P", 1)
+    mat = laplace.hypersingular(space, space, space, assembler="dense").weak_form().A
+
+    M = bempp.api.hypersingular_preconditioner(grid)
+    preconditioned = (M @ np.eye(space.global_dof_count)) @ mat
+
+    # The constant functions are in the kernel. On the unit sphere the
+    # other eigenvalues of the product of the single layer and the
+    # hypersingular operator are bounded below by 2 / 9.
+    eigenvalues = np.sort(np.linalg.eigvals(preconditioned).real)
+    assert abs(eigenvalues[0]) < 1e-10
+    assert eigenvalues[1] > 0.2
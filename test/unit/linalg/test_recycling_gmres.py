@@ -0,0 +1,54 @@
+"""Unit tests for GMRES with subspace recycling."""
+
+import numpy as np
+import bempp.api
+from bempp.api.linalg.iterative_solvers import IterationCounter
+from bempp.api.operators.boundary import helmholtz
+from scipy.sparse.linalg import aslinearoperator
+
+
+def test_recycling_gmres_frequency_sweep(helpers):
+    """A sequence of Helmholtz problems is solved correctly."""
+    grid = helpers.load_grid("fmm_grid")
+    space = bempp.api.function_space(grid, "DP", 0)
+    rng = np.random.default_rng(0)
+    rhs = bempp.api.GridFunction(space, coefficients=rng.random(space.global_dof_count))
+
+    solver = bempp.api.RecyclingGmres(recycle=5, restart=20, tol=1e-8)
+
+    for wavenumber in [1.0, 1.1]:
+        op = helmholtz.single_layer(space, space, space, wavenumber)
+        sol, info = solver.solve(op, rhs)
+
+        expected = np.linalg.solve(op.weak_form().A, rhs.projections(space))
+
+        assert info == 0
+        assert solver.recycle_space.shape == (space.global_dof_count, 5)
+        np.testing.assert_allclose(
+            sol.coefficients, expected, atol=1e-5 * np.max(np.abs(expected))
+        )
+
+
+def test_recycling_gmres_deflates_small_eigenvalues():
+    """Recycling removes isolated small eigenvalues from later solves."""
+    rng = np.random.default_rng(0)
+    n = 300
+    eigenvalues = np.concatenate([np.logspace(-4, -2, 6), 1 + rng.random(n - 6)])
+    basis = np.linalg.qr(rng.random((n, n)))[0]
+    mat = basis @ np.diag(eigenvalues) @ basis.T
+
+    counts = {}
+    for recycle in [0, 8]:
+        solver = bempp.api.RecyclingGmres(recycle=recycle, restart=30, tol=1e-8)
+        for shift in [0, 1e-3]:
+            shifted = mat + shift * np.eye(n)
+            b = rng.random(n)
+            callback = IterationCounter(False)
+            x, info = solver._solve(aslinearoperator(shifted), b, callback)
+
+            assert info == 0
+            assert np.linalg.norm(shifted @ x - b) <= 1e-7 * np.linalg.norm(b)
+
+        counts[recycle] = callback.count
+
+    assert 2 * counts[8] < counts[0]
@@ -0,0 +1,60 @@
+"""Unit tests for the H-matrix assembler."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import laplace, helmholtz
+
+
+def test_aca_reproduces_smooth_block():
+    """Test that ACA approximates a block of a smooth kernel."""
+    from bempp.core.hmat_assembler import aca
+
+    rng = np.random.default_rng(0)
+    sources = rng.random((60, 3))
+    targets = rng.random((50, 3)) + np.array([5.0, 0, 0])
+
+    mat = 1.0 / np.linalg.norm(targets[:, None, :] - sources[None, :, :], axis=2)
+
+    u_mat, v_mat = aca(
+        lambda i: mat[i], lambda j: mat[:, j], 50, 60, eps=1e-6, max_rank=30
+    )
+
+    assert u_mat.shape[1] < 20
+    assert np.linalg.norm(u_mat @ v_mat - mat) < 1e-5 * np.linalg.norm(mat)
+
+
+def test_laplace_single_layer(helpers):
+    """Compare the H-matrix and dense Laplace single layer."""
+    grid = helpers.load_grid("fmm_grid")
+    space = function_space(grid, "DP", 0)
+
+    op1 = laplace.single_layer(space, space, space, assembler="dense")
+    op2 = laplace.single_layer(space, space, space, assembler="hmat")
+
+    hmatrix = op2.weak_form()._evaluator
+    assert len(hmatrix.low_rank_blocks) > 0
+
+    fun = bempp.api.GridFunction(
+        space, coefficients=np.random.rand(space.global_dof_count)
+    )
+
+    np.testing.assert_allclose(
+        (op1 * fun).coefficients, (op2 * fun).coefficients, rtol=1e-4
+    )
+
+
+@pytest.mark.parametrize("wavenumber", [2.5])
+def test_helmholtz_hypersingular(helpers, wavenumber):
+    """Compare the H-matrix and dense Helmholtz hypersingular operator."""
+    grid = helpers.load_grid("fmm_grid")
+    space = function_space(grid, "P", 1)
+
+    op1 = helmholtz.hypersingular(space, space, space, wavenumber, assembler="dense")
+    op2 = helmholtz.hypersingular(space, space, space, wavenumber, assembler="hmat")
+
+    mat1 = op1.weak_form().A
+    mat2 = op2.weak_form().A
+
+    assert np.linalg.norm(mat1 - mat2) < 1e-4 * np.linalg.norm(mat1)
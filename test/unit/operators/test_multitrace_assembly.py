@@ -0,0 +1,65 @@
+"""Unit tests for the fused assembly of multitrace operators."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import laplace, helmholtz
+
+
+@pytest.mark.parametrize(
+    "module, args", [(laplace, ()), (helmholtz, (1.5,)), (helmholtz, (1.5 + 0.5j,))]
+)
+@pytest.mark.parametrize("precision", ["single", "double"])
+def test_multitrace_assembly(helpers, module, args, precision):
+    """Compare the fused blocks with separately assembled operators."""
+    grid = helpers.load_grid("sphere")
+    space = function_space(grid, "P", 1)
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+
+    multitrace = module.multitrace_operator(
+        grid, *args, parameters=parameters, precision=precision
+    )
+
+    expected = [
+        (0, 0, -1, module.double_layer),
+        (0, 1, 1, module.single_layer),
+        (1, 0, 1, module.hypersingular),
+        (1, 1, 1, module.adjoint_double_layer),
+    ]
+
+    for i, j, sign, operator in expected:
+        block = multitrace[i, j].weak_form().A
+        mat = (
+            operator(
+                space,
+                space,
+                space,
+                *args,
+                parameters=parameters,
+                device_interface="numba",
+                precision=precision,
+            )
+            .weak_form()
+            .A
+        )
+        assert block.dtype == mat.dtype
+        np.testing.assert_allclose(
+            block,
+            sign * mat,
+            rtol=helpers.default_tolerance(precision),
+            atol=helpers.default_tolerance(precision) * np.max(np.abs(mat)),
+        )
+
+
+def test_multitrace_assembler_selection(helpers):
+    """Only dense Numba assembly uses the fused multitrace assembler."""
+    grid = helpers.load_grid("sphere")
+
+    multitrace = laplace.multitrace_operator(grid)
+    assert multitrace[0, 1].assembler.implementation_name == "DenseMultitraceAssembler"
+
+    multitrace = laplace.multitrace_operator(grid, device_interface="opencl")
+    assert multitrace[0, 1].assembler.implementation_name == "DenseAssembler"
@@ -0,0 +1,86 @@
+"""Unit tests for out-of-core dense assembly."""
+
+import os
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import helmholtz
+
+
+@pytest.mark.parametrize("tile_size", [0, 1])
+def test_out_of_core_helmholtz_single_layer(helpers, tmp_path, tile_size):
+    """Compare the out-of-core and in-memory Helmholtz single layer."""
+    grid = helpers.load_grid("fmm_grid")
+    space = function_space(grid, "P", 1)
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+    mat = helmholtz.single_layer(
+        space, space, space, 1.5, parameters=parameters
+    ).weak_form()
+
+    parameters.assembly.dense.out_of_core = True
+    parameters.assembly.dense.out_of_core_dir = str(tmp_path)
+    # Use small tiles so that assembly and products use several tiles.
+    parameters.assembly.dense.out_of_core_tile_size = tile_size
+    out_of_core = helmholtz.single_layer(
+        space, space, space, 1.5, parameters=parameters
+    ).weak_form()
+
+    assert isinstance(out_of_core.A, np.memmap)
+    assert len(os.listdir(tmp_path)) == 1
+
+    np.testing.assert_allclose(out_of_core.A, mat.A, rtol=1e-12)
+
+    vec = np.random.rand(space.global_dof_count, 2)
+    np.testing.assert_allclose(out_of_core @ vec, mat @ vec, rtol=1e-12)
+    np.testing.assert_allclose(out_of_core.T @ vec, mat.A.T @ vec, rtol=1e-12)
+
+    # The adjoint streams the conjugated matrix from disk.
+    adjoint = out_of_core.H
+    assert adjoint.is_out_of_core
+    vec = vec + 1j * np.random.rand(space.global_dof_count, 2)
+    np.testing.assert_allclose(adjoint @ vec, mat.A.conj().T @ vec, rtol=1e-12)
+    np.testing.assert_allclose(adjoint.H @ vec, mat @ vec, rtol=1e-12)
+
+    del adjoint
+
+    del out_of_core
+    assert len(os.listdir(tmp_path)) == 0
+
+
+def test_out_of_core_promote_to_double(helpers, tmp_path):
+    """Single precision out-of-core weak forms are promoted to double."""
+    grid = helpers.load_grid("sphere")
+    space = function_space(grid, "DP", 0)
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+    parameters.assembly.always_promote_to_double = True
+    mat = helmholtz.single_layer(
+        space,
+        space,
+        space,
+        1.5,
+        parameters=parameters,
+        device_interface="numba",
+        precision="single",
+    ).weak_form()
+
+    parameters.assembly.dense.out_of_core = True
+    parameters.assembly.dense.out_of_core_dir = str(tmp_path)
+    out_of_core = helmholtz.single_layer(
+        space,
+        space,
+        space,
+        1.5,
+        parameters=parameters,
+        device_interface="numba",
+        precision="single",
+    ).weak_form()
+
+    assert isinstance(out_of_core.A, np.memmap)
+    assert out_of_core.dtype == np.complex128
+    np.testing.assert_array_equal(out_of_core.A, mat.A)
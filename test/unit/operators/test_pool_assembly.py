@@ -0,0 +1,50 @@
+"""Unit tests for the distributed dense assembly."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import laplace, helmholtz
+from bempp.api.utils import pool
+
+
+@pytest.fixture(scope="module")
+def worker_pool():
+    """Create a pool with two workers."""
+    pool.create_pool(2)
+    yield
+    pool.shutdown()
+
+
+@pytest.mark.parametrize(
+    "operator, space_type, args",
+    [
+        (laplace.hypersingular, ("P", 1), ()),
+        (helmholtz.double_layer, ("DP", 0), (1.5,)),
+    ],
+)
+def test_pool_assembly(worker_pool, helpers, operator, space_type, args):
+    """Compare the distributed and the serial dense assembly."""
+    grid = helpers.load_grid("fmm_grid")
+    space = function_space(grid, *space_type)
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+    mat1 = (
+        operator(
+            space, space, space, *args, device_interface="numba", parameters=parameters
+        )
+        .weak_form()
+        .A
+    )
+
+    parameters.assembly.use_pool = False
+    mat2 = (
+        operator(
+            space, space, space, *args, device_interface="numba", parameters=parameters
+        )
+        .weak_form()
+        .A
+    )
+
+    np.testing.assert_allclose(mat1, mat2, rtol=1e-12)
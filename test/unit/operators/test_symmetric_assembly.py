@@ -0,0 +1,66 @@
+"""Unit tests for the symmetric dense assembly."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import laplace, helmholtz, modified_helmholtz
+
+
+def _assemble(operator, space, args, device_interface, symmetric):
+    """Assemble an operator with or without symmetric assembly."""
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+    parameters.assembly.symmetric = symmetric
+    return (
+        operator(
+            space,
+            space,
+            space,
+            *args,
+            parameters=parameters,
+            device_interface=device_interface,
+        )
+        .weak_form()
+        .A
+    )
+
+
+@pytest.mark.parametrize(
+    "operator, space_type, args",
+    [
+        (laplace.single_layer, ("DP", 0), ()),
+        (laplace.hypersingular, ("P", 1), ()),
+        (helmholtz.single_layer, ("P", 1), (1.5 + 0.5j,)),
+        (helmholtz.hypersingular, ("P", 1), (1.5,)),
+        (modified_helmholtz.single_layer, ("P", 1), (1.5,)),
+    ],
+)
+@pytest.mark.parametrize("device_interface", ["numba", "opencl"])
+def test_symmetric_assembly(helpers, operator, space_type, args, device_interface):
+    """Symmetric assembly agrees with the full assembly and is symmetric."""
+    grid = helpers.load_grid("sphere")
+    space = function_space(grid, *space_type)
+
+    expected = _assemble(operator, space, args, device_interface, False)
+    actual = _assemble(operator, space, args, device_interface, True)
+
+    # The singular quadrature of the two orderings of an element pair
+    # only agrees up to the quadrature error.
+    np.testing.assert_allclose(
+        actual, expected, rtol=1e-5, atol=1e-5 * np.max(np.abs(expected))
+    )
+    np.testing.assert_allclose(
+        actual, actual.T, rtol=0, atol=1e-13 * np.max(np.abs(actual))
+    )
+
+
+def test_nonsymmetric_operator(helpers):
+    """Operators that are not symmetric are assembled completely."""
+    grid = helpers.load_grid("sphere")
+    space = function_space(grid, "P", 1)
+
+    expected = _assemble(laplace.double_layer, space, (), "numba", False)
+    actual = _assemble(laplace.double_layer, space, (), "numba", True)
+
+    np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,56 @@
+"""Unit tests for the tiled dense assembly."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import laplace, helmholtz, maxwell
+
+
+@pytest.mark.parametrize(
+    "operator, spaces, args",
+    [
+        (laplace.double_layer, (("P", 1), ("P", 1)), ()),
+        (helmholtz.hypersingular, (("P", 1), ("P", 1)), (1.5,)),
+        (maxwell.electric_field, (("RWG", 0), ("SNC", 0)), (1.5,)),
+    ],
+)
+def test_tiled_assembly(helpers, operator, spaces, args):
+    """Compare tiled and untiled dense assembly."""
+    grid = helpers.load_grid("fmm_grid")
+    domain = function_space(grid, *spaces[0])
+    dual_to_range = function_space(grid, *spaces[1])
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+    parameters.assembly.dense.test_tile_size = None
+    parameters.assembly.dense.trial_tile_size = None
+    mat1 = (
+        operator(
+            domain,
+            domain,
+            dual_to_range,
+            *args,
+            device_interface="numba",
+            parameters=parameters,
+        )
+        .weak_form()
+        .A
+    )
+
+    parameters.assembly.dense.test_tile_size = 7
+    parameters.assembly.dense.trial_tile_size = 13
+    mat2 = (
+        operator(
+            domain,
+            domain,
+            dual_to_range,
+            *args,
+            device_interface="numba",
+            parameters=parameters,
+        )
+        .weak_form()
+        .A
+    )
+
+    np.testing.assert_allclose(mat1, mat2, rtol=1e-10, atol=1e-14)
@@ -0,0 +1,63 @@
+"""Unit tests for the assembly of Helmholtz operators for many wavenumbers."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import helmholtz
+
+
+@pytest.mark.parametrize(
+    "operator", ["single_layer", "double_layer", "adjoint_double_layer"]
+)
+@pytest.mark.parametrize("precision", ["single", "double"])
+def test_wavenumber_sweep(helpers, operator, precision):
+    """Compare the sweep with operators assembled for each wavenumber."""
+    grid = helpers.load_grid("sphere")
+    domain = function_space(grid, "P", 1)
+    dual_to_range = function_space(grid, "DP", 0)
+    wavenumbers = [1.0, 2.5 + 0.5j, 0.5j]
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+
+    weak_forms = helmholtz.wavenumber_sweep(
+        operator,
+        domain,
+        dual_to_range,
+        wavenumbers,
+        parameters=parameters,
+        precision=precision,
+    )
+
+    assert len(weak_forms) == len(wavenumbers)
+
+    for wavenumber, weak_form in zip(wavenumbers, weak_forms):
+        expected = (
+            getattr(helmholtz, operator)(
+                domain,
+                domain,
+                dual_to_range,
+                wavenumber,
+                parameters=parameters,
+                device_interface="numba",
+                precision=precision,
+            )
+            .weak_form()
+            .A
+        )
+        np.testing.assert_allclose(
+            weak_form.A,
+            expected,
+            rtol=helpers.default_tolerance(precision),
+            atol=helpers.default_tolerance(precision) * np.max(np.abs(expected)),
+        )
+
+
+def test_wavenumber_sweep_unknown_operator(helpers):
+    """Only scalar operators with a default assembly are supported."""
+    grid = helpers.load_grid("sphere")
+    space = function_space(grid, "P", 1)
+
+    with pytest.raises(ValueError):
+        helmholtz.wavenumber_sweep("hypersingular", space, space, [1.0])
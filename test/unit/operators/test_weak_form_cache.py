@@ -0,0 +1,85 @@
+"""Unit tests for the weak form cache."""
+
+import numpy as np
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import helmholtz
+
+
+def test_weak_form_cache(two_element_grid):
+    """Test that identical operators share the weak form."""
+    bempp.api.clear_weak_form_cache()
+    space = function_space(two_element_grid, "DP", 0)
+
+    op1 = helmholtz.single_layer(space, space, space, 1.5)
+    op2 = helmholtz.single_layer(space, space, space, 1.5)
+    op3 = helmholtz.single_layer(space, space, space, 2.5)
+
+    before = bempp.api.weak_form_cache_statistics()
+    assert op1.weak_form() is op2.weak_form()
+    assert op3.weak_form() is not op1.weak_form()
+    after = bempp.api.weak_form_cache_statistics()
+
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 2
+    assert after["entries"] == 2
+
+
+def test_weak_form_cache_disabled(two_element_grid):
+    """Test that a zero memory budget disables the cache."""
+    bempp.api.clear_weak_form_cache()
+    space = function_space(two_element_grid, "DP", 0)
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 0
+    op1 = helmholtz.single_layer(space, space, space, 1.5, parameters=parameters)
+    op2 = helmholtz.single_layer(space, space, space, 1.5, parameters=parameters)
+
+    assert op1.weak_form() is not op2.weak_form()
+    assert bempp.api.weak_form_cache_statistics()["entries"] == 0
+
+
+def test_weak_form_cache_eviction(helpers):
+    """Test that the least recently used weak form is evicted."""
+    bempp.api.clear_weak_form_cache()
+    grid = helpers.load_grid("sphere")
+    dp0 = function_space(grid, "DP", 0)
+    p1 = function_space(grid, "P", 1)
+
+    # The budget holds the DP0 or the P1 weak form, but not both.
+    parameters = bempp.api.DefaultParameters()
+    parameters.assembly.weak_form_cache_size = 1
+
+    first = helmholtz.single_layer(dp0, dp0, dp0, 1.5, parameters=parameters)
+    second = helmholtz.single_layer(p1, p1, p1, 1.5, parameters=parameters)
+
+    first_weak_form = first.weak_form()
+    before = bempp.api.weak_form_cache_statistics()
+    second.weak_form()
+    after = bempp.api.weak_form_cache_statistics()
+
+    assert after["evictions"] - before["evictions"] == 1
+    assert after["entries"] == 1
+    assert after["bytes"] < before["bytes"]
+
+    again = helmholtz.single_layer(dp0, dp0, dp0, 1.5, parameters=parameters)
+    assert again.weak_form() is not first_weak_form
+
+
+def test_weak_form_cache_out_of_core(helpers, tmp_path):
+    """Test that out-of-core weak forms are not taken from the cache."""
+    bempp.api.clear_weak_form_cache()
+    grid = helpers.load_grid("sphere")
+    space = function_space(grid, "DP", 0)
+
+    parameters = bempp.api.DefaultParameters()
+    in_memory = helmholtz.single_layer(space, space, space, 1.5, parameters=parameters)
+    assert not isinstance(in_memory.weak_form().A, np.memmap)
+
+    parameters.assembly.dense.out_of_core = True
+    parameters.assembly.dense.out_of_core_dir = str(tmp_path)
+    out_of_core = helmholtz.single_layer(
+        space, space, space, 1.5, parameters=parameters
+    )
+    assert isinstance(out_of_core.weak_form().A, np.memmap)
+    assert bempp.api.weak_form_cache_statistics()["entries"] == 1
@@ -0,0 +1,85 @@
+"""Unit tests for saving and loading weak forms."""
+
+import numpy as np
+import pytest
+import bempp.api
+from bempp.api import function_space
+from bempp.api.operators.boundary import laplace, sparse
+
+
+def test_save_and_load_dense(helpers, tmp_path):
+    """Save and load a dense weak form."""
+    grid = helpers.load_grid("fmm_grid")
+    space = function_space(grid, "DP", 0)
+
+    op = laplace.single_layer(space, space, space)
+    key = bempp.api.weak_form_key(op)
+    filename = str(tmp_path / "slp.npz")
+
+    bempp.api.save_weak_form(filename, op.weak_form(), key=key)
+
+    loaded = bempp.api.load_weak_form(filename, key=key)
+    np.testing.assert_equal(loaded.A, op.weak_form().A)
+
+    mapped = bempp.api.load_weak_form(filename, mmap_mode="r")
+    assert isinstance(mapped.A, np.memmap)
+    np.testing.assert_equal(mapped.A, op.weak_form().A)
+
+    with pytest.raises(ValueError):
+        bempp.api.load_weak_form(filename, key="other")
+
+
+def test_save_and_load_blocked(helpers, tmp_path):
+    """Save and load a blocked weak form with sparse and zero blocks."""
+    grid = helpers.load_grid("fmm_grid")
+    space = function_space(grid, "P", 1)
+
+    blocked = bempp.api.BlockedOperator(2, 2)
+    blocked[0, 0] = laplace.double_layer(space, space, space)
+    blocked[1, 1] = sparse.identity(space, space, space)
+    weak_form = blocked.weak_form()
+
+    filename = str(tmp_path / "blocked.npz")
+    bempp.api.save_weak_form(filename, weak_form)
+
+    loaded = bempp.api.load_weak_form(filename, mmap_mode="r")
+
+    vec = np.random.rand(weak_form.shape[1])
+    np.testing.assert_allclose(loaded @ vec, weak_form @ vec, rtol=1e-14)
+
+
+def test_weak_form_key(two_element_grid):
+    """Test that the key depends on the operator and the parameters."""
+    space = function_space(two_element_grid, "DP", 0)
+
+    key1 = bempp.api.weak_form_key(laplace.single_layer(space, space, space))
+    key2 = bempp.api.weak_form_key(laplace.single_layer(space, space, space))
+    key3 = bempp.api.weak_form_key(laplace.double_layer(space, space, space))
+
+    parameters = bempp.api.DefaultParameters()
+    parameters.quadrature.regular = 6
+    key4 = bempp.api.weak_form_key(
+        laplace.single_layer(space, space, space, parameters=parameters)
+    )
+
+    assert key1 == key2
+    assert len({key1, key3, key4}) == 3
+
+
+def test_weak_form_key_independent_of_grid_id(helpers):
+    """Test that separately imported copies of a grid give the same key."""
+    grid1 = helpers.load_grid("fmm_grid")
+    grid2 = helpers.load_grid("fmm_grid")
+    assert grid1.id != grid2.id
+
+    keys = []
+    for grid in [grid1, grid2]:
+        domain = function_space(grid, "P", 1)
+        dual_to_range = function_space(grid, "DP", 0)
+        keys.append(
+            bempp.api.weak_form_key(
+                laplace.double_layer(domain, dual_to_range, dual_to_range)
+            )
+        )
+
+    assert keys[0] == keys[1]
@@ -45,6 +45,53 @@ def test_rwg_color_map():
     assert colors_unique
 
 
+@pytest.mark.parametrize("balanced", [False, True])
+@pytest.mark.parametrize("space_type", [("P", 1), ("DP", 0), ("RWG", 0)])
+def test_color_map_on_sphere(helpers, space_type, balanced):
+    """Test that elements of one color share no dofs."""
+    import bempp.api
+
+    grid = helpers.load_grid("sphere")
+    space = bempp.api.function_space(grid, *space_type)
+
+    old_value = bempp.api.GLOBAL_PARAMETERS.assembly.balanced_coloring
+    bempp.api.GLOBAL_PARAMETERS.assembly.balanced_coloring = balanced
+    try:
+        color_map = space.color_map
+    finally:
+        bempp.api.GLOBAL_PARAMETERS.assembly.balanced_coloring = old_value
+
+    sorted_indices, indexptr = space.get_elements_by_color()
+
+    assert _np.all(color_map[space.support_elements] >= 0)
+    assert indexptr[-1] == space.number_of_support_elements
+
+    for color in range(len(indexptr) - 1):
+        elements = sorted_indices[indexptr[color] : indexptr[color + 1]]
+        _np.testing.assert_equal(color_map[elements], color)
+        dofs = space.local2global[elements].ravel()
+        assert len(dofs) == len(_np.unique(dofs))
+
+
+def test_balanced_color_map(helpers):
+    """Test that balanced coloring gives color classes of similar size."""
+    import bempp.api
+
+    grid = helpers.load_grid("sphere")
+
+    sizes = {}
+    old_value = bempp.api.GLOBAL_PARAMETERS.assembly.balanced_coloring
+    try:
+        for balanced in [False, True]:
+            bempp.api.GLOBAL_PARAMETERS.assembly.balanced_coloring = balanced
+            space = bempp.api.function_space(grid, "P", 1)
+            sizes[balanced] = _np.bincount(space.color_map)
+    finally:
+        bempp.api.GLOBAL_PARAMETERS.assembly.balanced_coloring = old_value
+
+    assert _np.ptp(sizes[True]) < _np.ptp(sizes[False])
+
+
 def test_p1_open_segment():
     """Check a P1 open segment."""
     import bempp.api
@@ -0,0 +1,69 @@
+"""Unit tests for the lazy imports of bempp.api."""
+
+import subprocess
+import sys
+
+
+def _run(code):
+    """Run code in a fresh interpreter and return its output."""
+    return subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.split()
+
+
+def test_import_does_not_load_heavy_modules():
+    """Test that importing bempp.api does not import Numba or probe devices."""
+    output = _run(
+        "import sys, bempp.api\n"
+        "print('numba' in sys.modules, 'pyopencl' in sys.modules)\n"
+        "print('TMP_PATH' in vars(bempp.api))"
+    )
+
+    assert output == ["False", "False", "False"]
+
+
+def test_lazy_attributes():
+    """Test that lazy attributes resolve to the original objects."""
+    import bempp.api
+    from bempp.api.space import function_space
+    from bempp.api.linalg.iterative_solvers import gmres
+    from bempp.api.utils import pool
+
+    assert bempp.api.function_space is function_space
+    assert bempp.api.gmres is gmres
+    assert bempp.api.pool is pool
+    assert "operators" in dir(bempp.api)
+    assert bempp.api.DEFAULT_DEVICE_INTERFACE in ["numba", "opencl"]
+
+
+def test_lazy_constants_can_be_overwritten():
+    """Test that setting a lazy constant overrides its default."""
+    output = _run(
+        "import bempp.api\n"
+        "bempp.api.DEFAULT_DEVICE_INTERFACE = 'numba'\n"
+        "print(bempp.api.DEFAULT_DEVICE_INTERFACE)"
+    )
+
+    assert output == ["numba"]
+
+
+def test_subpackages():
+    """Test that subpackages are reachable after importing bempp.api."""
+    output = _run(
+        "import bempp.api\n"
+        "print(callable(bempp.api.linalg.gmres), callable(bempp.api.linalg.cg))\n"
+        "print(callable(bempp.api.grid.union))\n"
+        "for name in ['assembly', 'external', 'fmm', 'space', 'utils']:\n"
+        "    print(getattr(bempp.api, name).__name__)"
+    )
+
+    assert output == [
+        "True",
+        "True",
+        "True",
+        "bempp.api.assembly",
+        "bempp.api.external",
+        "bempp.api.fmm",
+        "bempp.api.space",
+        "bempp.api.utils",
+    ]
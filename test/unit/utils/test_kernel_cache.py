@@ -0,0 +1,50 @@
+"""Unit tests for the kernel cache."""
+
+import os
+
+import numba
+import numpy as np
+import pytest
+
+from bempp.api.utils import kernel_cache
+
+
+@pytest.fixture
+def tmp_cache_dir(tmp_path):
+    """Redirect the kernel cache to a temporary directory."""
+    old_cache_dir = numba.config.CACHE_DIR
+    kernel_cache.set_cache_dir(str(tmp_path))
+    yield str(tmp_path)
+    numba.config.CACHE_DIR = old_cache_dir
+    for dispatcher in kernel_cache.cached_dispatchers().values():
+        dispatcher.enable_caching()
+
+
+def test_cached_dispatchers():
+    """Test that the kernel functions use the cache."""
+    dispatchers = kernel_cache.cached_dispatchers()
+
+    assert "bempp.core.numba_kernels.laplace_single_layer_regular" in dispatchers
+    assert "bempp.api.space.shapesets._p1_disc_shapeset_evaluate" in dispatchers
+    # Assembly drivers receive jitclass instances and cannot be cached.
+    assert "bempp.core.numba_kernels.default_scalar_regular_kernel" not in dispatchers
+
+
+def test_write_and_clear_cache(tmp_cache_dir):
+    """Test that kernels are written to the cache directory and cleared."""
+    from bempp.api.grid.grid import _sort_values
+
+    assert kernel_cache.cache_dir() == tmp_cache_dir
+
+    _sort_values(np.int16(2), np.int16(1))
+
+    files = [fname for _, _, fnames in os.walk(tmp_cache_dir) for fname in fnames]
+    assert any(fname.endswith(".nbi") for fname in files)
+
+    stats = kernel_cache.report()
+    assert stats["bempp.api.grid.grid._sort_values"][1] >= 1
+
+    assert kernel_cache.clear() >= 2
+
+    files = [fname for _, _, fnames in os.walk(tmp_cache_dir) for fname in fnames]
+    assert len(files) == 0
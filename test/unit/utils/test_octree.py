@@ -0,0 +1,98 @@
+"""Unit tests for the Octree."""
+
+import numpy as np
+import pytest
+
+from bempp.api.utils.octree import Octree, de_morton
+
+
+@pytest.fixture
+def octree():
+    """Return an Octree over random points on a sphere."""
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(3, 2000))
+    points /= np.linalg.norm(points, axis=0)
+    return Octree(-np.ones(3), np.ones(3), 4, points)
+
+
+def _level_nodes(octree, level):
+    """Return the non-empty nodes of a level."""
+    ptr = octree.non_empty_nodes_ptr
+    return octree.non_empty_nodes_by_level[ptr[level] : ptr[level + 1]]
+
+
+def _indices(nodes):
+    """Return the integer coordinates of Morton indices."""
+    return np.array([de_morton(node) for node in nodes]).reshape(-1, 3)
+
+
+def test_leaves_contain_points(octree):
+    """The points of each leaf lie inside the bounds of the leaf."""
+    leaves = octree.non_empty_leaf_nodes
+    ptr = octree.leaf_nodes_ptr
+
+    assert np.array_equal(np.sort(octree.sorted_indices), np.arange(2000))
+
+    for index, leaf in enumerate(leaves):
+        points = octree.vertices[:, octree.sorted_indices[ptr[index] : ptr[index + 1]]]
+        lbound, ubound = octree.node_bounds(leaf, octree.maximum_level)
+        assert np.all(points >= lbound[:, np.newaxis])
+        assert np.all(points <= ubound[:, np.newaxis])
+
+    point_leaves = octree.leaves_containing_points(octree.vertices)
+    assert np.array_equal(
+        point_leaves[octree.sorted_indices], np.repeat(leaves, np.diff(ptr))
+    )
+    assert octree.leaf_containing_point(octree.vertices[:, 7]) == point_leaves[7]
+
+
+def test_levels_contain_parents(octree):
+    """The nodes of a level are the parents of the nodes of the next level."""
+    for level in range(octree.maximum_level):
+        assert np.array_equal(
+            _level_nodes(octree, level), np.unique(_level_nodes(octree, level + 1) >> 3)
+        )
+
+
+def test_node_positions(octree):
+    """Node positions are found for non-empty nodes and are -1 otherwise."""
+    level = 3
+    nodes = np.arange(8**level)
+    positions = octree.node_positions(nodes, level)
+
+    level_nodes = _level_nodes(octree, level)
+    assert np.array_equal(nodes[positions >= 0], level_nodes)
+    assert np.array_equal(positions[positions >= 0], np.arange(len(level_nodes)))
+
+
+def test_near_fields_and_interaction_lists(octree):
+    """Compare near fields and interaction lists with a brute force search."""
+    for level in range(octree.maximum_level + 1):
+        nodes = _level_nodes(octree, level)
+        indices = _indices(nodes)
+        ptr = octree.non_empty_nodes_ptr
+        near_fields = octree.near_field_nodes[
+            27 * ptr[level] : 27 * ptr[level + 1]
+        ].reshape(-1, 27)
+        interaction_lists = octree.interaction_list_nodes[
+            189 * ptr[level] : 189 * ptr[level + 1]
+        ].reshape(-1, 189)
+
+        for index in range(len(nodes)):
+            distance = np.max(np.abs(indices - indices[index]), axis=1)
+            parent_distance = np.max(
+                np.abs((indices >> 1) - (indices[index] >> 1)), axis=1
+            )
+
+            near_field = near_fields[index]
+            assert np.array_equal(
+                np.sort(near_field[near_field >= 0]), nodes[distance <= 1]
+            )
+
+            interaction_list = interaction_lists[index]
+            expected = []
+            if level >= 2:
+                expected = nodes[(distance > 1) & (parent_distance <= 1)]
+            assert np.array_equal(
+                np.sort(interaction_list[interaction_list >= 0]), expected
+            )
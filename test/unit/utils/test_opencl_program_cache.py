@@ -0,0 +1,42 @@
+"""Unit tests for the OpenCL program cache."""
+
+import os
+
+import pytest
+
+from bempp.core import opencl_kernels
+
+
+@pytest.fixture
+def tmp_program_cache_dir(tmp_path):
+    """Redirect the OpenCL program cache to a temporary directory."""
+    old_cache_dir = opencl_kernels.program_cache_dir()
+    opencl_kernels.set_program_cache_dir(str(tmp_path))
+    opencl_kernels.clear_program_cache()
+    yield str(tmp_path)
+    opencl_kernels.clear_program_cache()
+    opencl_kernels.set_program_cache_dir(old_cache_dir)
+
+
+def test_program_cache(tmp_program_cache_dir):
+    """Test that programs are cached in memory and on disk."""
+    options = {}
+
+    opencl_kernels.get_kernel_from_name("sum_for_potential_novec", options)
+    assert len(opencl_kernels._PROGRAM_CACHE) == 1
+    assert len(os.listdir(tmp_program_cache_dir)) == 1
+
+    opencl_kernels.get_kernel_from_name("sum_for_potential_novec", options)
+    assert len(opencl_kernels._PROGRAM_CACHE) == 1
+
+    opencl_kernels.get_kernel_from_name(
+        "sum_for_potential_novec", options, precision="single"
+    )
+    assert len(opencl_kernels._PROGRAM_CACHE) == 2
+
+    opencl_kernels.clear_program_cache()
+    kernel = opencl_kernels.get_kernel_from_name("sum_for_potential_novec", options)
+    assert kernel.function_name == "kernel_function"
+
+    assert opencl_kernels.clear_program_cache(disk=True) == 2
+    assert len(os.listdir(tmp_program_cache_dir)) == 0
@@ -0,0 +1,35 @@
+"""Unit tests for ahead of time kernel compilation."""
+
+import pytest
+
+import bempp.api
+from bempp.api.operators.boundary import laplace, maxwell
+
+
+def test_precompile_in_background():
+    """Test that precompile runs in a background thread."""
+    thread = bempp.api.precompile(
+        operators=[laplace.single_layer],
+        spaces=[("DP", 0)],
+        precision="double",
+        device_interface="numba",
+    )
+    thread.join()
+    assert not thread.is_alive()
+
+
+def test_precompile_maxwell():
+    """Test that Maxwell operators are compiled on RWG/SNC spaces."""
+    result = bempp.api.precompile(
+        operators=[maxwell.electric_field],
+        precision="single",
+        device_interface="numba",
+        background=False,
+    )
+    assert result is None
+
+
+def test_precompile_invalid_precision():
+    """Test that an invalid precision raises an error."""
+    with pytest.raises(ValueError):
+        bempp.api.precompile(precision="half", background=False)